@@ -0,0 +1,72 @@
+"""
+Benchmark onboarding strategy parsing on large model responses.
+
+Compares the single-pass classifier with the previous approach, which scanned
+the full text once per section and lowercased every line each time.
+
+Usage: python benchmarks/bench_strategy_parsing.py [lines ...]
+"""
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from context_manager.utils.onboarding import parse_strategy
+
+# Line templates mixing matching and non-matching content
+LINE_TEMPLATES = [
+    "Phase {n}: deliver the next increment",
+    "- Milestone {n}: ship the feature set",
+    "- Potential issue {n}: scaling the storage layer",
+    "- You should keep module {n} small",
+    "Architecture note {n}: prefer composition over inheritance",
+    "Plain filler line {n} without any keyword at all, padded for realism",
+    "Plain filler line {n} describing context for the reader",
+]
+
+def make_response(lines: int, seed: int = 0) -> str:
+    """Build a synthetic strategy where matching lines are sparse."""
+    rng = random.Random(seed)
+    filler = LINE_TEMPLATES[-2:]
+    out = []
+    for n in range(lines):
+        template = rng.choice(LINE_TEMPLATES) if rng.random() < 0.01 else rng.choice(filler)
+        out.append(template.format(n=n))
+    return '\n'.join(out)
+
+def legacy_parse(strategy_text: str) -> dict:
+    """The previous per-section extraction, kept here as the baseline."""
+    def extract(keywords):
+        return [line.strip() for line in strategy_text.split('\n')
+                if any(keyword in line.lower() for keyword in keywords)][:5]
+
+    roadmap = [line.strip() for line in strategy_text.split('\n') if 'Phase' in line or 'Stage' in line][:5]
+    return {
+        'roadmap': roadmap,
+        'milestones': extract(['milestone', 'key deliverable', 'major goal']),
+        'challenges': extract(['challenge', 'potential issue', 'complexity']),
+        'best_practices': extract(['best practice', 'recommendation', 'should']),
+    }
+
+def best_of(function, argument, repeat: int = 5) -> float:
+    """Fastest of several runs, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(argument)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main(sizes):
+    print(f"{'lines':>10} {'legacy (ms)':>12} {'single-pass (ms)':>17} {'speedup':>8}")
+    for lines in sizes:
+        text = make_response(lines)
+        assert parse_strategy(text) == legacy_parse(text)
+        legacy = best_of(legacy_parse, text)
+        current = best_of(parse_strategy, text)
+        print(f"{lines:>10} {legacy * 1000:>12.2f} {current * 1000:>17.2f} {legacy / current:>7.1f}x")
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000])
@@ -0,0 +1,73 @@
+"""
+Compare the memory used by analyze_project_structure results.
+
+Builds the former list-of-dicts structure and the columnar ProjectStructure
+for the same synthetic project and measures both with tracemalloc. Inputs
+are generated while building, so strings retained by a structure count
+against it, just as the strings produced by ast do in a real analysis.
+Names shared across files are interned, as ast does for identifiers.
+
+Usage: python benchmarks/bench_structure_memory.py [files ...]
+"""
+import os
+import sys
+import time
+import random
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from context_manager.components.code_analysis.structure import ProjectStructure
+
+# Names shared across many files, like methods and dunders in real code
+COMMON_NAMES = ['__init__', '__repr__', 'run', 'get', 'set', 'close', 'load', 'save', 'validate', 'to_dict']
+
+
+def synthetic_files(count: int, seed: int = 0):
+    """Yield (path, classes, functions) tuples resembling a large Python project."""
+    rng = random.Random(seed)
+    for i in range(count):
+        classes = [f"Model{i}_{j}" for j in range(rng.randint(0, 4))]
+        functions = [sys.intern(rng.choice(COMMON_NAMES)) for _ in range(rng.randint(2, 15))]
+        functions += [f"helper_{i}_{j}" for j in range(rng.randint(0, 5))]
+        yield f"src/package_{i // 50}/module_{i}.py", classes, functions
+
+
+def build_legacy(files):
+    structure = {'python_files': [], 'modules': [], 'packages': []}
+    for path, classes, functions in files:
+        structure['python_files'].append({'path': path, 'classes': list(classes), 'functions': list(functions)})
+    return structure
+
+
+def build_columnar(files):
+    structure = ProjectStructure()
+    for path, classes, functions in files:
+        structure.add_file(path, classes, functions)
+    structure.freeze()
+    return structure
+
+
+def measure(builder, count):
+    """Bytes still allocated by the result of builder, and build time."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = builder(synthetic_files(count))
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def main(sizes):
+    print(f"{'files':>8} {'legacy (MB)':>12} {'columnar (MB)':>14} {'saving':>7} {'legacy (s)':>11} {'columnar (s)':>13}")
+    for count in sizes:
+        legacy, legacy_bytes, legacy_time = measure(build_legacy, count)
+        columnar, columnar_bytes, columnar_time = measure(build_columnar, count)
+        assert columnar.to_dict() == legacy
+        print(f"{count:>8} {legacy_bytes / 2**20:>12.1f} {columnar_bytes / 2**20:>14.1f} "
+              f"{1 - columnar_bytes / legacy_bytes:>6.0%} {legacy_time:>11.2f} {columnar_time:>13.2f}")
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 30_000])
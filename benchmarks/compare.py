@@ -0,0 +1,69 @@
+"""
+Compare two benchmark result files and flag regressions.
+
+Usage:
+    python benchmarks/compare.py BASELINE.json CANDIDATE.json [--threshold 0.1]
+
+Exits with status 1 when any benchmark's median slowed down by more than the threshold.
+"""
+import sys
+import json
+import argparse
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> list:
+    """
+    Pair up the results of two runs.
+
+    :param baseline: Results of the reference run
+    :param candidate: Results of the run under test
+    :param threshold: Relative slowdown counted as a regression (0.1 = 10%)
+    :return: Rows of (name, size, baseline median, candidate median, ratio, status)
+    """
+    rows = []
+    for name in sorted(set(baseline['results']) | set(candidate['results'])):
+        before = baseline['results'].get(name, {})
+        after = candidate['results'].get(name, {})
+        for size in sorted(set(before) | set(after), key=int):
+            if size not in before or size not in after:
+                rows.append((name, size, before.get(size, {}).get('median'),
+                             after.get(size, {}).get('median'), None, 'missing'))
+                continue
+            ratio = after[size]['median'] / before[size]['median'] if before[size]['median'] else float('inf')
+            if ratio > 1 + threshold:
+                status = 'regression'
+            elif ratio < 1 / (1 + threshold):
+                status = 'improvement'
+            else:
+                status = 'unchanged'
+            rows.append((name, size, before[size]['median'], after[size]['median'], ratio, status))
+    return rows
+
+
+def _ms(value) -> str:
+    return f"{value * 1000:.2f}" if value is not None else '-'
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('baseline', help='Result file of the reference version')
+    parser.add_argument('candidate', help='Result file of the version under test')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Relative slowdown treated as a regression')
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    rows = compare(baseline, candidate, args.threshold)
+    print(f"{'benchmark':<32} {'size':>8} {'base (ms)':>10} {'new (ms)':>10} {'ratio':>7}  status")
+    for name, size, before, after, ratio, status in rows:
+        ratio_text = f"{ratio:.2f}x" if ratio is not None else '-'
+        print(f"{name:<32} {size:>8} {_ms(before):>10} {_ms(after):>10} {ratio_text:>7}  {status}")
+
+    return 1 if any(row[5] == 'regression' for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""
+Synthetic fixtures for the benchmark suite.
+
+Every fixture is generated under a caller-provided directory so runs are
+isolated and repeatable; sizes are controlled by a single count.
+"""
+import os
+import sys
+import json
+import stat
+import random
+import subprocess
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import yaml
+
+# Fixed start of the synthetic history so generated repositories are reproducible
+HISTORY_START = datetime(2023, 1, 2, 9, 0, 0)
+
+MODULE_TEMPLATE = '''"""Synthetic module {index}."""
+import os
+from typing import List
+
+
+class Service{index}:
+    """Service number {index}."""
+    def __init__(self, name: str):
+        self.name = name
+
+    def run(self, items: List[str]) -> List[str]:
+        return [os.path.join(self.name, item) for item in items]
+
+
+def helper_{index}(value: int) -> int:
+    return value * {index}
+'''
+
+
+def make_git_repo(path: str, commits: int, files: int = 50, authors: int = 5) -> str:
+    """
+    Create a git repository with a linear history of the given length.
+
+    The history is streamed through git fast-import, which keeps even tens of
+    thousands of commits cheap to generate.
+
+    :param path: Directory to create the repository in
+    :param commits: Number of commits
+    :param files: Number of distinct files touched by the history
+    :param authors: Number of distinct commit authors
+    :return: Path of the repository
+    """
+    os.makedirs(path, exist_ok=True)
+    subprocess.run(['git', 'init', '-q', '-b', 'main', path], check=True)
+
+    stream = []
+    for i in range(commits):
+        timestamp = int((HISTORY_START + timedelta(hours=6 * i)).timestamp())
+        author = f"Dev {i % authors} <dev{i % authors}@example.com>"
+        content = f"# revision {i}\nVALUE = {i}\n"
+        message = f"Update module {i % files} (change {i})"
+        stream.append(f"commit refs/heads/main\nmark :{i + 1}\n")
+        stream.append(f"author {author} {timestamp} +0000\ncommitter {author} {timestamp} +0000\n")
+        stream.append(f"data {len(message)}\n{message}\n")
+        if i:
+            stream.append(f"from :{i}\n")
+        stream.append(f"M 100644 inline src/module_{i % files}.py\ndata {len(content)}\n{content}\n")
+
+    subprocess.run(['git', 'fast-import', '--quiet'], cwd=path, input=''.join(stream).encode(), check=True)
+    subprocess.run(['git', 'checkout', '-q', '-f', 'main'], cwd=path, check=True)
+    return path
+
+
+def make_source_tree(path: str, files: int, per_package: int = 20) -> str:
+    """
+    Create a Python source tree with the given number of modules.
+
+    :param path: Root directory of the tree
+    :param files: Number of Python modules
+    :param per_package: Modules per package directory
+    :return: Path of the tree
+    """
+    for i in range(files):
+        package = os.path.join(path, 'src', f"package_{i // per_package}")
+        os.makedirs(package, exist_ok=True)
+        init_file = os.path.join(package, '__init__.py')
+        if not os.path.exists(init_file):
+            open(init_file, 'w').close()
+        with open(os.path.join(package, f"module_{i}.py"), 'w') as f:
+            f.write(MODULE_TEMPLATE.format(index=i))
+    return path
+
+
+def make_milestones(path: str, milestones: int) -> str:
+    """
+    Write MILESTONES.yaml and .context/GLOBAL_CONTEXT.yaml with the given number of milestones.
+
+    Half of the milestones are completed so both lists are populated.
+
+    :param path: Project directory
+    :param milestones: Number of milestones
+    :return: Path of the project
+    """
+    active, completed, development = [], [], []
+    for i in range(milestones):
+        created = (HISTORY_START + timedelta(days=i)).isoformat()
+        milestone = {'name': f"Milestone {i}", 'created_at': created, 'status': 'in_progress'}
+        if i % 2:
+            milestone.update(status='completed', completed_at=(HISTORY_START + timedelta(days=i + 3)).isoformat())
+            completed.append(milestone)
+        else:
+            active.append(milestone)
+        development.append({'description': f"Milestone {i}", 'added_at': created, 'status': 'pending'})
+
+    with open(os.path.join(path, 'MILESTONES.yaml'), 'w') as f:
+        yaml.dump({'milestones': active, 'completed_milestones': completed}, f)
+
+    context_dir = os.path.join(path, '.context')
+    os.makedirs(context_dir, exist_ok=True)
+    with open(os.path.join(context_dir, 'GLOBAL_CONTEXT.yaml'), 'w') as f:
+        yaml.safe_dump({
+            'project': {'name': os.path.basename(path), 'created_at': HISTORY_START.isoformat(),
+                        'last_updated': HISTORY_START.isoformat()},
+            'development': {'current_phase': 'development', 'milestones': development,
+                            'completed_milestones': []}
+        }, f, default_flow_style=False)
+    return path
+
+
+def make_pip_stub(path: str, packages: int) -> str:
+    """
+    Create a `pip` executable that reports a synthetic installed-package list.
+
+    Prepend the returned directory to PATH so DependencyTracker sees the stub.
+
+    :param path: Directory to place the stub in
+    :param packages: Number of installed packages to report
+    :return: Directory containing the stub
+    """
+    os.makedirs(path, exist_ok=True)
+    listing = [{'name': f"package-{i}", 'version': f"1.{i % 10}.0"} for i in range(packages)]
+    listing_file = os.path.join(path, 'packages.json')
+    with open(listing_file, 'w') as f:
+        json.dump(listing, f)
+
+    stub = os.path.join(path, 'pip')
+    with open(stub, 'w') as f:
+        f.write(f"#!{sys.executable}\nimport sys\nsys.stdout.write(open({listing_file!r}).read())\n")
+    os.chmod(stub, os.stat(stub).st_mode | stat.S_IEXEC)
+    return path
+
+
+def make_package_metadata(path: str, packages: int, seed: int = 0) -> dict:
+    """
+    Write cached PyPI metadata for a synthetic dependency graph.
+
+    Packages depend on lower-numbered ones, favouring the first few as
+    widely used base libraries. Every package releases along a shared
+    timeline: newer releases require newer versions of their dependencies,
+    some projects cap them below the next major version, and a few of the newest releases
+    drop support for the running Python. Installed versions sit in the
+    middle of each timeline, so there are upgrades to plan and caps that
+    block some of them.
+
+    :param path: Cache directory for PackageMetadataCache
+    :param packages: Number of packages
+    :param seed: Random seed
+    :return: Installed version per package name
+    """
+    rng = random.Random(seed)
+    os.makedirs(path, exist_ok=True)
+    timelines, installed = [], {}
+    python_floor = f">={sys.version_info.major}.{sys.version_info.minor + 1}"
+
+    for i in range(packages):
+        major, minor, releases = 1, 0, []
+        for r in range(rng.randint(4, 25)):
+            if r and rng.random() < 0.2:
+                major, minor = major + 1, 0
+            releases.append(f"{major}.{minor}.0")
+            minor += 1
+        times = [r / max(len(releases) - 1, 1) for r in range(len(releases))]
+        timelines.append((releases, times))
+
+        dependencies = sorted({int(i * rng.random() ** 2) for _ in range(rng.randint(0, 6)) if i})
+        # Some projects cap every dependency below its next major version
+        capped = {dependency: rng.random() < 0.15 for dependency in dependencies}
+        # Minimum versions trail the dependency's releases, often by a long way
+        lags = {dependency: 0.1 + rng.random() * 0.6 for dependency in dependencies}
+        requires = {}
+        for release, moment in zip(releases, times):
+            lines = []
+            for dependency in dependencies:
+                dependency_releases, dependency_times = timelines[dependency]
+                bound = [v for v, t in zip(dependency_releases, dependency_times) if t <= moment - lags[dependency]]
+                bound = bound[-1] if bound else dependency_releases[0]
+                line = f"package-{dependency}>={bound}"
+                if capped[dependency]:
+                    line += f",<{int(bound.split('.')[0]) + 1}"
+                lines.append(line)
+            requires[release] = lines
+
+        newest_python = len(releases) - 1 if rng.random() < 0.1 else len(releases)
+        entry = {
+            'fetched_at': 0,
+            'releases': {v: {'requires_python': python_floor if r >= newest_python else '>=3.8', 'yanked': False}
+                         for r, v in enumerate(releases)},
+            'requires': requires
+        }
+        with open(os.path.join(path, f"package-{i}.json"), 'w') as f:
+            json.dump(entry, f)
+
+        moment = 0.5 - rng.random() * 0.3
+        installed[f"package-{i}"] = min(zip(releases, times), key=lambda item: abs(item[1] - moment))[0]
+    return installed
+
+
+class _PyPIHandler(BaseHTTPRequestHandler):
+    """Serves the PyPI JSON API for any package name."""
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        parts = self.path.strip('/').split('/')
+        if len(parts) != 3 or parts[0] != 'pypi' or parts[2] != 'json':
+            self.send_error(404)
+            return
+
+        # Every other package has a newer release available
+        index = sum(map(ord, parts[1]))
+        latest = f"2.{index % 10}.0" if index % 2 else "1.0.0"
+        payload = json.dumps({
+            'info': {'name': parts[1], 'version': latest, 'requires_dist': None, 'requires_python': '>=3.8'},
+            'releases': {latest: []}
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class FakePyPIIndex:
+    """
+    Local stand-in for the PyPI JSON API, usable as a context manager.
+
+    Point DependencyTracker.pypi_url at `url` to benchmark without network access.
+    """
+    def __init__(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _PyPIHandler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/pypi"
+        self._thread = threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,283 @@
+"""
+Time every subsystem on synthetic fixtures at several sizes.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--sizes 100 1000] [--repeat 5] [--only context.] [--output results.json]
+
+Results are written as JSON; compare two runs with benchmarks/compare.py.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import fixtures
+from context_manager.core import ContextManager
+from context_manager.components.code_analysis.code_generator import CodeGenerator
+from context_manager.components.code_analysis.code_index import CodeSearchIndex
+from context_manager.components.code_analysis.code_retrieval import CodeRetrievalIndex
+from context_manager.components.code_analysis.clone_detector import CloneDetector
+from context_manager.components.dependency_management.dependency_tracker import DependencyTracker
+from context_manager.components.project_tracking.context_system import ProjectContextManager
+from context_manager.components.project_tracking.ownership import OwnershipIndex
+
+DEFAULT_SIZES = [100, 1000]
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+
+def bench_update_context(workdir: str, size: int):
+    """ContextManager.update_context on a repository with `size` commits."""
+    fixtures.make_git_repo(workdir, commits=size)
+    manager = ContextManager(workdir)
+    return manager.update_context
+
+
+def bench_project_status(workdir: str, size: int):
+    """ContextManager.get_project_status on a repository with `size` commits."""
+    fixtures.make_git_repo(workdir, commits=size)
+    manager = ContextManager(workdir)
+    return manager.get_project_status
+
+
+def bench_analyze_structure(workdir: str, size: int):
+    """CodeGenerator.analyze_project_structure on a tree of `size` modules."""
+    fixtures.make_source_tree(workdir, files=size)
+    generator = CodeGenerator(workdir)
+    return generator.analyze_project_structure
+
+
+def bench_code_search_cold(workdir: str, size: int):
+    """First query on a freshly opened code search index over `size` modules."""
+    fixtures.make_source_tree(workdir, files=size)
+    CodeSearchIndex(workdir).update()
+
+    def run():
+        index = CodeSearchIndex(workdir)
+        try:
+            return index.search('helper_7(', limit=1)
+        finally:
+            index.close()
+    return run
+
+
+def bench_find_symbol_cold(workdir: str, size: int):
+    """First symbol lookup on a freshly opened code search index over `size` modules."""
+    fixtures.make_source_tree(workdir, files=size)
+    CodeSearchIndex(workdir).update()
+
+    def run():
+        index = CodeSearchIndex(workdir)
+        try:
+            return index.find_symbol('Service7')
+        finally:
+            index.close()
+    return run
+
+
+def bench_check_dependencies(workdir: str, size: int):
+    """DependencyTracker.check_dependencies with `size` installed packages and a local index."""
+    stub_dir = fixtures.make_pip_stub(os.path.join(workdir, 'bin'), packages=size)
+    index = fixtures.FakePyPIIndex().__enter__()
+    tracker = DependencyTracker(workdir)
+    tracker.pypi_url = index.url
+
+    def run():
+        path = os.environ.get('PATH', '')
+        os.environ['PATH'] = stub_dir + os.pathsep + path
+        try:
+            result = tracker.check_dependencies()
+        finally:
+            os.environ['PATH'] = path
+        if 'error' in result:
+            raise RuntimeError(result['error'])
+        return result
+
+    run.cleanup = lambda: index.__exit__(None, None, None)
+    return run
+
+
+def bench_track_milestone(workdir: str, size: int):
+    """ContextManager.track_milestone with `size` milestones in MILESTONES.yaml."""
+    fixtures.make_git_repo(workdir, commits=1)
+    fixtures.make_milestones(workdir, milestones=size)
+    manager = ContextManager(workdir)
+    return lambda: manager.track_milestone('Benchmark milestone')
+
+
+def bench_list_milestones(workdir: str, size: int):
+    """ContextManager.list_milestones with `size` milestones in MILESTONES.yaml."""
+    fixtures.make_git_repo(workdir, commits=1)
+    fixtures.make_milestones(workdir, milestones=size)
+    manager = ContextManager(workdir)
+    return manager.list_milestones
+
+
+def bench_add_context_milestone(workdir: str, size: int):
+    """ProjectContextManager.add_milestone with `size` milestones in GLOBAL_CONTEXT.yaml."""
+    fixtures.make_milestones(workdir, milestones=size)
+    manager = ProjectContextManager(workdir)
+    return lambda: manager.add_milestone('Benchmark milestone')
+
+
+def bench_context_snapshot(workdir: str, size: int):
+    """Snapshot after GLOBAL_CONTEXT.yaml was touched, with `size` milestones."""
+    fixtures.make_milestones(workdir, milestones=size)
+    manager = ProjectContextManager(workdir)
+    manager.snapshot()
+
+    def run():
+        # A new modification time forces the file to be parsed and hashed again
+        os.utime(manager.context_file, None)
+        return manager.snapshot()
+    return run
+
+
+def bench_context_diff(workdir: str, size: int):
+    """Diff of the current state against a snapshot, with `size` milestones and one change."""
+    fixtures.make_milestones(workdir, milestones=size)
+    manager = ProjectContextManager(workdir)
+    snapshot = manager.snapshot()
+    manager.update_context('phase', {'phase': 'benchmark'})
+    return lambda: manager.changes_since(snapshot['id'])
+
+
+def bench_code_retrieve(workdir: str, size: int):
+    """Top-8 BM25 retrieval over the chunks of `size` modules."""
+    fixtures.make_source_tree(workdir, files=size)
+    index = CodeRetrievalIndex(workdir)
+    index.update()
+
+    def run():
+        return index.retrieve('service helper value handle request', k=8)
+    run.cleanup = index.close
+    return run
+
+
+def bench_find_clones(workdir: str, size: int):
+    """Clone detection over `size` modules with one file changed since the last run."""
+    fixtures.make_source_tree(workdir, files=size)
+    detector = CloneDetector(workdir)
+    detector.find_clones()
+    touched = os.path.join(workdir, 'src', 'package_0', 'module_0.py')
+
+    def run():
+        os.utime(touched, None)
+        return detector.find_clones()
+    return run
+
+
+def bench_ownership_build(workdir: str, size: int):
+    """Full git-blame ownership build of a repository with `size` commits over 50 files."""
+    fixtures.make_git_repo(workdir, commits=size)
+    index = OwnershipIndex(workdir)
+
+    def run():
+        if os.path.exists(index.index_file):
+            os.remove(index.index_file)
+        return index.update()
+    return run
+
+
+# Benchmark name -> setup function returning the callable to time
+BENCHMARKS = {
+    'context.update_context': bench_update_context,
+    'context.get_project_status': bench_project_status,
+    'code.analyze_project_structure': bench_analyze_structure,
+    'code.search_cold': bench_code_search_cold,
+    'code.find_symbol_cold': bench_find_symbol_cold,
+    'code.retrieve': bench_code_retrieve,
+    'code.find_clones': bench_find_clones,
+    'deps.check_dependencies': bench_check_dependencies,
+    'yaml.track_milestone': bench_track_milestone,
+    'yaml.list_milestones': bench_list_milestones,
+    'yaml.add_context_milestone': bench_add_context_milestone,
+    'context.snapshot': bench_context_snapshot,
+    'context.snapshot_diff': bench_context_diff,
+    'context.ownership_build': bench_ownership_build,
+}
+
+
+def time_callable(function, repeat: int) -> dict:
+    """Run a callable once to warm up, then `repeat` times, and summarize the timings."""
+    function()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return {
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.fmean(timings),
+        'runs': repeat
+    }
+
+
+def run(sizes, repeat: int, only=None) -> dict:
+    """
+    Run the selected benchmarks at every size.
+
+    :param sizes: Fixture sizes to run
+    :param repeat: Timed runs per benchmark and size
+    :param only: Optional name prefixes selecting benchmarks
+    :return: Results keyed by benchmark name and size
+    """
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        for size in sizes:
+            with tempfile.TemporaryDirectory(prefix='cm-bench-') as workdir:
+                function = setup(workdir, size)
+                try:
+                    stats = time_callable(function, repeat)
+                finally:
+                    getattr(function, 'cleanup', lambda: None)()
+            results.setdefault(name, {})[str(size)] = stats
+            print(f"{name:<32} {size:>8} {stats['median'] * 1000:>10.2f} ms")
+    return results
+
+
+def environment() -> dict:
+    """Describe the environment the benchmarks ran in."""
+    try:
+        revision = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                  cwd=os.path.dirname(__file__)).stdout.strip() or None
+    except OSError:
+        revision = None
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'revision': revision,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='Fixture sizes to run')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per benchmark and size')
+    parser.add_argument('--only', nargs='+', help='Only run benchmarks whose name starts with one of these')
+    parser.add_argument('--output', help='Result file (defaults to benchmarks/results/<timestamp>.json)')
+    args = parser.parse_args(argv)
+
+    report = {'environment': environment(), 'results': run(args.sizes, args.repeat, args.only)}
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,28 @@
 import typer
 import os
+import re
 import json
-from typing import Optional
+from typing import List, Optional
+from datetime import datetime
 from rich.console import Console
+from rich.live import Live
 from rich.markdown import Markdown
+from rich.text import Text
 
 from .components.project_tracking.context_system import ProjectContextManager
+from .components.project_tracking.history_dataset import HistoryDatasetBuilder
+from .components.project_tracking.ownership import OwnershipIndex
 from .components.dependency_management.dependency_tracker import DependencyTracker
 from .components.code_analysis.code_generator import CodeGenerator
-from .utils.onboarding import start_project_onboarding
+from .components.code_analysis.code_retrieval import diff_query
+from .components.code_analysis.index_format import IndexFormatError
+from .components.ai_insights.insight_generator import AIInsightGenerator
+from .core import ContextManager
+from .workspace import DEFAULT_OPERATIONS, OPERATIONS, Workspace
+from .integrations.github_integration import GitHubIntegration
+from .integrations.org_scanner import OrganizationScanner
+from .utils.onboarding import ProjectOnboarding, onboard_projects, start_project_onboarding
+from .utils.profiling import start_profiling, stop_profiling
 
 # Create multiple app instances for more flexible command routing
 app = typer.Typer()
@@ -16,23 +30,79 @@ context_app = typer.Typer()
 deps_app = typer.Typer()
 code_app = typer.Typer()
 onboard_app = typer.Typer()
+insights_app = typer.Typer()
+github_app = typer.Typer()
+workspace_app = typer.Typer()
 
 app.add_typer(context_app, name="context")
 app.add_typer(deps_app, name="deps")
 app.add_typer(code_app, name="code")
 app.add_typer(onboard_app, name="onboard")
+app.add_typer(insights_app, name="insights")
+app.add_typer(github_app, name="github")
+app.add_typer(workspace_app, name="workspace")
 
 console = Console()
+err_console = Console(stderr=True)
+
+@app.callback()
+def main_callback(
+    ctx: typer.Context,
+    profile: bool = typer.Option(False, "--profile", help="Report per-phase timings and counters"),
+    profile_format: str = typer.Option("table", "--profile-format", help="Profile output: table or json"),
+    profile_stats: Optional[str] = typer.Option(None, "--profile-stats", help="Also collect cProfile stats into this file"),
+):
+    """Context Manager: intelligent project development assistant."""
+    if not (profile or profile_stats):
+        return
+    if profile_format not in ("table", "json"):
+        raise typer.BadParameter("must be 'table' or 'json'", param_hint="--profile-format")
+    
+    profiler = start_profiling(cprofile=profile_stats is not None)
+    
+    def report():
+        stop_profiling(profiler)
+        if profile_stats:
+            profiler.dump_stats(profile_stats)
+        # The report goes to stderr so it never mixes with command output
+        if profile_format == "json":
+            err_console.print_json(profiler.to_json())
+        else:
+            profiler.print_report(err_console)
+    
+    ctx.call_on_close(report)
 
 @onboard_app.command(name="init", help="Interactive project initialization")
 def onboard_project(
     project_path: str = typer.Argument(default="."),
+    answers: Optional[str] = typer.Option(None, "--answers", help="YAML/JSON file with answers (non-interactive)"),
 ):
     """Start an interactive project onboarding process."""
     console.print(f"[yellow]🚀 Starting project onboarding for {project_path}[/yellow]")
-    start_project_onboarding(project_path)
+    start_project_onboarding(project_path, answers)
     console.print("[green]✨ Project onboarding complete![/green]")
 
+@onboard_app.command(name="batch", help="Onboard many projects in parallel from an answers file")
+def onboard_batch(
+    answers_file: str = typer.Argument(..., help="YAML/JSON mapping of project paths to answers"),
+    workers: int = typer.Option(4, "--workers", help="Projects onboarded in parallel"),
+):
+    """Non-interactively onboard every project listed in an answers file."""
+    projects = ProjectOnboarding.load_answers(answers_file)
+    results = onboard_projects({path: answers or {} for path, answers in projects.items()}, max_workers=workers)
+    
+    failures = 0
+    for result in results:
+        if result['error']:
+            failures += 1
+            err_console.print(f"[red]❌ {result['project_path']}: {result['error']}[/red]")
+        else:
+            console.print(f"[green]📋 {result['project_path']}[/green]")
+    
+    console.print(f"[bold]Onboarded {len(results) - failures} of {len(results)} projects[/bold]")
+    if failures:
+        raise typer.Exit(code=1)
+
 @context_app.command(name="track", help="Track project development context")
 def track_context(
     project_path: str = typer.Argument(default="."),
@@ -50,19 +120,288 @@ def track_context(
     console.print(Markdown("## Current Project Context"))
     console.print(json.dumps(context, indent=2))
 
+@context_app.command(name="snapshot", help="Record a snapshot of the project context")
+def snapshot_context(
+    project_path: str = typer.Argument(default="."),
+    label: Optional[str] = typer.Option(None, "--label", help="Description of the snapshot"),
+    list_snapshots: bool = typer.Option(False, "--list", help="List snapshots instead of recording one"),
+):
+    """Record or list content-addressed context snapshots."""
+    context_manager = ProjectContextManager(project_path)
+    
+    if list_snapshots:
+        for entry in context_manager.snapshots.list():
+            created = datetime.fromtimestamp(entry['created_at']).strftime("%Y-%m-%d %H:%M:%S")
+            console.print(f"{entry['id']}  {created}  {entry['label'] or ''}", highlight=False)
+        return
+    
+    entry = context_manager.snapshot(label)
+    console.print(f"[green]✅ Snapshot {entry['id']} recorded[/green] "
+                  f"({entry['objects_written']} new sections, {entry['objects_reused']} unchanged)")
+
+@context_app.command(name="diff", help="Show what changed since a snapshot")
+def diff_context(
+    ref: str = typer.Argument("latest", help="Snapshot ID, ID prefix or 'latest'"),
+    until: Optional[str] = typer.Option(None, "--until", help="Compare against this snapshot instead of the current state"),
+    project_path: str = typer.Option(".", "--project-path", help="Path to the project"),
+    as_json: bool = typer.Option(False, "--json", help="Print the changes as JSON"),
+):
+    """List the context sections that differ from a snapshot."""
+    result = ProjectContextManager(project_path).changes_since(ref, until)
+    if 'error' in result:
+        err_console.print(f"[red]❌ {result['error']}[/red]")
+        raise typer.Exit(code=1)
+    
+    if as_json:
+        typer.echo(json.dumps(result, indent=2, default=str))
+        return
+    
+    if not result['changes']:
+        console.print("[green]No changes[/green]")
+    for change in result['changes']:
+        if change['change'] == 'modified':
+            console.print(f"[yellow]~ {change['path']}[/yellow]: {change['old']!r} → {change['new']!r}", highlight=False)
+        elif change['change'] == 'added':
+            console.print(f"[green]+ {change['path']}[/green]", highlight=False)
+        else:
+            console.print(f"[red]- {change['path']}[/red]", highlight=False)
+
+@context_app.command(name="update", help="Refresh CONTEXT.md from repository history")
+def update_context(
+    project_path: str = typer.Argument(default="."),
+    ai_insights: bool = typer.Option(False, "--ai-insights", help="Add AI-generated insights"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ignore cached AI responses"),
+):
+    """Update the project context document."""
+    context_manager = ContextManager(project_path)
+    context_manager.update_context(ai_insights=ai_insights, use_cache=not no_cache)
+    console.print(f"[green]✅ Context updated: {context_manager.context_file}[/green]")
+
+@context_app.command(name="ownership", help="Show lines per author from git blame")
+def show_ownership(
+    path: str = typer.Argument("", help="File or directory to report (defaults to the whole project)"),
+    project_path: str = typer.Option(".", "--project-path", help="Path to the project"),
+    depth: int = typer.Option(2, help="Directory depth of the rollup when no path is given"),
+    as_json: bool = typer.Option(False, "--json", help="Print the result as JSON"),
+):
+    """Report code ownership from the incremental blame index."""
+    context_manager = ContextManager(project_path)
+    owners = context_manager.get_ownership(path)
+    if as_json:
+        result = {'path': path, 'authors': owners}
+        if not path:
+            result['directories'] = context_manager.ownership.rollup(depth)
+        typer.echo(json.dumps(result, indent=2))
+        return
+    
+    if path:
+        total = sum(owners.values()) or 1
+        for author, lines in owners.items():
+            console.print(f"{author}: {lines:,} lines ({lines / total:.0%})", highlight=False)
+    else:
+        console.print(Markdown(OwnershipIndex.to_markdown(context_manager.ownership.rollup(depth))))
+
+@insights_app.command(name="recommend", help="Generate AI strategic recommendations")
+def recommend(
+    project_path: str = typer.Argument(default="."),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ignore cached AI responses"),
+    stream: bool = typer.Option(True, "--stream/--no-stream", help="Render recommendations as they arrive"),
+):
+    """Generate strategic recommendations from the current project context."""
+    context = ProjectContextManager(project_path).get_current_context()
+    insight_generator = AIInsightGenerator(project_path=project_path, use_cache=not no_cache)
+    
+    console.print(Markdown("## Strategic Recommendations"))
+    if stream:
+        _render_insight_stream(insight_generator, insight_generator.stream_strategic_recommendations(context))
+        return
+    
+    result = insight_generator.generate_strategic_recommendations(context)
+    if 'error' in result:
+        console.print(f"[red]Error generating recommendations: {result['error']}[/red]")
+        raise typer.Exit(code=1)
+    
+    for recommendation in result['strategic_recommendations']:
+        console.print(recommendation)
+
+@insights_app.command(name="trajectory", help="Analyze the development trajectory from git history")
+def trajectory(
+    project_path: str = typer.Argument(default="."),
+    max_records: int = typer.Option(52, help="Maximum number of history records sent to the model"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ignore cached AI responses"),
+):
+    """Analyze development trajectory using the git-derived history dataset."""
+    history_builder = HistoryDatasetBuilder(project_path)
+    historical_data = history_builder.to_records(history_builder.build(), max_records=max_records)
+    insight_generator = AIInsightGenerator(project_path=project_path, use_cache=not no_cache)
+    
+    console.print(Markdown("## Development Trajectory"))
+    _render_insight_stream(insight_generator, insight_generator.stream_development_trajectory(historical_data))
+
+def _render_insight_stream(insight_generator: AIInsightGenerator, chunks):
+    """Render streamed insights live, showing the line in progress below completed ones."""
+    insights = []
+    state = {'partial': ''}
+    
+    def render():
+        text = Text('\n'.join(insights))
+        partial = state['partial'].strip()
+        if partial:
+            text.append(('\n' if insights else '') + partial + ' …', style="dim")
+        elif not insights:
+            text.append("Waiting for the model …", style="dim")
+        return text
+    
+    with Live(render(), console=console, refresh_per_second=12, transient=False) as live:
+        def observed():
+            for chunk in chunks:
+                state['partial'] = (state['partial'] + chunk).rsplit('\n', 1)[-1]
+                live.update(render())
+                yield chunk
+        
+        try:
+            for insight in insight_generator.iter_insights(observed()):
+                insights.append(insight)
+                live.update(render())
+        except Exception as e:
+            console.print(f"[red]Error generating recommendations: {e}[/red]")
+            raise typer.Exit(code=1)
+        
+        state['partial'] = ''
+        live.update(render())
+
+@github_app.command(name="scan", help="Check the health of every repository in an organization")
+def scan_organization(
+    org: str = typer.Argument(..., help="GitHub organization to scan"),
+    workers: int = typer.Option(8, help="Maximum number of concurrent health checks"),
+    output: Optional[str] = typer.Option(None, help="Write JSON Lines results to this file instead of stdout"),
+    token: Optional[str] = typer.Option(None, envvar="GITHUB_TOKEN", help="GitHub token (defaults to $GITHUB_TOKEN)"),
+    restart: bool = typer.Option(False, "--restart", help="Ignore the checkpoint of a previous scan"),
+    include_archived: bool = typer.Option(False, "--include-archived", help="Also check archived repositories"),
+):
+    """Stream per-repository health results as JSON Lines, resuming from a checkpoint."""
+    scanner = OrganizationScanner(GitHubIntegration(token=token), max_workers=workers)
+    out = open(output, 'a') if output else None
+    scanned = failed = 0
+    
+    try:
+        for result in scanner.scan(org, restart=restart, include_archived=include_archived):
+            line = json.dumps(result)
+            if out:
+                out.write(line + '\n')
+                out.flush()
+            else:
+                typer.echo(line)
+            
+            scanned += 1
+            failed += 'error' in result
+            err_console.print(f"[dim]{scanned} scanned, {failed} failed: {result['repository']}[/dim]")
+    finally:
+        if out:
+            out.close()
+    
+    err_console.print(f"[green]✅ Scanned {scanned} repositories ({failed} failed). "
+                      f"Checkpoint: {scanner.checkpoint_path(org)}[/green]")
+
+@workspace_app.command(name="run", help="Run context operations across many repositories")
+def run_workspace(
+    root: Optional[str] = typer.Argument(None, help="Directory containing the repositories"),
+    manifest: Optional[str] = typer.Option(None, help="YAML/JSON manifest listing repository paths"),
+    operation: Optional[List[str]] = typer.Option(None, "--op", help=f"Operation to run (repeatable): {', '.join(OPERATIONS)}"),
+    workers: Optional[int] = typer.Option(None, help="Maximum number of repositories processed in parallel"),
+    output: Optional[str] = typer.Option(None, help="Write the aggregated JSON report to this file"),
+):
+    """Process every repository of a workspace in parallel and report the aggregate."""
+    if manifest:
+        workspace = Workspace.from_manifest(manifest, max_workers=workers)
+    else:
+        workspace = Workspace.from_root(root or ".", max_workers=workers)
+    
+    total = len(workspace.repositories)
+    completed = 0
+    
+    def progress(result):
+        nonlocal completed
+        completed += 1
+        status = "[green]ok[/green]" if result['ok'] else f"[red]failed: {'; '.join(result['errors'].values())}[/red]"
+        err_console.print(f"[dim]{completed}/{total}[/dim] {result['path']} {status}")
+    
+    report = workspace.run(operation or list(DEFAULT_OPERATIONS), progress=progress)
+    
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+    else:
+        typer.echo(json.dumps(report['summary'], indent=2, default=str))
+    
+    summary = report['summary']
+    err_console.print(f"[bold]Processed {summary['repositories']} repositories: "
+                      f"{summary['succeeded']} succeeded, {summary['failed']} failed[/bold]")
+    if summary['failed']:
+        raise typer.Exit(code=1)
+
 @deps_app.command(name="check", help="Check project dependencies")
 def check_dependencies(
     project_path: str = typer.Argument(default="."),
+    offline: bool = typer.Option(False, "--offline", help="Skip the PyPI update check"),
 ):
     """Check and report on project dependencies."""
     dep_tracker = DependencyTracker(project_path)
     
     # Check dependencies
-    updates = dep_tracker.check_dependencies()
+    updates = dep_tracker.check_dependencies(offline=offline)
     
     console.print(Markdown("## Dependency Updates"))
     console.print(json.dumps(updates, indent=2))
 
+@deps_app.command(name="plan", help="Plan a compatible set of upgrades")
+def plan_upgrades(
+    project_path: str = typer.Argument(default="."),
+    offline: bool = typer.Option(False, "--offline", help="Use cached package metadata only"),
+    python_version: Optional[str] = typer.Option(None, "--python", help="Python version to plan for"),
+    as_json: bool = typer.Option(False, "--json", help="Print the plan as JSON"),
+):
+    """Compute upgrades that satisfy each other's requirements and explain what blocks the rest."""
+    dep_tracker = DependencyTracker(project_path)
+    plan = dep_tracker.plan_upgrades(offline=offline, python_version=python_version)
+    if 'error' in plan:
+        err_console.print(f"[red]❌ {plan['error']}[/red]")
+        raise typer.Exit(code=1)
+    
+    if as_json:
+        typer.echo(json.dumps(plan, indent=2))
+        return
+    
+    console.print(Markdown("## Upgrade Plan"))
+    for name, upgrade in plan['upgrades'].items():
+        console.print(f"[green]{name}[/green] {upgrade['current']} → {upgrade['target']}")
+    for name, blocked in plan['blocked'].items():
+        reasons = "; ".join(f"{b['package']} {b['version']} requires {b['requirement']}" for b in blocked['blocked_by'])
+        console.print(f"[yellow]{name}[/yellow] held at {blocked['target']} (latest {blocked['latest']}): {reasons}",
+                      highlight=False)
+    for name, version in plan['skipped'].items():
+        console.print(f"[dim]{name}[/dim] skipped: installed version {version!r} is not PEP 440", highlight=False)
+    stats = plan['stats']
+    err_console.print(f"[dim]Solved in {stats['seconds'] * 1000:.0f} ms "
+                      f"({stats['steps']} candidates tried, {stats['backtracks']} backtracks)[/dim]")
+
+@deps_app.command(name="import-advisories", help="Import an OSV advisory snapshot for offline vulnerability checks")
+def import_advisories(
+    snapshot: str = typer.Argument(..., help="OSV snapshot: zip archive, directory, JSON or JSON Lines file"),
+    project_path: str = typer.Option(".", help="Project whose advisory database to update"),
+):
+    """Stream an OSV snapshot (e.g. PyPI/all.zip) into the local advisory database."""
+    dep_tracker = DependencyTracker(project_path)
+    result = dep_tracker.import_advisories(snapshot)
+    if 'error' in result:
+        err_console.print(f"[red]❌ {result['error']}[/red]")
+        raise typer.Exit(code=1)
+    
+    database = dep_tracker.advisories.stats()
+    console.print(f"[green]🛡️ Imported {result['added']} new and {result['updated']} updated advisories "
+                  f"({result['unchanged']} unchanged, {result['skipped']} skipped)[/green]")
+    console.print(f"Database holds {database['advisories']} advisories for {database['packages']} packages")
+
 @code_app.command(name="generate", help="Generate code boilerplate")
 def generate_code(
     template: str = typer.Argument(..., help="Type of code template to generate"),
@@ -82,6 +421,92 @@ def generate_code(
             f.write(generated_code)
         console.print(f"[green]💾 Code saved to {output}[/green]")
 
+@code_app.command(name="search", help="Search project files or symbol definitions")
+def search_code(
+    query: str = typer.Argument(..., help="Substring, regular expression or symbol name"),
+    project_path: str = typer.Option(".", help="Project to search"),
+    regex: bool = typer.Option(False, "--regex", "-e", help="Treat the query as a regular expression"),
+    ignore_case: bool = typer.Option(False, "--ignore-case", "-i", help="Match case-insensitively"),
+    symbol: bool = typer.Option(False, "--symbol", "-s", help="Find class/function definitions by exact name"),
+    limit: int = typer.Option(100, help="Maximum number of results"),
+    as_json: bool = typer.Option(False, "--json", help="Print results as JSON"),
+    refresh: bool = typer.Option(True, "--refresh/--no-refresh", help="Rescan changed files before searching"),
+):
+    """Search the project through its persistent trigram and symbol index."""
+    if regex and not symbol:
+        try:
+            re.compile(query)
+        except re.error as e:
+            err_console.print(f"[red]❌ Invalid regular expression {query!r}: {e}[/red]")
+            raise typer.Exit(code=1)
+    
+    code_generator = CodeGenerator(project_path)
+    try:
+        if symbol:
+            results = code_generator.find_symbol(query, refresh=refresh)[:limit]
+        else:
+            results = code_generator.search_code(query, regex=regex, ignore_case=ignore_case, limit=limit,
+                                                 refresh=refresh)
+    except IndexFormatError as e:
+        err_console.print(f"[red]❌ {e}; run the search without --no-refresh to rebuild the index[/red]")
+        raise typer.Exit(code=1)
+    
+    if as_json:
+        typer.echo(json.dumps(results, indent=2))
+        return
+    
+    for result in results:
+        label = f"{result['kind']} {result['name']}" if symbol else result['text']
+        console.print(f"[cyan]{result['path']}[/cyan]:[yellow]{result['line']}[/yellow]: {label}", highlight=False)
+    err_console.print(f"[dim]{len(results)} result(s)[/dim]")
+
+@code_app.command(name="context", help="Find the functions and classes most relevant to a query or diff")
+def relevant_code(
+    query: Optional[str] = typer.Argument(None, help="Free-text query (defaults to the diff against --diff)"),
+    project_path: str = typer.Option(".", help="Project to search"),
+    diff: Optional[str] = typer.Option(None, "--diff", help="Use the diff between this revision and the working tree as the query"),
+    top: int = typer.Option(5, "--top", "-k", help="Number of chunks"),
+    as_json: bool = typer.Option(False, "--json", help="Print results as JSON"),
+):
+    """Rank code chunks with the local BM25 index, as used for AI prompt context."""
+    if diff:
+        import git
+        query = diff_query(git.Repo(project_path).git.diff(diff)) + '\n' + (query or '')
+    if not query or not query.strip():
+        err_console.print("[red]❌ Provide a query or --diff[/red]")
+        raise typer.Exit(code=1)
+    
+    results = CodeGenerator(project_path).relevant_code(query, k=top)
+    if as_json:
+        typer.echo(json.dumps(results, indent=2))
+        return
+    
+    for result in results:
+        console.print(f"[cyan]{result['path']}[/cyan]:[yellow]{result['start']}-{result['end']}[/yellow] "
+                      f"{result['kind']} {result['name']} [dim]({result['score']:.2f})[/dim]", highlight=False)
+
+@code_app.command(name="clones", help="Find duplicated and near-duplicate code")
+def find_clones(
+    project_path: str = typer.Argument(default="."),
+    limit: int = typer.Option(20, help="Maximum number of clone groups"),
+    as_json: bool = typer.Option(False, "--json", help="Print clone groups as JSON"),
+):
+    """Report clone groups found by AST hashing and token winnowing."""
+    result = CodeGenerator(project_path).find_clones()
+    groups = result['groups'][:limit]
+    if as_json:
+        typer.echo(json.dumps(groups, indent=2))
+        return
+    
+    for group in groups:
+        label = 'exact' if group['kind'] == 'exact' else f"near, {group['similarity']:.0%} similar"
+        console.print(f"[bold]{group['lines']} lines ({label})[/bold]", highlight=False)
+        for location in group['locations']:
+            console.print(f"  [cyan]{location['path']}[/cyan]:[yellow]{location['start']}-{location['end']}[/yellow] "
+                          f"{location['name'] or ''}", highlight=False)
+    err_console.print(f"[dim]{len(result['groups'])} clone group(s); {result['stats']['parsed']} file(s) analyzed, "
+                      f"{result['stats']['reused']} cached[/dim]")
+
 def main():
     """Main entry point for the CLI application."""
     app()
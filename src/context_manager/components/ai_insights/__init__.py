@@ -1 +1,5 @@
 from .insight_generator import AIInsightGenerator
+from .context_packer import ContextPacker
+from .response_cache import ResponseCache
+from .ai_client import AIClient, FakeAIBackend, get_shared_client
+from .local_insights import LocalInsightEngine
@@ -0,0 +1,414 @@
+import queue
+import asyncio
+import concurrent.futures
+import random
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Union
+import anthropic
+
+from .response_cache import ResponseCache
+
+DEFAULT_MODEL = "claude-3-opus-20240229"
+
+
+class RateLimitExceeded(Exception):
+    """
+    Raised by backends when the provider asks the caller to slow down.
+    """
+    def __init__(self, message: str = 'Rate limit exceeded', retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+# Errors worth retrying with backoff; anything else is surfaced immediately
+RETRYABLE_ERRORS = (
+    RateLimitExceeded,
+    anthropic.RateLimitError,
+    anthropic.APIConnectionError,
+    anthropic.InternalServerError,
+)
+
+
+class AnthropicBackend:
+    """
+    Sends prompts to the Anthropic API through a single reused async client.
+    """
+    def __init__(self, api_key: Optional[str] = None):
+        """
+        Initialize the backend.
+
+        :param api_key: Optional Anthropic API key (defaults to ANTHROPIC_API_KEY)
+        """
+        self.api_key = api_key
+        self._client = None
+
+    async def create(self, model: str, prompt: str, max_tokens: int) -> str:
+        """
+        Send a single-turn prompt and return the response text.
+
+        :param model: Model name
+        :param prompt: Prompt text
+        :param max_tokens: Maximum tokens in the response
+        :return: Response text
+        """
+        response = await self._get_client().messages.create(
+            model=model,
+            max_tokens=max_tokens,
+            messages=[
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ]
+        )
+        return response.content[0].text
+
+    async def stream(self, model: str, prompt: str, max_tokens: int) -> AsyncIterator[str]:
+        """
+        Send a single-turn prompt and yield response text as it arrives.
+
+        :param model: Model name
+        :param prompt: Prompt text
+        :param max_tokens: Maximum tokens in the response
+        :return: Async iterator of text deltas
+        """
+        async with self._get_client().messages.stream(
+            model=model,
+            max_tokens=max_tokens,
+            messages=[
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ]
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
+
+    def _get_client(self) -> Any:
+        """Create the async API client on first use."""
+        if self._client is None:
+            # Retries are handled by AIClient so backoff is applied consistently
+            self._client = anthropic.AsyncAnthropic(api_key=self.api_key, max_retries=0)
+        return self._client
+
+
+class FakeAIBackend:
+    """
+    Offline backend returning canned responses, for tests and dry runs.
+
+    Records every prompt and the peak number of concurrent requests so
+    concurrency and retry behavior can be checked without the network.
+    """
+    def __init__(self, responses: Union[Dict[str, str], Callable[[str], str], None] = None,
+                 default_response: str = "- Example insight", latency: float = 0.0,
+                 rate_limit_failures: int = 0, chunk_size: int = 16):
+        """
+        Initialize the fake backend.
+
+        :param responses: Mapping of prompt substring to response, or a callable taking the prompt
+        :param default_response: Response used when no mapping entry matches
+        :param latency: Simulated request latency in seconds
+        :param rate_limit_failures: Number of initial requests rejected as rate limited
+        :param chunk_size: Characters per streamed chunk
+        """
+        self.responses = responses or {}
+        self.default_response = default_response
+        self.latency = latency
+        self.rate_limit_failures = rate_limit_failures
+        self.chunk_size = chunk_size
+        self.prompts: List[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def create(self, model: str, prompt: str, max_tokens: int) -> str:
+        """
+        Return a canned response after the simulated latency.
+
+        :param model: Model name
+        :param prompt: Prompt text
+        :param max_tokens: Maximum tokens in the response
+        :return: Response text
+        """
+        self.prompts.append(prompt)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            self._check_rate_limit()
+            return self._response_for(prompt)
+        finally:
+            self.in_flight -= 1
+
+    async def stream(self, model: str, prompt: str, max_tokens: int) -> AsyncIterator[str]:
+        """
+        Yield a canned response in chunks, spreading the latency across them.
+
+        :param model: Model name
+        :param prompt: Prompt text
+        :param max_tokens: Maximum tokens in the response
+        :return: Async iterator of text chunks
+        """
+        self.prompts.append(prompt)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            self._check_rate_limit()
+            response = self._response_for(prompt)
+            chunks = [response[i:i + self.chunk_size] for i in range(0, len(response), self.chunk_size)]
+            for chunk in chunks:
+                await asyncio.sleep(self.latency / max(len(chunks), 1))
+                yield chunk
+        finally:
+            self.in_flight -= 1
+
+    def _check_rate_limit(self):
+        """Reject the request if simulated rate-limit failures remain."""
+        if self.rate_limit_failures > 0:
+            self.rate_limit_failures -= 1
+            raise RateLimitExceeded(retry_after=0)
+
+    def _response_for(self, prompt: str) -> str:
+        """Pick the canned response for a prompt."""
+        if callable(self.responses):
+            return self.responses(prompt)
+        for fragment, response in self.responses.items():
+            if fragment in prompt:
+                return response
+        return self.default_response
+
+
+class AIClient:
+    """
+    Shared async AI client with bounded concurrency, retry/backoff and caching.
+
+    Synchronous callers go through run() / complete_sync(), which execute
+    coroutines on a persistent background event loop so the underlying HTTP
+    connections are reused across calls.
+    """
+    def __init__(self, backend: Any = None, api_key: Optional[str] = None, model: str = DEFAULT_MODEL,
+                 max_concurrency: int = 4, max_retries: int = 5, base_delay: float = 1.0,
+                 max_delay: float = 30.0):
+        """
+        Initialize the AI client.
+
+        :param backend: Backend sending requests (defaults to the Anthropic API)
+        :param api_key: Optional Anthropic API key for the default backend
+        :param model: Default model name
+        :param max_concurrency: Maximum number of requests in flight
+        :param max_retries: Retries for rate-limited or transient failures
+        :param base_delay: Initial backoff delay in seconds
+        :param max_delay: Upper bound for a single backoff delay
+        """
+        self.backend = backend or AnthropicBackend(api_key=api_key)
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._semaphores: Dict[int, asyncio.Semaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+
+    async def complete(self, prompt: str, max_tokens: int = 1000, model: Optional[str] = None,
+                       cache: Optional[ResponseCache] = None, use_cache: bool = True) -> str:
+        """
+        Send a prompt, retrying with backoff when rate limited.
+
+        :param prompt: Prompt text
+        :param max_tokens: Maximum tokens in the response
+        :param model: Model name (defaults to the client model)
+        :param cache: Optional response cache to consult and populate
+        :param use_cache: Whether to serve a cached response
+        :return: Response text
+        """
+        model = model or self.model
+        cache_key = cache.make_key(model, prompt, {'max_tokens': max_tokens}) if cache else None
+        if cache and use_cache:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        async with self._semaphore():
+            text = await self._with_retries(lambda: self.backend.create(model, prompt, max_tokens))
+
+        if cache:
+            cache.put(cache_key, text, model=model)
+        return text
+
+    async def complete_many(self, prompts: Sequence[str], max_tokens: int = 1000,
+                            cache: Optional[ResponseCache] = None, use_cache: bool = True) -> List[str]:
+        """
+        Send several prompts concurrently.
+
+        :param prompts: Prompt texts
+        :param max_tokens: Maximum tokens per response
+        :param cache: Optional response cache
+        :param use_cache: Whether to serve cached responses
+        :return: Response texts in prompt order
+        """
+        return list(await asyncio.gather(*[
+            self.complete(prompt, max_tokens=max_tokens, cache=cache, use_cache=use_cache)
+            for prompt in prompts
+        ]))
+
+    async def stream(self, prompt: str, max_tokens: int = 1000, model: Optional[str] = None,
+                     cache: Optional[ResponseCache] = None, use_cache: bool = True) -> AsyncIterator[str]:
+        """
+        Send a prompt and yield response text incrementally.
+
+        A cached response is yielded as a single chunk. Retries only happen
+        before the first chunk arrives, so callers never see duplicated text.
+
+        :param prompt: Prompt text
+        :param max_tokens: Maximum tokens in the response
+        :param model: Model name (defaults to the client model)
+        :param cache: Optional response cache to consult and populate
+        :param use_cache: Whether to serve a cached response
+        :return: Async iterator of text chunks
+        """
+        model = model or self.model
+        cache_key = cache.make_key(model, prompt, {'max_tokens': max_tokens}) if cache else None
+        if cache and use_cache:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+
+        chunks: List[str] = []
+        async with self._semaphore():
+            attempt = 0
+            while True:
+                try:
+                    async for text in self.backend.stream(model, prompt, max_tokens):
+                        chunks.append(text)
+                        yield text
+                    break
+                except RETRYABLE_ERRORS as e:
+                    if chunks or attempt >= self.max_retries:
+                        raise
+                    await asyncio.sleep(self._backoff_delay(attempt, e))
+                    attempt += 1
+
+        if cache:
+            cache.put(cache_key, ''.join(chunks), model=model)
+
+    def complete_sync(self, prompt: str, **kwargs) -> str:
+        """
+        Blocking variant of complete() for synchronous callers.
+
+        :param prompt: Prompt text
+        :return: Response text
+        """
+        return self.run(self.complete(prompt, **kwargs))
+
+    def run(self, coroutine: Awaitable[Any]) -> Any:
+        """
+        Run a coroutine on the client's background event loop and wait for it.
+
+        :param coroutine: Coroutine to execute
+        :return: Coroutine result
+        """
+        return self.submit(coroutine).result()
+
+    def submit(self, coroutine: Awaitable[Any]) -> concurrent.futures.Future:
+        """
+        Schedule a coroutine on the client's background event loop without waiting.
+
+        Cancelling the returned future cancels the underlying request.
+
+        :param coroutine: Coroutine to execute
+        :return: Future resolving to the coroutine result
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self._ensure_loop())
+
+    def iterate(self, stream: AsyncIterator[Any]) -> Iterator[Any]:
+        """
+        Consume an async iterator on the background loop as a blocking iterator.
+
+        The async iterator runs to completion even if the caller stops early,
+        so streamed responses are still cached.
+
+        :param stream: Async iterator to consume
+        :return: Iterator over the same items
+        """
+        items: queue.Queue = queue.Queue()
+        finished = object()
+
+        async def pump():
+            try:
+                async for item in stream:
+                    items.put((True, item))
+            except BaseException as e:
+                items.put((False, e))
+                return
+            items.put((True, finished))
+
+        asyncio.run_coroutine_threadsafe(pump(), self._ensure_loop())
+        while True:
+            ok, item = items.get()
+            if not ok:
+                raise item
+            if item is finished:
+                return
+            yield item
+
+    async def _with_retries(self, request: Callable[[], Awaitable[str]]) -> str:
+        """Execute a request, backing off exponentially on retryable errors."""
+        attempt = 0
+        while True:
+            try:
+                return await request()
+            except RETRYABLE_ERRORS as e:
+                if attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(self._backoff_delay(attempt, e))
+                attempt += 1
+
+    def _backoff_delay(self, attempt: int, error: Exception) -> float:
+        """Honor a server-provided Retry-After, otherwise use jittered exponential backoff."""
+        retry_after = getattr(error, 'retry_after', None)
+        if retry_after is None:
+            headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+            retry_after = headers.get('retry-after')
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.max_delay)
+            except ValueError:
+                pass
+
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        """Concurrency limiter for the running event loop."""
+        loop_id = id(asyncio.get_running_loop())
+        if loop_id not in self._semaphores:
+            self._semaphores[loop_id] = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphores[loop_id]
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background event loop on first use."""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=self._loop.run_forever, name='ai-client-loop', daemon=True)
+                thread.start()
+            return self._loop
+
+
+_shared_clients: Dict[Optional[str], AIClient] = {}
+_shared_clients_lock = threading.Lock()
+
+
+def get_shared_client(api_key: Optional[str] = None) -> AIClient:
+    """
+    Return the process-wide AI client for an API key, creating it on first use.
+
+    :param api_key: Optional Anthropic API key (None uses ANTHROPIC_API_KEY)
+    :return: Shared AI client
+    """
+    with _shared_clients_lock:
+        if api_key not in _shared_clients:
+            _shared_clients[api_key] = AIClient(api_key=api_key)
+        return _shared_clients[api_key]
@@ -0,0 +1,211 @@
+import re
+import json
+import math
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+# Default token budget reserved for project context inside a prompt
+DEFAULT_CONTEXT_TOKENS = 4000
+
+# Budget of the context-update insight prompt, which runs on every update
+UPDATE_CONTEXT_TOKENS = DEFAULT_CONTEXT_TOKENS // 2
+
+# Budget of the onboarding strategy prompt, whose answers are small
+ONBOARDING_CONTEXT_TOKENS = DEFAULT_CONTEXT_TOKENS // 4
+
+# Share of the prompt budget that retrieved code may take
+CODE_CONTEXT_SHARE = 0.4
+
+# Number of retrieved code chunks offered to the packer per prompt
+CODE_CONTEXT_CHUNKS = 8
+
+# Keys whose values identify when an item happened, most specific first
+TIMESTAMP_KEYS = (
+    'timestamp', 'committed_at', 'completed_at', 'updated_at', 'last_updated',
+    'created_at', 'added_at', 'date', 'period'
+)
+
+# Progressively tighter (max list items, max string chars) limits tried while packing
+DETAIL_LEVELS: Sequence[Tuple[Optional[int], Optional[int]]] = (
+    (None, None),
+    (50, 500),
+    (20, 240),
+    (10, 120),
+    (5, 80),
+    (3, 48),
+    (1, 24),
+)
+
+
+class ContextPacker:
+    """
+    Serializes project context compactly and fits it into a prompt token budget.
+
+    Context is packed at the highest level of detail that fits: lists keep
+    their most recent items first and summarize the rest, long strings are
+    truncated, and empty values are dropped.
+    """
+    def __init__(self, max_tokens: int = DEFAULT_CONTEXT_TOKENS, chars_per_token: float = 4.0,
+                 priority_keys: Optional[Sequence[str]] = None):
+        """
+        Initialize the context packer.
+
+        :param max_tokens: Default token budget for packed context
+        :param chars_per_token: Average characters per token used for estimates
+        :param priority_keys: Keys placed first in packed objects as high-signal fields
+        """
+        self.max_tokens = max_tokens
+        self.chars_per_token = chars_per_token
+        self.priority_keys = tuple(priority_keys or (
+            'name', 'title', 'summary', 'status', 'current_phase', 'description', 'error'
+        ))
+
+    def estimate_tokens(self, text: str) -> int:
+        """
+        Estimate the number of tokens a piece of text will use.
+
+        :param text: Text to estimate
+        :return: Approximate token count
+        """
+        return math.ceil(len(text) / self.chars_per_token)
+
+    def serialize(self, data: Any) -> str:
+        """
+        Serialize data as compact JSON without indentation whitespace.
+
+        :param data: Data to serialize
+        :return: Compact JSON string
+        """
+        return json.dumps(data, separators=(',', ':'), ensure_ascii=False, default=str)
+
+    def pack(self, data: Any, max_tokens: Optional[int] = None) -> str:
+        """
+        Pack data into compact JSON that fits the token budget.
+
+        :param data: Context data to pack
+        :param max_tokens: Token budget (defaults to the packer budget)
+        :return: Packed context string
+        """
+        budget = self.max_tokens if max_tokens is None else max_tokens
+        reduced: Any = None
+        packed = ''
+
+        for max_items, max_chars in DETAIL_LEVELS:
+            reduced = self._reduce(data, max_items, max_chars)
+            packed = self.serialize(reduced)
+            if self.estimate_tokens(packed) <= budget:
+                return packed
+
+        # Last resort: drop the lowest-priority entries of the tightest
+        # representation until it fits, so the result stays valid JSON
+        while self.estimate_tokens(packed) > budget and self._drop_last(reduced):
+            packed = self.serialize(reduced)
+        return packed
+
+    def pack_prompt(self, instructions: str, data: Any, max_tokens: Optional[int] = None,
+                    placeholder: str = '{context}', code_chunks: Optional[List[Dict[str, Any]]] = None,
+                    code_placeholder: str = '{code}') -> str:
+        """
+        Build a prompt whose instructions plus packed context fit the token budget.
+
+        Retrieved code chunks, if any, fill the code placeholder first with
+        at most CODE_CONTEXT_SHARE of the budget; the context gets the rest.
+
+        :param instructions: Prompt text containing the context placeholder
+        :param data: Context data to pack into the placeholder
+        :param max_tokens: Token budget for the whole prompt
+        :param placeholder: Placeholder replaced with the packed context
+        :param code_chunks: Retrieved code chunks, most relevant first
+        :param code_placeholder: Placeholder replaced with the code section (removed when there is none)
+        :return: Prompt text
+        """
+        budget = self.max_tokens if max_tokens is None else max_tokens
+        code = self.pack_code(code_chunks or [], int(budget * CODE_CONTEXT_SHARE)) \
+            if code_placeholder in instructions else ''
+        instructions_tokens = self.estimate_tokens(instructions.replace(placeholder, '').replace(code_placeholder, ''))
+        packed = self.pack(data, max(budget - instructions_tokens - self.estimate_tokens(code), 0))
+
+        # Substitute both placeholders in one pass so neither value is rescanned
+        values = {placeholder: packed, code_placeholder: code}
+        return re.sub('|'.join(map(re.escape, values)), lambda match: values[match.group()], instructions)
+
+    def pack_code(self, chunks: List[Dict[str, Any]], max_tokens: int) -> str:
+        """
+        Render retrieved code chunks as a prompt section within a token budget.
+
+        Chunks are taken in order; one that does not fit is skipped so a
+        smaller, less relevant chunk can still use the remaining budget.
+
+        :param chunks: Chunks with path, start, end, name and code
+        :param max_tokens: Token budget for the section
+        :return: Code section, or an empty string when no chunk fits
+        """
+        heading = '\n\nRelevant code:\n'
+        used = self.estimate_tokens(heading)
+        blocks = []
+        for chunk in chunks:
+            block = f"# {chunk['path']}:{chunk['start']}-{chunk['end']} ({chunk['name']})\n{chunk['code']}\n"
+            tokens = self.estimate_tokens(block)
+            if used + tokens <= max_tokens:
+                blocks.append(block)
+                used += tokens
+        return heading + '\n'.join(blocks) if blocks else ''
+
+    def _reduce(self, data: Any, max_items: Optional[int], max_chars: Optional[int]) -> Any:
+        """Reduce data to the given level of detail."""
+        if isinstance(data, dict):
+            reduced = {}
+            for key in self._ordered_keys(data):
+                value = self._reduce(data[key], max_items, max_chars)
+                if value not in (None, '', [], {}):
+                    reduced[str(key)] = value
+            return reduced
+
+        if isinstance(data, (list, tuple, set)):
+            items = self._by_recency(list(data))
+            reduced_items = [self._reduce(item, max_items, max_chars) for item in items[:max_items]]
+            omitted = len(items) - len(reduced_items)
+            if omitted > 0:
+                reduced_items.append(f"… {omitted} more item(s) omitted")
+            return reduced_items
+
+        if isinstance(data, str) and max_chars is not None and len(data) > max_chars:
+            return data[:max_chars - 1] + '…'
+
+        return data
+
+    def _drop_last(self, value: Any) -> bool:
+        """
+        Remove the last entry of a reduced container in place.
+
+        Keys and items are ordered by priority and recency, so the last one
+        matters least. A container holding a single entry is emptied from the
+        inside first.
+
+        :return: False when there is nothing left to remove
+        """
+        if isinstance(value, dict) and value:
+            last = list(value)[-1]
+            if len(value) > 1 or not self._drop_last(value[last]):
+                del value[last]
+            return True
+        if isinstance(value, list) and value:
+            if len(value) > 1 or not self._drop_last(value[0]):
+                value.pop()
+            return True
+        return False
+
+    def _ordered_keys(self, data: Dict[Any, Any]) -> List[Any]:
+        """Order keys so high-signal fields come first."""
+        priority = [key for key in self.priority_keys if key in data]
+        return priority + [key for key in data if key not in priority]
+
+    @staticmethod
+    def _by_recency(items: List[Any]) -> List[Any]:
+        """Sort timestamped dict items newest first, leaving other lists untouched."""
+        if not items or not all(isinstance(item, dict) for item in items):
+            return items
+
+        for key in TIMESTAMP_KEYS:
+            if all(key in item for item in items):
+                return sorted(items, key=lambda item: str(item[key]), reverse=True)
+        return items
@@ -1,57 +1,150 @@
 import os
-import json
-from typing import Dict, List, Any
-import anthropic
+import asyncio
+from typing import Dict, Iterable, Iterator, List, Any, Optional
 from datetime import datetime
 
+from ..code_analysis.code_retrieval import CodeRetrievalIndex
+from .ai_client import AIClient, get_shared_client
+from .context_packer import CODE_CONTEXT_CHUNKS, ContextPacker
+from .local_insights import LocalInsightEngine
+from .response_cache import ResponseCache
+
+STRATEGIC_PROMPT = """Analyze the following project context (compact JSON) and provide strategic insights.
+Findings from local heuristics are listed under "local_findings"; synthesize them rather than repeating them:
+
+{context}{code}
+
+Please provide:
+1. Strategic development recommendations
+2. Potential architectural improvements
+3. Risk assessment and mitigation strategies
+4. Technology stack optimization suggestions
+5. Development process enhancements"""
+
+TRAJECTORY_PROMPT = """Analyze the following project development history (compact JSON, with local trend findings under "local_findings"):
+
+{context}{code}
+
+Please provide:
+1. Development pattern analysis
+2. Potential future challenges
+3. Productivity trend insights
+4. Recommendations for process improvement
+5. Predictive development trajectory"""
+
 class AIInsightGenerator:
     """
     Generates AI-powered insights and recommendations for project development.
     """
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, packer: Optional[ContextPacker] = None,
+                 client: Optional[AIClient] = None, project_path: Optional[str] = None,
+                 use_cache: bool = True, local_engine: Optional[LocalInsightEngine] = None,
+                 retriever: Optional[CodeRetrievalIndex] = None):
         """
         Initialize the AI Insight Generator.
         
         :param api_key: Optional Anthropic API key
+        :param packer: Optional context packer controlling the prompt token budget
+        :param client: Optional AI client (defaults to the shared client for the API key)
+        :param project_path: Project whose .context/ directory holds the response cache
+        :param use_cache: Whether to serve cached responses (fresh responses are always stored)
+        :param local_engine: Optional local heuristic engine used as first stage and fallback
+        :param retriever: Optional code retrieval index selecting source code relevant to each prompt
         """
-        self.client = anthropic.Anthropic(api_key=api_key)
+        # Without a client or API key, insights come from local heuristics only
+        self.offline = client is None and not (api_key or os.getenv('ANTHROPIC_API_KEY'))
+        self.client = client or get_shared_client(api_key)
         self.model = "claude-3-opus-20240229"
+        self.packer = packer or ContextPacker()
+        self.cache = ResponseCache(os.path.join(project_path or os.getcwd(), '.context', 'ai_cache'))
+        self.use_cache = use_cache
+        self.local_engine = local_engine or LocalInsightEngine(project_path or os.getcwd())
+        self.retriever = retriever or CodeRetrievalIndex(project_path or os.getcwd())
 
     def generate_strategic_recommendations(self, project_context: Dict[str, Any]) -> Dict[str, Any]:
         """
         Generate strategic recommendations based on project context.
         
+        :param project_context: Current project context
+        :return: AI-generated strategic insights
+        """
+        return self.client.run(self.generate_strategic_recommendations_async(project_context))
+
+    def analyze_development_trajectory(self, historical_data: List[Dict]) -> Dict[str, Any]:
+        """
+        Analyze project development trajectory and predict potential challenges.
+        
+        :param historical_data: Historical project development data
+        :return: Development trajectory analysis
+        """
+        return self.client.run(self.analyze_development_trajectory_async(historical_data))
+
+    def generate_insights(self, project_context: Dict[str, Any], historical_data: List[Dict]) -> Dict[str, Any]:
+        """
+        Run strategic recommendations and trajectory analysis concurrently.
+        
+        :param project_context: Current project context
+        :param historical_data: Historical project development data
+        :return: Both analyses keyed by 'strategic' and 'trajectory'
+        """
+        async def gather():
+            return await asyncio.gather(
+                self.generate_strategic_recommendations_async(project_context),
+                self.analyze_development_trajectory_async(historical_data)
+            )
+        
+        strategic, trajectory = self.client.run(gather())
+        return {
+            'strategic': strategic,
+            'trajectory': trajectory
+        }
+
+    def stream_strategic_recommendations(self, project_context: Dict[str, Any]) -> Iterator[str]:
+        """
+        Stream strategic recommendations as text while the model generates them.
+        
+        :param project_context: Current project context
+        :return: Iterator of response text chunks
+        """
+        findings = self.local_engine.analyze()
+        if self.offline:
+            return iter([LocalInsightEngine.to_markdown(findings)])
+        
+        prompt = self._build_prompt(STRATEGIC_PROMPT, self._with_findings(project_context, findings))
+        return self.client.iterate(self._stream(prompt))
+
+    def stream_development_trajectory(self, historical_data: List[Dict]) -> Iterator[str]:
+        """
+        Stream development trajectory analysis as text while the model generates it.
+        
+        :param historical_data: Historical project development data
+        :return: Iterator of response text chunks
+        """
+        findings = self.local_engine.analyze_trajectory(historical_data)
+        if self.offline:
+            return iter([LocalInsightEngine.to_markdown(findings)])
+        
+        prompt = self._build_prompt(TRAJECTORY_PROMPT, self._with_findings({'history': historical_data}, findings))
+        return self.client.iterate(self._stream(prompt))
+
+    async def generate_strategic_recommendations_async(self, project_context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async variant of generate_strategic_recommendations.
+        
         :param project_context: Current project context
         :return: AI-generated strategic insights
         """
         try:
-            # Convert project context to a formatted string
-            context_summary = json.dumps(project_context, indent=2)
+            # Local heuristics run first; the model synthesizes their findings
+            findings = self.local_engine.analyze()
+            if self.offline:
+                return self._local_result('strategic_recommendations', findings)
             
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=1000,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": f"""
-                        Analyze the following project context and provide strategic insights:
-                        
-                        {context_summary}
-                        
-                        Please provide:
-                        1. Strategic development recommendations
-                        2. Potential architectural improvements
-                        3. Risk assessment and mitigation strategies
-                        4. Technology stack optimization suggestions
-                        5. Development process enhancements
-                        """
-                    }
-                ]
-            )
+            # Pack project context and relevant code into the prompt token budget
+            prompt = self._build_prompt(STRATEGIC_PROMPT, self._with_findings(project_context, findings))
             
-            # Parse AI response
-            insights = response.content[0].text
+            # Request insights (served from cache when the prompt is unchanged)
+            insights = await self._complete(prompt)
             
             return {
                 'strategic_recommendations': self._parse_insights(insights),
@@ -65,41 +158,23 @@ class AIInsightGenerator:
                 'timestamp': datetime.now().isoformat()
             }
 
-    def analyze_development_trajectory(self, historical_data: List[Dict]) -> Dict[str, Any]:
+    async def analyze_development_trajectory_async(self, historical_data: List[Dict]) -> Dict[str, Any]:
         """
-        Analyze project development trajectory and predict potential challenges.
+        Async variant of analyze_development_trajectory.
         
         :param historical_data: Historical project development data
         :return: Development trajectory analysis
         """
         try:
-            # Convert historical data to a formatted string
-            history_summary = json.dumps(historical_data, indent=2)
+            findings = self.local_engine.analyze_trajectory(historical_data)
+            if self.offline:
+                return self._local_result('trajectory_insights', findings)
             
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=1000,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": f"""
-                        Analyze the following project development history:
-                        
-                        {history_summary}
-                        
-                        Please provide:
-                        1. Development pattern analysis
-                        2. Potential future challenges
-                        3. Productivity trend insights
-                        4. Recommendations for process improvement
-                        5. Predictive development trajectory
-                        """
-                    }
-                ]
-            )
+            # Pack development history and relevant code into the prompt token budget
+            prompt = self._build_prompt(TRAJECTORY_PROMPT, self._with_findings({'history': historical_data}, findings))
             
-            # Parse AI response
-            trajectory_analysis = response.content[0].text
+            # Request insights (served from cache when the prompt is unchanged)
+            trajectory_analysis = await self._complete(prompt)
             
             return {
                 'trajectory_insights': self._parse_insights(trajectory_analysis),
@@ -113,6 +188,101 @@ class AIInsightGenerator:
                 'timestamp': datetime.now().isoformat()
             }
 
+    def _build_prompt(self, template: str, data: Dict[str, Any]) -> str:
+        """
+        Pack data and the code most relevant to it into a prompt.
+        
+        The packed data itself is the retrieval query, so the code follows
+        whatever the context talks about (findings, milestones, commits).
+        
+        :param template: Prompt template with {context} and {code} placeholders
+        :param data: Context data for the prompt
+        :return: Prompt text
+        """
+        try:
+            self.retriever.update()
+            chunks = self.retriever.retrieve(self.packer.serialize(data), k=CODE_CONTEXT_CHUNKS)
+        except Exception:
+            # Code context is optional; the prompt is built without it
+            chunks = []
+        return self.packer.pack_prompt(template, data, code_chunks=chunks)
+
+    async def _complete(self, prompt: str, max_tokens: int = 1000) -> str:
+        """
+        Send a prompt to the model, reusing a cached response when available.
+        
+        :param prompt: Prompt text
+        :param max_tokens: Maximum tokens in the response
+        :return: Response text
+        """
+        return await self.client.complete(
+            prompt,
+            max_tokens=max_tokens,
+            model=self.model,
+            cache=self.cache,
+            use_cache=self.use_cache
+        )
+
+    def _stream(self, prompt: str, max_tokens: int = 1000):
+        """
+        Stream a prompt's response, reusing a cached response when available.
+        
+        :param prompt: Prompt text
+        :param max_tokens: Maximum tokens in the response
+        :return: Async iterator of response text chunks
+        """
+        return self.client.stream(
+            prompt,
+            max_tokens=max_tokens,
+            model=self.model,
+            cache=self.cache,
+            use_cache=self.use_cache
+        )
+
+    @staticmethod
+    def _with_findings(data: Dict[str, Any], findings: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Attach local heuristic findings to the data sent to the model."""
+        if not findings:
+            return data
+        return {**data, 'local_findings': [finding['message'] for finding in findings]}
+
+    @staticmethod
+    def _local_result(key: str, findings: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build an insight result from local findings when no model is available."""
+        return {
+            key: [f"- {finding['message']}" for finding in findings][:10],
+            'local_findings': findings,
+            'raw_response': LocalInsightEngine.to_markdown(findings),
+            'source': 'local',
+            'timestamp': datetime.now().isoformat()
+        }
+
+    def iter_insights(self, chunks: Iterable[str], limit: int = 10) -> Iterator[str]:
+        """
+        Parse insights from streamed text, yielding each as soon as its line completes.
+        
+        The stream is consumed to the end even after the limit is reached so
+        the full response still gets cached.
+        
+        :param chunks: Response text chunks
+        :param limit: Maximum number of insights to yield
+        :return: Iterator of parsed insights
+        """
+        pending = ''
+        found = 0
+        for chunk in chunks:
+            pending += chunk
+            *lines, pending = pending.split('\n')
+            for line in lines:
+                line = line.strip()
+                if found < limit and self._is_insight(line):
+                    found += 1
+                    yield line
+        
+        line = pending.strip()
+        if found < limit and self._is_insight(line):
+            yield line
+
     def _parse_insights(self, insights_text: str) -> List[str]:
         """
         Parse AI-generated insights into a list of actionable recommendations.
@@ -120,14 +290,12 @@ class AIInsightGenerator:
         :param insights_text: Raw insights text
         :return: List of parsed insights
         """
-        # Simple parsing strategy
-        insights = []
-        for line in insights_text.split('\n'):
-            line = line.strip()
-            if line and (line.startswith('1.') or line.startswith('•') or line.startswith('-')):
-                insights.append(line)
-        
-        return insights[:10]  # Limit to top 10 insights
+        return list(self.iter_insights([insights_text]))  # Limited to top 10 insights
+
+    @staticmethod
+    def _is_insight(line: str) -> bool:
+        """Simple parsing strategy: numbered or bulleted lines are insights."""
+        return bool(line) and (line.startswith('1.') or line.startswith('•') or line.startswith('-'))
 
 def main(project_path: str):
     """
@@ -135,18 +303,21 @@ def main(project_path: str):
     
     :param project_path: Path to the project
     """
-    # Example usage
-    insight_generator = AIInsightGenerator()
+    from ..project_tracking.context_system import ProjectContextManager
+    from ..project_tracking.history_dataset import HistoryDatasetBuilder
+    
+    insight_generator = AIInsightGenerator(project_path=project_path)
     
-    # Load project context (you'd replace this with actual context loading)
-    project_context = {
-        'name': os.path.basename(project_path),
-        'type': 'Software Project',
-        'current_phase': 'Development'
-    }
+    # Load the tracked project context and the git-derived development history
+    project_context = ProjectContextManager(project_path).get_current_context()
+    history_builder = HistoryDatasetBuilder(project_path)
+    historical_data = history_builder.to_records(history_builder.build(), max_records=52)
     
-    # Generate strategic recommendations
-    recommendations = insight_generator.generate_strategic_recommendations(project_context)
+    # Generate strategic recommendations and trajectory analysis concurrently
+    insights = insight_generator.generate_insights(project_context, historical_data)
     print("Strategic Recommendations:")
-    for rec in recommendations.get('strategic_recommendations', []):
+    for rec in insights['strategic'].get('strategic_recommendations', []):
         print(rec)
+    print("Development Trajectory:")
+    for insight in insights['trajectory'].get('trajectory_insights', []):
+        print(insight)
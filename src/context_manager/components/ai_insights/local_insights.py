@@ -0,0 +1,241 @@
+import os
+import subprocess
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional
+import yaml
+from importlib.metadata import PackageNotFoundError, version as installed_version
+from packaging.requirements import InvalidRequirement, Requirement
+
+# Severity ordering used to rank findings
+SEVERITY_ORDER = {'high': 0, 'medium': 1, 'low': 2}
+
+
+class LocalInsightEngine:
+    """
+    Rule-based project insights computed locally, without calling an AI model.
+
+    Serves both as a fallback when no API key is configured and as a
+    first-stage filter whose findings are handed to the model for synthesis.
+    """
+    def __init__(self, project_path: str, stalled_after_days: int = 30, churn_window_days: int = 90,
+                 untouched_after_days: int = 180, now: Optional[datetime] = None):
+        """
+        Initialize the local insight engine.
+
+        :param project_path: Path to the project
+        :param stalled_after_days: Age after which an open milestone counts as stalled
+        :param churn_window_days: Window of recent history scanned for churn hotspots
+        :param untouched_after_days: Age after which an unchanged module counts as untouched
+        :param now: Reference time (defaults to the current time)
+        """
+        self.project_path = project_path
+        self.stalled_after = timedelta(days=stalled_after_days)
+        self.churn_window_days = churn_window_days
+        self.untouched_after = timedelta(days=untouched_after_days)
+        self.now = now
+
+    def analyze(self) -> List[Dict[str, Any]]:
+        """
+        Run every rule and return findings, most severe first.
+
+        :return: List of findings with rule, severity, message and details
+        """
+        findings = []
+        for rule in (self.stalled_milestones, self.churn_hotspots,
+                     self.untouched_modules, self.dependency_drift):
+            try:
+                findings.extend(rule())
+            except (OSError, subprocess.SubprocessError, ValueError):
+                # A rule without usable data simply produces no findings
+                continue
+        return sorted(findings, key=lambda finding: SEVERITY_ORDER.get(finding['severity'], 3))
+
+    def analyze_trajectory(self, historical_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Compare recent activity with the preceding period in a history dataset.
+
+        :param historical_data: Records with 'period' and 'commits' keys, oldest first
+        :return: List of trajectory findings
+        """
+        commits = [record.get('commits', 0) for record in historical_data]
+        if len(commits) < 4:
+            return []
+
+        window = max(len(commits) // 3, 1)
+        recent = sum(commits[-window:]) / window
+        previous = sum(commits[-2 * window:-window]) / window
+        if previous == 0 and recent == 0:
+            change = 0.0
+        else:
+            change = (recent - previous) / max(previous, 1)
+
+        if change <= -0.5:
+            severity, trend = 'medium', 'slowing down'
+        elif change >= 0.5:
+            severity, trend = 'low', 'accelerating'
+        else:
+            severity, trend = 'low', 'steady'
+
+        return [self._finding(
+            'activity_trend', severity,
+            f"Commit activity is {trend}: {recent:.1f} commits per period recently vs {previous:.1f} before",
+            {'recent_average': round(recent, 2), 'previous_average': round(previous, 2)}
+        )]
+
+    def stalled_milestones(self) -> List[Dict[str, Any]]:
+        """Flag open milestones that have been in progress for too long."""
+        findings = []
+        now = self._now()
+        sources = [
+            (os.path.join(self.project_path, 'MILESTONES.yaml'), None, 'name', 'created_at'),
+            (os.path.join(self.project_path, '.context', 'GLOBAL_CONTEXT.yaml'), 'development', 'description', 'added_at'),
+        ]
+        for path, section, name_key, created_key in sources:
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r') as f:
+                data = yaml.safe_load(f) or {}
+            data = data.get(section, {}) if section else data
+
+            for milestone in data.get('milestones') or []:
+                if not isinstance(milestone, dict) or milestone.get('status') == 'completed':
+                    continue
+                created_at = self._parse_time(milestone.get(created_key))
+                if created_at and now - created_at > self.stalled_after:
+                    age = (now - created_at).days
+                    findings.append(self._finding(
+                        'stalled_milestone', 'high' if age > 2 * self.stalled_after.days else 'medium',
+                        f"Milestone '{milestone.get(name_key)}' has been open for {age} days",
+                        {'milestone': milestone.get(name_key), 'age_days': age}
+                    ))
+        return findings
+
+    def churn_hotspots(self, top: int = 5, min_changes: int = 5) -> List[Dict[str, Any]]:
+        """Flag files changed most often in the recent window."""
+        output = self._git('log', f'--since={self.churn_window_days} days ago', '--name-only',
+                           '--format=', '--no-renames')
+        changes = Counter(line for line in output.splitlines() if line.strip())
+
+        findings = []
+        for path, count in changes.most_common(top):
+            if count < min_changes:
+                break
+            findings.append(self._finding(
+                'churn_hotspot', 'medium' if count >= 2 * min_changes else 'low',
+                f"{path} changed {count} times in the last {self.churn_window_days} days",
+                {'path': path, 'changes': count}
+            ))
+        return findings
+
+    def untouched_modules(self, top: int = 5) -> List[Dict[str, Any]]:
+        """Flag Python modules not modified for a long time."""
+        tracked = {path for path in self._git('ls-files', '*.py').splitlines() if path}
+        if not tracked:
+            return []
+
+        # Walk history newest first, stopping once every module's last change is known
+        last_changed: Dict[str, datetime] = {}
+        process = subprocess.Popen(
+            ['git', 'log', '--name-only', '--no-renames', '--format=%x1e%ct', '--', '*.py'],
+            cwd=self.project_path, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+        )
+        try:
+            current = None
+            for line in process.stdout:
+                line = line.rstrip('\n')
+                if line.startswith('\x1e'):
+                    current = datetime.fromtimestamp(int(line[1:]))
+                elif line in tracked and line not in last_changed and current:
+                    last_changed[line] = current
+                    if len(last_changed) == len(tracked):
+                        break
+        finally:
+            process.kill()
+            process.stdout.close()
+            process.wait()
+
+        now = self._now()
+        stale = sorted(
+            ((path, changed) for path, changed in last_changed.items() if now - changed > self.untouched_after),
+            key=lambda item: item[1]
+        )
+        return [
+            self._finding(
+                'untouched_module', 'low',
+                f"{path} has not been modified for {(now - changed).days} days",
+                {'path': path, 'last_changed': changed.isoformat()}
+            )
+            for path, changed in stale[:top]
+        ]
+
+    def dependency_drift(self) -> List[Dict[str, Any]]:
+        """Flag declared requirements that the installed environment does not satisfy."""
+        requirements_file = os.path.join(self.project_path, 'requirements.txt')
+        if not os.path.exists(requirements_file):
+            return []
+
+        findings = []
+        with open(requirements_file, 'r') as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                if not line or line.startswith('-'):
+                    continue
+                try:
+                    requirement = Requirement(line)
+                except InvalidRequirement:
+                    continue
+
+                try:
+                    current = installed_version(requirement.name)
+                except PackageNotFoundError:
+                    findings.append(self._finding(
+                        'dependency_drift', 'medium',
+                        f"{requirement.name} is required ({requirement.specifier or 'any version'}) but not installed",
+                        {'package': requirement.name, 'required': str(requirement.specifier), 'installed': None}
+                    ))
+                    continue
+
+                if requirement.specifier and not requirement.specifier.contains(current, prereleases=True):
+                    findings.append(self._finding(
+                        'dependency_drift', 'medium',
+                        f"{requirement.name} {current} does not satisfy {requirement.specifier}",
+                        {'package': requirement.name, 'required': str(requirement.specifier), 'installed': current}
+                    ))
+        return findings
+
+    @staticmethod
+    def to_markdown(findings: List[Dict[str, Any]]) -> str:
+        """
+        Render findings as a markdown bullet list.
+
+        :param findings: Findings from analyze()
+        :return: Markdown text
+        """
+        if not findings:
+            return "- No issues detected by local heuristics"
+        return '\n'.join(f"- [{finding['severity']}] {finding['message']}" for finding in findings)
+
+    def _git(self, *args: str) -> str:
+        """Run a git command in the project and return its output."""
+        result = subprocess.run(['git', *args], cwd=self.project_path, capture_output=True, text=True, check=True)
+        return result.stdout
+
+    def _now(self) -> datetime:
+        """Reference time for age-based rules."""
+        return self.now or datetime.now()
+
+    @staticmethod
+    def _parse_time(value: Any) -> Optional[datetime]:
+        """Parse a timestamp from a tracking file, dropping any timezone."""
+        if isinstance(value, datetime):
+            return value.replace(tzinfo=None)
+        try:
+            return datetime.fromisoformat(str(value)).replace(tzinfo=None) if value else None
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _finding(rule: str, severity: str, message: str, details: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a finding record."""
+        return {'rule': rule, 'severity': severity, 'message': message, 'details': details}
@@ -0,0 +1,144 @@
+import os
+import json
+import time
+import hashlib
+from typing import Dict, Any, Optional
+
+from ...utils.profiling import count
+
+# Default lifetime of cached responses (one day)
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+# Default upper bound for the total size of the cache directory
+DEFAULT_MAX_BYTES = 20 * 1024 * 1024
+
+
+class ResponseCache:
+    """
+    Content-addressed on-disk cache for AI responses.
+
+    Entries are keyed by a hash of the model, prompt and request parameters and
+    stored as one JSON file each. Reads refresh an entry's modification time so
+    eviction can drop the least recently used entries once the cache exceeds
+    its size bound; entries older than the TTL are treated as misses.
+    """
+    def __init__(self, cache_dir: str, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialize the response cache.
+
+        :param cache_dir: Directory holding cached responses (e.g. .context/ai_cache)
+        :param ttl_seconds: Lifetime of an entry in seconds
+        :param max_bytes: Maximum total size of cached entries
+        """
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'misses': 0}
+
+    @staticmethod
+    def make_key(model: str, prompt: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Build the content address of a request.
+
+        :param model: Model name
+        :param prompt: Prompt text
+        :param params: Additional request parameters (e.g. max_tokens)
+        :return: Hex digest identifying the request
+        """
+        payload = json.dumps({'model': model, 'prompt': prompt, 'params': params or {}},
+                             sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        :param key: Request key from make_key
+        :return: Cached response text, or None on a miss
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.stats['misses'] += 1
+            count('cache_misses')
+            return None
+
+        if time.time() - entry.get('created_at', 0) > self.ttl_seconds:
+            self._remove(path)
+            self.stats['misses'] += 1
+            count('cache_misses')
+            return None
+
+        # Refresh recency for LRU eviction
+        os.utime(path, None)
+        self.stats['hits'] += 1
+        count('cache_hits')
+        return entry.get('response')
+
+    def put(self, key: str, response: str, model: Optional[str] = None):
+        """
+        Store a response and evict least recently used entries if over the size bound.
+
+        :param key: Request key from make_key
+        :param response: Response text
+        :param model: Model that produced the response
+        """
+        path = self._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'created_at': time.time(), 'model': model, 'response': response}, f)
+        os.replace(tmp_path, path)
+
+        self._evict()
+
+    def clear(self):
+        """Remove all cached responses."""
+        for path, _, _ in self._entries():
+            self._remove(path)
+
+    def _entry_path(self, key: str) -> str:
+        """Shard entries by key prefix to keep directories small."""
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _entries(self):
+        """List cached entries as (path, size, last_used) tuples."""
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith('.json'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits its size bound."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+
+        for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+            self._remove(path)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    @staticmethod
+    def _remove(path: str):
+        """Remove an entry, ignoring concurrent deletions."""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
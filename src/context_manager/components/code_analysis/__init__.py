@@ -1 +1,5 @@
 from .code_generator import CodeGenerator
+from .structure import ProjectStructure
+from .code_index import CodeSearchIndex
+from .code_retrieval import CodeRetrievalIndex
+from .clone_detector import CloneDetector
@@ -0,0 +1,382 @@
+import io
+import os
+import ast
+import json
+import zlib
+import hashlib
+import keyword
+import tokenize
+from collections import deque
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+from ...utils.profiling import count, span
+from .code_index import iter_source_files
+from .code_retrieval import chunk_source
+
+# Clones shorter than this many lines are not reported
+MIN_CLONE_LINES = 6
+
+# Tokens per k-gram; shorter matches are treated as noise
+KGRAM_TOKENS = 12
+
+# Winnowing window; any match of KGRAM_TOKENS + WINDOW - 1 tokens is guaranteed to share a fingerprint
+WINDOW = 8
+
+# Share of the larger chunk's fingerprints two chunks must have in common to be near-clones
+NEAR_CLONE_SIMILARITY = 0.6
+
+# Chunks with fewer fingerprints are too small to compare reliably
+MIN_FINGERPRINTS = 4
+
+# Fingerprints occurring in more chunks than this are boilerplate and ignored
+MAX_FINGERPRINT_OCCURRENCES = 50
+
+# Bump when the fingerprint layout changes so stale caches are rebuilt
+CACHE_VERSION = 1
+
+# Statements whose subtrees are hashed for exact clones
+_COMPOUND_NODES = (
+    ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.For, ast.AsyncFor, ast.While,
+    ast.If, ast.With, ast.AsyncWith, ast.Try,
+)
+
+# Fields holding identifiers that clones may rename
+_IDENTIFIER_FIELDS = {'id', 'arg', 'name', 'asname'}
+
+_KEYWORDS = frozenset(keyword.kwlist)
+
+_HASH_MODULUS = (1 << 61) - 1
+_HASH_BASE = 1_000_003
+
+
+def _first_line(node: ast.AST) -> int:
+    """First line of a node, including its decorators."""
+    return min([node.lineno] + [decorator.lineno for decorator in getattr(node, 'decorator_list', [])])
+
+
+def subtree_hashes(module: ast.AST, min_lines: int = MIN_CLONE_LINES) -> List[List[Any]]:
+    """
+    Hash compound statements with identifiers and constants normalized.
+
+    Two subtrees hash equally when they differ only in names and literal
+    values (renamed variables, changed strings or numbers).
+
+    :param module: Parsed module
+    :param min_lines: Minimum number of lines of a recorded subtree
+    :return: [hash, first line, last line, enclosing recorded hash or None] lists
+    """
+    records: List[List[Any]] = []
+
+    def visit(node: ast.AST) -> Tuple[bytes, List[List[Any]]]:
+        digest = hashlib.blake2b(type(node).__name__.encode(), digest_size=8)
+        pending: List[List[Any]] = []
+        for field, value in ast.iter_fields(node):
+            if field in ('ctx', 'type_comment'):
+                continue
+            for item in (value if isinstance(value, list) else [value]):
+                if isinstance(item, ast.AST):
+                    child, child_pending = visit(item)
+                    digest.update(child)
+                    pending.extend(child_pending)
+                elif field in _IDENTIFIER_FIELDS and isinstance(item, str):
+                    digest.update(b'$id')
+                elif field == 'value':
+                    # Constants keep their type only
+                    digest.update(type(item).__name__.encode())
+                else:
+                    digest.update(repr(item).encode())
+            digest.update(b';')
+        value = digest.digest()
+
+        if isinstance(node, _COMPOUND_NODES) and node.end_lineno - _first_line(node) + 1 >= min_lines:
+            record = [value.hex(), _first_line(node), node.end_lineno, None]
+            for nested in pending:
+                nested[3] = record[0]
+            records.append(record)
+            return value, [record]
+        return value, pending
+
+    visit(module)
+    return sorted(records, key=lambda record: (record[1], -record[2]))
+
+
+def token_fingerprints(text: str, k: int = KGRAM_TOKENS, window: int = WINDOW) -> List[Tuple[int, int]]:
+    """
+    Winnowed fingerprints of a source's normalized token stream.
+
+    Names become one token kind, numbers and strings another, so renamed
+    copies share fingerprints. Comments and blank lines are dropped.
+
+    :param text: Python source
+    :param k: Tokens per k-gram
+    :param window: Winnowing window size
+    :return: (fingerprint, line) pairs in source order
+    """
+    codes, lines = [], []
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(text).readline):
+            if token.type == tokenize.NAME:
+                symbol = token.string if token.string in _KEYWORDS else '$id'
+            elif token.type in (tokenize.NUMBER, tokenize.STRING):
+                symbol = '$lit'
+            elif token.type in (tokenize.OP, tokenize.INDENT, tokenize.DEDENT):
+                symbol = token.string or tokenize.tok_name[token.type]
+            else:
+                continue
+            codes.append(_token_code(symbol))
+            lines.append(token.start[0])
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        pass
+    if len(codes) < k:
+        return []
+
+    # Rolling polynomial hash of every k-gram
+    top = pow(_HASH_BASE, k - 1, _HASH_MODULUS)
+    kgrams, value = [], 0
+    for position, code in enumerate(codes):
+        if position >= k:
+            value = (value - codes[position - k] * top) % _HASH_MODULUS
+        value = (value * _HASH_BASE + code) % _HASH_MODULUS
+        if position >= k - 1:
+            kgrams.append(value)
+
+    # Keep the rightmost minimum of every window
+    fingerprints, candidates, last = [], deque(), -1
+    for position, value in enumerate(kgrams):
+        while candidates and kgrams[candidates[-1]] >= value:
+            candidates.pop()
+        candidates.append(position)
+        if candidates[0] <= position - window:
+            candidates.popleft()
+        if position >= window - 1 and candidates[0] != last:
+            last = candidates[0]
+            fingerprints.append((kgrams[last], lines[last]))
+    return fingerprints
+
+
+_TOKEN_CODES: Dict[str, int] = {}
+
+
+def _token_code(symbol: str) -> int:
+    """Stable integer code of a normalized token."""
+    code = _TOKEN_CODES.get(symbol)
+    if code is None:
+        code = _TOKEN_CODES[symbol] = zlib.crc32(symbol.encode())
+    return code
+
+
+class CloneDetector:
+    """
+    Project-wide detection of duplicated code.
+
+    Exact clones are compound statements whose normalized AST subtrees hash
+    equally; near-clones are functions and methods that share most of their
+    winnowed token fingerprints. Both are found through hash tables, so the
+    work grows with the amount of code rather than with the number of pairs
+    of functions. Per-file hashes and fingerprints are cached in
+    .context/code_index/clones.json and recomputed only for files whose
+    modification time or size changed.
+    """
+    def __init__(self, project_path: str, cache_path: Optional[str] = None, min_lines: int = MIN_CLONE_LINES):
+        """
+        Initialize the clone detector.
+
+        :param project_path: Path to the project
+        :param cache_path: Fingerprint cache file (defaults to .context/code_index/clones.json)
+        :param min_lines: Minimum length in lines of a reported clone
+        """
+        self.project_path = os.path.abspath(project_path)
+        self.cache_path = cache_path or os.path.join(self.project_path, '.context', 'code_index', 'clones.json')
+        self.min_lines = min_lines
+
+    def find_clones(self) -> Dict[str, Any]:
+        """
+        Find groups of exact and near-duplicate code.
+
+        :return: 'groups' (kind, lines, similarity and locations with path,
+                 start, end and name; largest first) and 'stats' (files
+                 parsed and reused from the cache)
+        """
+        entries, stats = self._fingerprints()
+        with span('clone_matching'):
+            exact = self._exact_groups(entries)
+            near = self._near_groups(entries, exact)
+        groups = sorted(exact + near, key=lambda group: (-group['lines'] * len(group['locations']),
+                                                         group['locations'][0]['path'],
+                                                         group['locations'][0]['start']))
+        return {'groups': groups, 'stats': stats}
+
+    def _fingerprints(self) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, int]]:
+        """Load cached per-file fingerprints and recompute those of changed files."""
+        cache = self._load_cache()
+        entries, stats = {}, {'parsed': 0, 'reused': 0}
+        with span('file_scan'):
+            current = list(self._walk())
+
+        for path, stat in current:
+            cached = cache.get(path)
+            if cached and cached['mtime_ns'] == stat.st_mtime_ns and cached['size'] == stat.st_size:
+                entries[path] = cached
+                stats['reused'] += 1
+                continue
+            with span('parse'):
+                entries[path] = self._analyze(path, stat)
+            stats['parsed'] += 1
+            count('files_fingerprinted')
+
+        if stats['parsed'] or len(entries) != len(cache):
+            self._save_cache(entries)
+        return entries, stats
+
+    def _analyze(self, path: str, stat: os.stat_result) -> Dict[str, Any]:
+        """Compute subtree hashes and per-chunk fingerprints of one file."""
+        entry = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'subtrees': [], 'chunks': []}
+        try:
+            with open(os.path.join(self.project_path, path), 'r', errors='replace') as f:
+                text = f.read()
+            module = ast.parse(text)
+            entry['subtrees'] = subtree_hashes(module, self.min_lines)
+        except (OSError, SyntaxError, ValueError, RecursionError):
+            return entry
+
+        chunks = [[name, start, end, []] for name, _, start, end in chunk_source(text)
+                  if end - start + 1 >= self.min_lines]
+        if chunks:
+            position = 0
+            for fingerprint, line in token_fingerprints(text):
+                while position < len(chunks) and chunks[position][2] < line:
+                    position += 1
+                if position == len(chunks):
+                    break
+                if chunks[position][1] <= line:
+                    chunks[position][3].append(fingerprint)
+        entry['chunks'] = chunks
+        return entry
+
+    def _exact_groups(self, entries: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Group identical subtrees, leaving out those nested in a larger clone."""
+        by_hash: Dict[str, List[Tuple[str, List[Any]]]] = {}
+        for path, entry in entries.items():
+            for record in entry['subtrees']:
+                by_hash.setdefault(record[0], []).append((path, record))
+        duplicated = {digest for digest, members in by_hash.items() if len(members) > 1}
+
+        groups = []
+        for digest in duplicated:
+            members = by_hash[digest]
+            # Every copy sits inside a copy of a larger clone, which is reported instead
+            if all(record[3] in duplicated for _, record in members):
+                continue
+            groups.append({
+                'kind': 'exact',
+                'lines': max(record[2] - record[1] + 1 for _, record in members),
+                'similarity': 1.0,
+                'locations': sorted(({'path': path, 'start': record[1], 'end': record[2],
+                                      'name': self._enclosing_name(entries[path], record[1], record[2])}
+                                     for path, record in members),
+                                    key=lambda location: (location['path'], location['start'])),
+            })
+        return groups
+
+    def _near_groups(self, entries: Dict[str, Dict[str, Any]],
+                     exact: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Group chunks sharing most of their fingerprints."""
+        chunks: List[Tuple[str, List[Any]]] = []
+        postings: Dict[int, List[int]] = {}
+        for path, entry in entries.items():
+            for chunk in entry['chunks']:
+                fingerprints = set(chunk[3])
+                if len(fingerprints) < MIN_FINGERPRINTS:
+                    continue
+                chunk_id = len(chunks)
+                chunks.append((path, chunk))
+                for fingerprint in fingerprints:
+                    postings.setdefault(fingerprint, []).append(chunk_id)
+
+        shared: Dict[Tuple[int, int], int] = {}
+        for members in postings.values():
+            if len(members) < 2 or len(members) > MAX_FINGERPRINT_OCCURRENCES:
+                continue
+            for i, first in enumerate(members):
+                for second in members[i + 1:]:
+                    shared[first, second] = shared.get((first, second), 0) + 1
+
+        # Chunks that are already exact copies of each other
+        exact_sets = {}
+        for group_id, group in enumerate(exact):
+            for location in group['locations']:
+                exact_sets[location['path'], location['start'], location['end']] = group_id
+
+        parent = list(range(len(chunks)))
+
+        def find(chunk_id: int) -> int:
+            while parent[chunk_id] != chunk_id:
+                parent[chunk_id] = parent[parent[chunk_id]]
+                chunk_id = parent[chunk_id]
+            return chunk_id
+
+        similarity: Dict[int, float] = {}
+        for (first, second), common in shared.items():
+            sizes = [len(set(chunks[chunk_id][1][3])) for chunk_id in (first, second)]
+            score = common / max(sizes)
+            if score < NEAR_CLONE_SIMILARITY:
+                continue
+            keys = [(chunks[chunk_id][0], chunks[chunk_id][1][1], chunks[chunk_id][1][2]) for chunk_id in (first, second)]
+            if keys[0] in exact_sets and exact_sets[keys[0]] == exact_sets.get(keys[1]):
+                continue
+            root_first, root_second = find(first), find(second)
+            merged = min(score, similarity.get(root_first, 1.0), similarity.get(root_second, 1.0))
+            parent[root_second] = root_first
+            similarity[root_first] = merged
+
+        members: Dict[int, List[int]] = {}
+        for chunk_id in range(len(chunks)):
+            root = find(chunk_id)
+            if root in similarity:
+                members.setdefault(root, []).append(chunk_id)
+
+        groups = []
+        for root, chunk_ids in members.items():
+            locations = sorted(({'path': chunks[chunk_id][0], 'start': chunks[chunk_id][1][1],
+                                 'end': chunks[chunk_id][1][2], 'name': chunks[chunk_id][1][0]}
+                                for chunk_id in chunk_ids),
+                               key=lambda location: (location['path'], location['start']))
+            groups.append({
+                'kind': 'near',
+                'lines': max(location['end'] - location['start'] + 1 for location in locations),
+                'similarity': round(similarity[root], 2),
+                'locations': locations,
+            })
+        return groups
+
+    @staticmethod
+    def _enclosing_name(entry: Dict[str, Any], start: int, end: int) -> Optional[str]:
+        """Name of the function or class chunk containing a line range."""
+        for name, chunk_start, chunk_end, _ in entry['chunks']:
+            if chunk_start <= start and end <= chunk_end:
+                return name
+        return None
+
+    def _walk(self) -> Iterator[Tuple[str, os.stat_result]]:
+        """Yield (relative path, stat) for every Python file."""
+        return iter_source_files(self.project_path, {'.py'})
+
+    def _load_cache(self) -> Dict[str, Dict[str, Any]]:
+        """Read the fingerprint cache, ignoring it when missing or outdated."""
+        try:
+            with open(self.cache_path, 'r') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if cache.get('version') != CACHE_VERSION or cache.get('min_lines') != self.min_lines:
+            return {}
+        return cache.get('files', {})
+
+    def _save_cache(self, entries: Dict[str, Dict[str, Any]]):
+        """Write the fingerprint cache atomically."""
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = f"{self.cache_path}.tmp.{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': CACHE_VERSION, 'min_lines': self.min_lines, 'files': entries},
+                      f, separators=(',', ':'))
+        os.replace(tmp_path, self.cache_path)
@@ -2,6 +2,15 @@ import os
 import ast
 from typing import Dict, List, Any
 
+from ...utils.profiling import count, span
+from .clone_detector import CloneDetector
+from .code_index import CodeSearchIndex
+from .code_retrieval import CodeRetrievalIndex
+from .structure import ProjectStructure
+
+# Clone groups reported by suggest_improvements, largest first
+MAX_CLONE_SUGGESTIONS = 10
+
 class CodeGenerator:
     """
     Provides code generation, analysis, and boilerplate creation capabilities.
@@ -165,17 +174,14 @@ def test_fixture_example(sample_data):
     assert len(sample_data) == 5
 '''
 
-    def analyze_project_structure(self) -> Dict[str, Any]:
+    def analyze_project_structure(self) -> ProjectStructure:
         """
         Analyze the current project structure and code organization.
         
-        :return: Project structure analysis
+        :return: Project structure analysis; a read-only mapping with the keys
+                 'python_files', 'modules' and 'packages' (use to_dict() for plain data)
         """
-        project_structure = {
-            'python_files': [],
-            'modules': [],
-            'packages': []
-        }
+        project_structure = ProjectStructure()
         
         # Walk through project directory
         for root, dirs, files in os.walk(self.project_path):
@@ -187,22 +193,96 @@ def test_fixture_example(sample_data):
                     # Analyze Python file
                     with open(full_path, 'r') as f:
                         try:
-                            module = ast.parse(f.read())
+                            with span('file_scan'):
+                                source = f.read()
+                            with span('parse'):
+                                module = ast.parse(source)
+                            count('files_parsed')
                             
                             # Collect class and function information
                             classes = [node.name for node in ast.walk(module) if isinstance(node, ast.ClassDef)]
                             functions = [node.name for node in ast.walk(module) if isinstance(node, ast.FunctionDef)]
                             
-                            project_structure['python_files'].append({
-                                'path': relative_path,
-                                'classes': classes,
-                                'functions': functions
-                            })
+                            project_structure.add_file(relative_path, classes, functions)
                         except SyntaxError:
                             pass
         
+        project_structure.freeze()
         return project_structure
 
+    def search_code(self, query: str, regex: bool = False, ignore_case: bool = False,
+                    limit: int = 100, refresh: bool = True) -> List[Dict[str, Any]]:
+        """
+        Search project files for a substring or regular expression.
+        
+        The persistent trigram index under .context/code_index is refreshed
+        first; only files whose modification time or size changed are re-read.
+        
+        :param query: Substring or regular expression
+        :param regex: Treat the query as a regular expression
+        :param ignore_case: Match case-insensitively
+        :param limit: Maximum number of matching lines
+        :param refresh: Rescan the project before searching; when False the
+                        stored index is queried as is (built only if missing)
+        :return: Matches with path, line number and line text
+        :raises IndexFormatError: If refresh is False and the stored index is corrupt
+        """
+        index = self._search_index(refresh)
+        try:
+            return index.search(query, regex=regex, ignore_case=ignore_case, limit=limit)
+        finally:
+            index.close()
+
+    def find_symbol(self, name: str, refresh: bool = True) -> List[Dict[str, Any]]:
+        """
+        Find class and function definitions by exact name.
+        
+        :param name: Symbol name
+        :param refresh: Rescan the project before the lookup
+        :return: Definitions with name, kind, path and line
+        :raises IndexFormatError: If refresh is False and the stored index is corrupt
+        """
+        index = self._search_index(refresh)
+        try:
+            return index.find_symbol(name)
+        finally:
+            index.close()
+
+    def relevant_code(self, query: str, k: int = 5, refresh: bool = True) -> List[Dict[str, Any]]:
+        """
+        Rank functions and classes by BM25 relevance to a query or diff.
+        
+        :param query: Free text, code, or a diff passed through diff_query
+        :param k: Maximum number of chunks
+        :param refresh: Re-chunk changed files before ranking
+        :return: Chunks with path, name, kind, line range, score and code
+        """
+        index = CodeRetrievalIndex(self.project_path)
+        try:
+            if refresh or not os.path.exists(index.db_path):
+                index.update()
+            return index.retrieve(query, k=k)
+        finally:
+            index.close()
+
+    def find_clones(self) -> Dict[str, Any]:
+        """
+        Find exact and near-duplicate code across the project.
+        
+        Fingerprints are cached per file under .context/code_index, so
+        repeated runs only re-read files that changed.
+        
+        :return: Clone groups with kind, lines, similarity and locations
+        """
+        return CloneDetector(self.project_path).find_clones()
+
+    def _search_index(self, refresh: bool = True) -> CodeSearchIndex:
+        """Open the code search index, bringing it up to date if requested or missing."""
+        index = CodeSearchIndex(self.project_path)
+        if refresh or not os.path.exists(index.index_file):
+            index.update()
+        return index
+
     def suggest_improvements(self) -> List[str]:
         """
         Generate code improvement suggestions based on project analysis.
@@ -226,6 +306,14 @@ def test_fixture_example(sample_data):
             if len(file['functions']) > 10:
                 suggestions.append(f"File {file['path']} has many functions. Consider splitting into smaller modules")
         
+        # Duplicated code suggestions
+        for group in self.find_clones()['groups'][:MAX_CLONE_SUGGESTIONS]:
+            locations = ', '.join(f"{location['path']}:{location['start']}-{location['end']}"
+                                  for location in group['locations'])
+            kind = 'Duplicated' if group['kind'] == 'exact' else 'Near-duplicate'
+            suggestions.append(f"{kind} code ({group['lines']} lines) in {locations}; "
+                               f"consider extracting a shared function")
+        
         # Best practices suggestions
         suggestions.extend([
             "Ensure consistent type hinting",
@@ -0,0 +1,307 @@
+import os
+import re
+import ast
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Set, Tuple
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+from ...utils.profiling import count, span
+from .index_format import IndexFormatError, IndexReader, write_index
+
+# Files whose contents are indexed for text search
+INDEXED_EXTENSIONS = {
+    '.py', '.pyi', '.md', '.rst', '.txt', '.yaml', '.yml', '.toml', '.cfg', '.ini', '.json',
+    '.js', '.ts', '.html', '.css', '.sh',
+}
+
+# Directories never descended into
+SKIPPED_DIRECTORIES = {'.git', '.context', '__pycache__', 'node_modules', 'venv', '.venv', 'build', 'dist'}
+
+# Files larger than this are skipped (generated or vendored data)
+MAX_FILE_BYTES = 1024 * 1024
+
+# Index file name; the binary layout is described in index_format
+INDEX_FILE = 'index.bin'
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Distinct lowercase trigrams of a text.
+
+    :param text: Text to split
+    :return: Set of three-character substrings
+    """
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def iter_source_files(project_path: str, extensions: Iterable[str]) -> Iterator[Tuple[str, os.stat_result]]:
+    """
+    Walk a project's source files, skipping generated and hidden directories.
+
+    :param project_path: Absolute path of the project
+    :param extensions: File extensions to include (e.g. {'.py'})
+    :return: Iterator of (path relative to the project, stat) for files up to MAX_FILE_BYTES
+    """
+    extensions = set(extensions)
+    for root, dirs, files in os.walk(project_path):
+        dirs[:] = sorted(name for name in dirs if name not in SKIPPED_DIRECTORIES and not name.startswith('.'))
+        for name in sorted(files):
+            if os.path.splitext(name)[1] not in extensions:
+                continue
+            full_path = os.path.join(root, name)
+            try:
+                stat = os.stat(full_path)
+            except OSError:
+                continue
+            if stat.st_size <= MAX_FILE_BYTES:
+                yield os.path.relpath(full_path, project_path), stat
+
+
+def required_literals(pattern: str) -> List[str]:
+    """
+    Literal substrings every match of a regular expression must contain.
+
+    Only runs of plain characters in the top-level sequence are extracted;
+    anything else (groups, alternations, classes, repeats) ends a run.
+
+    :param pattern: Regular expression
+    :return: Literal runs, possibly empty
+    """
+    runs, current = [], []
+    for op, value in sre_parse.parse(pattern):
+        if op == sre_parse.LITERAL:
+            current.append(chr(value))
+            continue
+        if current:
+            runs.append(''.join(current))
+            current = []
+    if current:
+        runs.append(''.join(current))
+    return runs
+
+
+class CodeSearchIndex:
+    """
+    Persistent trigram index over project files plus an exact symbol index.
+
+    Each indexed file is split into lowercase trigrams; a query's trigrams
+    select candidate files by intersecting posting lists, and only those
+    candidates are read to verify matches. Python files also contribute
+    class and function definitions to a symbol index. The index file is
+    memory-mapped, so queries binary-search it in place instead of loading
+    it; update() only re-reads files whose modification time or size changed.
+    """
+    def __init__(self, project_path: str, index_dir: Optional[str] = None):
+        """
+        Initialize the code search index.
+
+        :param project_path: Path to the project
+        :param index_dir: Directory holding the index (defaults to .context/code_index)
+        """
+        self.project_path = os.path.abspath(project_path)
+        self.index_dir = index_dir or os.path.join(self.project_path, '.context', 'code_index')
+        self.index_file = os.path.join(self.index_dir, INDEX_FILE)
+        self._reader: Optional[IndexReader] = None
+
+    def update(self) -> Dict[str, int]:
+        """
+        Bring the index up to date with the files on disk and persist it.
+
+        :return: Counts of added, updated, removed and unchanged files
+        """
+        stats = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0}
+        try:
+            reader = self._open()
+        except IndexFormatError:
+            # A corrupt index is rebuilt from scratch
+            reader = None
+
+        known = {}
+        if reader is not None:
+            known = {path: (file_id, mtime_ns, size) for file_id, path, mtime_ns, size in reader.iter_files()}
+
+        with span('file_scan'):
+            current = dict(self._walk())
+
+        changed = {}
+        for path, stat in current.items():
+            entry = known.get(path)
+            if entry and entry[1] == stat.st_mtime_ns and entry[2] == stat.st_size:
+                stats['unchanged'] += 1
+                continue
+            stats['updated' if entry else 'added'] += 1
+            changed[path] = stat
+        stats['removed'] = len(set(known) - set(current))
+
+        if not changed and not stats['removed']:
+            return stats
+
+        files, postings = self._materialize(reader, keep=set(current) - set(changed))
+        for path, stat in changed.items():
+            self._add(files, postings, path, stat)
+
+        self.close()
+        os.makedirs(self.index_dir, exist_ok=True)
+        write_index(self.index_file, files, postings)
+        return stats
+
+    def search(self, query: str, regex: bool = False, ignore_case: bool = False,
+               limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Find lines matching a substring or regular expression.
+
+        :param query: Substring or regular expression
+        :param regex: Treat the query as a regular expression
+        :param ignore_case: Match case-insensitively
+        :param limit: Maximum number of matching lines
+        :return: Matches with path, line number and line text
+        :raises re.error: If a regular expression query is invalid
+        :raises IndexFormatError: If the index file is corrupt
+        """
+        flags = re.IGNORECASE if ignore_case else 0
+        matcher = re.compile(query if regex else re.escape(query), flags)
+
+        reader = self._open()
+        if reader is None:
+            return []
+        literals = required_literals(query) if regex else [query]
+
+        matches = []
+        for path in self._candidates(reader, literals):
+            try:
+                with open(os.path.join(self.project_path, path), 'r', errors='replace') as f:
+                    text = f.read()
+            except OSError:
+                continue
+
+            # Cheap whole-file check before splitting into lines
+            if not matcher.search(text):
+                continue
+            for number, line in enumerate(text.splitlines(), 1):
+                if matcher.search(line):
+                    matches.append({'path': path, 'line': number, 'text': line.strip()})
+                    if len(matches) >= limit:
+                        return matches
+        return matches
+
+    def find_symbol(self, name: str) -> List[Dict[str, Any]]:
+        """
+        Find definitions of a class or function by exact name.
+
+        :param name: Symbol name
+        :return: Definitions with name, kind, path and line
+        :raises IndexFormatError: If the index file is corrupt
+        """
+        reader = self._open()
+        if reader is None:
+            return []
+        definitions = [
+            {'name': symbol, 'kind': kind, 'path': reader.path(file_id), 'line': line}
+            for symbol, kind, line, file_id in reader.find_symbol(name)
+        ]
+        return sorted(definitions, key=lambda definition: (definition['path'], definition['line']))
+
+    def close(self):
+        """Release the memory-mapped index file."""
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def _open(self) -> Optional[IndexReader]:
+        """
+        Memory-map the index file on first use and check its checksum.
+
+        :return: Reader, or None when no index has been built
+        :raises IndexFormatError: If the index file exists but is corrupt
+        """
+        if self._reader is None:
+            try:
+                reader = IndexReader(self.index_file)
+            except OSError:
+                return None
+            try:
+                # One sequential pass, so a corrupt index never reads as empty results
+                reader.verify()
+            except IndexFormatError:
+                reader.close()
+                raise
+            self._reader = reader
+        return self._reader
+
+    def _candidates(self, reader: IndexReader, literals: Iterable[str]) -> List[str]:
+        """Paths of files containing every trigram of the literals, sorted."""
+        required = set()
+        for literal in literals:
+            required |= trigrams(literal)
+
+        if not required:
+            candidates = set(range(reader.file_count))
+        else:
+            postings = sorted((reader.postings(trigram) for trigram in required), key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                if not candidates:
+                    break
+                candidates.intersection_update(posting)
+        return sorted(reader.path(file_id) for file_id in candidates)
+
+    def _walk(self):
+        """Yield (relative path, stat) for every indexable file."""
+        return iter_source_files(self.project_path, INDEXED_EXTENSIONS)
+
+    @staticmethod
+    def _materialize(reader: Optional[IndexReader], keep: Set[str]):
+        """Decode the entries of unchanged files, renumbering their IDs densely."""
+        files: List[Dict[str, Any]] = []
+        postings: Dict[str, Set[int]] = {}
+        if reader is None:
+            return files, postings
+
+        renumber = {}
+        for file_id, path, mtime_ns, size in reader.iter_files():
+            if path in keep:
+                renumber[file_id] = len(files)
+                files.append({'path': path, 'mtime_ns': mtime_ns, 'size': size,
+                              'symbols': reader.file_symbols(file_id)})
+
+        for trigram, ids in reader.iter_postings():
+            kept = {renumber[file_id] for file_id in ids if file_id in renumber}
+            if kept:
+                postings[trigram] = kept
+        return files, postings
+
+    def _add(self, files: List[Dict[str, Any]], postings: Dict[str, Set[int]], path: str, stat: os.stat_result):
+        """Index one file under the next file ID."""
+        try:
+            with open(os.path.join(self.project_path, path), 'r', errors='replace') as f:
+                text = f.read()
+        except OSError:
+            return
+
+        file_id = len(files)
+        with span('parse'):
+            for trigram in trigrams(text):
+                postings.setdefault(trigram, set()).add(file_id)
+            symbols = self._python_symbols(text) if path.endswith(('.py', '.pyi')) else []
+        count('files_indexed')
+
+        files.append({'path': path, 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'symbols': symbols})
+
+    @staticmethod
+    def _python_symbols(text: str) -> List[List[Any]]:
+        """Class and function definitions of a Python source as [name, kind, line]."""
+        try:
+            module = ast.parse(text)
+        except (SyntaxError, ValueError):
+            return []
+        symbols = []
+        for node in ast.walk(module):
+            if isinstance(node, ast.ClassDef):
+                symbols.append([node.name, 'class', node.lineno])
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                symbols.append([node.name, 'function', node.lineno])
+        return sorted(symbols, key=lambda symbol: symbol[2])
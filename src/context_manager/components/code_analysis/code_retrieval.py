@@ -0,0 +1,280 @@
+import os
+import re
+import ast
+import math
+import sqlite3
+import keyword
+from collections import Counter
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+from ...utils.profiling import count, span
+from .code_index import iter_source_files
+
+# BM25 term-frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Classes longer than this are split into a header chunk and one chunk per method
+MAX_CLASS_LINES = 80
+
+# Distinct query terms used for scoring, most frequent in the query first
+MAX_QUERY_TERMS = 64
+
+# Identifiers that occur everywhere and carry no signal
+STOP_TERMS = {word.lower() for word in keyword.kwlist} | {
+    'self', 'cls', 'args', 'kwargs', 'str', 'int', 'dict', 'list', 'any', 'optional', 'typing',
+}
+
+_IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+_WORD_PART = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+')
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER,
+    size INTEGER
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL,
+    name TEXT,
+    kind TEXT,
+    start INTEGER,
+    end INTEGER,
+    length INTEGER
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    chunk_id INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chunks_by_file ON chunks (file_id);
+CREATE INDEX IF NOT EXISTS postings_by_term ON postings (term);
+CREATE INDEX IF NOT EXISTS postings_by_chunk ON postings (chunk_id);
+'''
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase search terms.
+
+    Identifiers contribute themselves and their snake_case and camelCase
+    parts, so 'parse_config' matches queries for 'parse' and 'config'.
+
+    :param text: Source code or free text
+    :return: Terms in order of occurrence, stop terms removed
+    """
+    terms = []
+    for identifier in _IDENTIFIER.findall(text):
+        lowered = identifier.lower()
+        parts = [part.lower() for part in _WORD_PART.findall(identifier)]
+        if len(parts) > 1 and lowered not in STOP_TERMS:
+            terms.append(lowered)
+        terms.extend(part for part in parts if len(part) > 1 and part not in STOP_TERMS)
+    return terms
+
+
+def chunk_source(text: str) -> List[Tuple[str, str, int, int]]:
+    """
+    Split a Python module into function and class chunks.
+
+    Top-level functions and small classes become one chunk each; a large
+    class becomes a header chunk plus one chunk per method. Line ranges
+    include decorators.
+
+    :param text: Module source
+    :return: (name, kind, first line, last line) tuples in source order
+    """
+    try:
+        module = ast.parse(text)
+    except (SyntaxError, ValueError):
+        return []
+
+    def first_line(node: ast.AST) -> int:
+        return min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+
+    chunks = []
+    for node in module.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            chunks.append((node.name, 'function', first_line(node), node.end_lineno))
+        elif isinstance(node, ast.ClassDef):
+            start = first_line(node)
+            methods = [child for child in node.body if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef))]
+            if node.end_lineno - start + 1 <= MAX_CLASS_LINES or not methods:
+                chunks.append((node.name, 'class', start, node.end_lineno))
+                continue
+            header_end = first_line(methods[0]) - 1
+            if header_end >= start:
+                chunks.append((node.name, 'class', start, header_end))
+            for method in methods:
+                chunks.append((f"{node.name}.{method.name}", 'method', first_line(method), method.end_lineno))
+    return chunks
+
+
+def diff_query(diff_text: str) -> str:
+    """
+    Extract the query text of a unified diff: changed lines and file paths.
+
+    :param diff_text: Output of git diff
+    :return: Text to pass to CodeRetrievalIndex.retrieve
+    """
+    lines = []
+    for line in diff_text.splitlines():
+        if line.startswith(('+++ ', '--- ')):
+            path = line[4:]
+            if path != '/dev/null':
+                lines.append(path[2:] if path[:2] in ('a/', 'b/') else path)
+        elif line.startswith(('+', '-')):
+            lines.append(line[1:])
+    return '\n'.join(lines)
+
+
+class CodeRetrievalIndex:
+    """
+    Local BM25 index over function- and class-level chunks of Python files.
+
+    Chunks are cut along the AST, tokenized into identifiers and their
+    snake_case/camelCase parts, and stored with their term frequencies in
+    an SQLite database indexed by term. A query reads only the posting rows
+    of its own terms, so retrieving the best chunks takes milliseconds and
+    needs no embedding model or network access. update() re-chunks only
+    files whose modification time or size changed.
+    """
+    def __init__(self, project_path: str, db_path: Optional[str] = None):
+        """
+        Initialize the retrieval index.
+
+        :param project_path: Path to the project
+        :param db_path: SQLite database path (defaults to .context/code_index/retrieval.db)
+        """
+        self.project_path = os.path.abspath(project_path)
+        self.db_path = db_path or os.path.join(self.project_path, '.context', 'code_index', 'retrieval.db')
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def update(self) -> Dict[str, int]:
+        """
+        Bring the index up to date with the Python files on disk.
+
+        :return: Counts of added, updated, removed and unchanged files
+        """
+        stats = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0}
+        connection = self._connect()
+        known = {path: (file_id, mtime_ns, size)
+                 for file_id, path, mtime_ns, size in connection.execute('SELECT id, path, mtime_ns, size FROM files')}
+
+        with span('file_scan'):
+            current = dict(self._walk())
+
+        with connection:
+            for path, stat in current.items():
+                entry = known.get(path)
+                if entry and entry[1] == stat.st_mtime_ns and entry[2] == stat.st_size:
+                    stats['unchanged'] += 1
+                    continue
+                stats['updated' if entry else 'added'] += 1
+                if entry:
+                    self._remove(connection, entry[0])
+                self._add(connection, path, stat)
+
+            for path in set(known) - set(current):
+                stats['removed'] += 1
+                self._remove(connection, known[path][0])
+        return stats
+
+    def retrieve(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Find the chunks most relevant to a query.
+
+        :param query: Free text, code or the output of diff_query
+        :param k: Maximum number of chunks
+        :return: Chunks with path, name, kind, start, end, score and code, best first
+        """
+        terms = [term for term, _ in Counter(tokenize(query)).most_common(MAX_QUERY_TERMS)]
+        if not terms or not os.path.exists(self.db_path):
+            return []
+
+        connection = self._connect()
+        with span('retrieval'):
+            chunk_count, total_length = connection.execute('SELECT COUNT(*), SUM(length) FROM chunks').fetchone()
+            if not chunk_count:
+                return []
+            average_length = total_length / chunk_count
+
+            scores: Dict[int, float] = {}
+            for term in terms:
+                rows = connection.execute('SELECT chunk_id, tf, length FROM postings WHERE term = ?', (term,)).fetchall()
+                if not rows:
+                    continue
+                idf = math.log(1 + (chunk_count - len(rows) + 0.5) / (len(rows) + 0.5))
+                for chunk_id, tf, length in rows:
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+            best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+            results = []
+            for chunk_id, score in best:
+                path, name, kind, start, end = connection.execute(
+                    'SELECT files.path, name, kind, start, end FROM chunks JOIN files ON files.id = chunks.file_id '
+                    'WHERE chunks.id = ?', (chunk_id,)).fetchone()
+                results.append({'path': path, 'name': name, 'kind': kind, 'start': start, 'end': end,
+                                'score': round(score, 4), 'code': self._read_lines(path, start, end)})
+        count('chunks_retrieved', len(results))
+        return results
+
+    def close(self):
+        """Close the database connection."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, creating it and its schema on first use."""
+        if self._connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            self._connection = sqlite3.connect(self.db_path)
+            self._connection.executescript(_SCHEMA)
+        return self._connection
+
+    def _walk(self) -> Iterator[Tuple[str, os.stat_result]]:
+        """Yield (relative path, stat) for every Python file."""
+        return iter_source_files(self.project_path, {'.py'})
+
+    def _add(self, connection: sqlite3.Connection, path: str, stat: os.stat_result):
+        """Chunk one file and insert its chunks and postings."""
+        try:
+            with open(os.path.join(self.project_path, path), 'r', errors='replace') as f:
+                text = f.read()
+        except OSError:
+            return
+
+        file_id = connection.execute('INSERT INTO files (path, mtime_ns, size) VALUES (?, ?, ?)',
+                                     (path, stat.st_mtime_ns, stat.st_size)).lastrowid
+        lines = text.splitlines()
+        with span('parse'):
+            for name, kind, start, end in chunk_source(text):
+                # A definition's name is its strongest signal, so its terms count twice
+                terms = Counter(tokenize('\n'.join(lines[start - 1:end])) + tokenize(name))
+                length = sum(terms.values())
+                chunk_id = connection.execute(
+                    'INSERT INTO chunks (file_id, name, kind, start, end, length) VALUES (?, ?, ?, ?, ?, ?)',
+                    (file_id, name, kind, start, end, length)).lastrowid
+                connection.executemany('INSERT INTO postings VALUES (?, ?, ?, ?)',
+                                       [(term, chunk_id, tf, length) for term, tf in terms.items()])
+        count('files_indexed')
+
+    @staticmethod
+    def _remove(connection: sqlite3.Connection, file_id: int):
+        """Delete a file with its chunks and postings."""
+        connection.execute('DELETE FROM postings WHERE chunk_id IN (SELECT id FROM chunks WHERE file_id = ?)', (file_id,))
+        connection.execute('DELETE FROM chunks WHERE file_id = ?', (file_id,))
+        connection.execute('DELETE FROM files WHERE id = ?', (file_id,))
+
+    def _read_lines(self, path: str, start: int, end: int) -> str:
+        """Source lines of a chunk, or an empty string if the file is gone."""
+        try:
+            with open(os.path.join(self.project_path, path), 'r', errors='replace') as f:
+                return ''.join(line for number, line in enumerate(f, 1) if start <= number <= end).rstrip('\n')
+        except OSError:
+            return ''
@@ -0,0 +1,319 @@
+"""
+Binary on-disk format of the code search index.
+
+Layout (all integers little-endian)::
+
+    header    magic 'CMIX', version u16, reserved u16, crc32 u32, body length u64
+    contents  (offset u64, length u64) for each section, offsets relative to the file start
+    strings   UTF-8 string table; records refer to strings by (offset u32, length u32)
+    files     fixed-width file records, indexed by file ID
+    trigrams  fixed-width trigram records sorted by key, each pointing into postings
+    postings  u32 file IDs, grouped per trigram
+    symbols   fixed-width symbol records, grouped per file in file order
+    order     u32 symbol record indices sorted by symbol name
+
+The crc32 covers everything after the header. Readers memory-map the file
+and binary-search the sorted tables, so a lookup touches a few pages no
+matter how large the index grows.
+"""
+import os
+import sys
+import mmap
+import zlib
+import struct
+from array import array
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
+
+MAGIC = b'CMIX'
+FORMAT_VERSION = 1
+
+HEADER = struct.Struct('<4sHHIQ')
+SECTION_NAMES = ('strings', 'files', 'trigrams', 'postings', 'symbols', 'order')
+CONTENTS = struct.Struct('<' + 'QQ' * len(SECTION_NAMES))
+
+# path offset, path length, mtime_ns, size, first symbol, symbol count
+FILE_RECORD = struct.Struct('<IIqqII')
+# trigram as zero-padded UTF-8, first posting, posting count
+TRIGRAM_RECORD = struct.Struct('<12sII')
+# name offset, name length, kind, file ID, line
+SYMBOL_RECORD = struct.Struct('<IIB3xII')
+
+SYMBOL_KINDS = ('class', 'function')
+
+_ALIGNMENT = 8
+
+
+class IndexFormatError(ValueError):
+    """Raised when an index file is truncated, corrupt or of an unknown version."""
+
+
+def _u32_array(data: bytes) -> array:
+    """Decode little-endian u32 values."""
+    values = array('I')
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def _u32_bytes(values: Iterable[int]) -> bytes:
+    """Encode values as little-endian u32."""
+    encoded = array('I', values)
+    if sys.byteorder == 'big':
+        encoded.byteswap()
+    return encoded.tobytes()
+
+
+def trigram_key(trigram: str) -> bytes:
+    """Fixed-width sort key of a trigram."""
+    return trigram.encode('utf-8', 'surrogatepass').ljust(12, b'\0')
+
+
+def write_index(path: str, files: List[Dict[str, Any]], postings: Dict[str, Iterable[int]]):
+    """
+    Write an index file atomically.
+
+    :param path: Destination path
+    :param files: File entries in file ID order, each with path, mtime_ns, size
+                  and symbols as [name, kind, line] lists
+    :param postings: File IDs per trigram
+    """
+    strings = bytearray()
+    string_refs: Dict[str, Tuple[int, int]] = {}
+
+    def ref(value: str) -> Tuple[int, int]:
+        if value not in string_refs:
+            encoded = value.encode('utf-8', 'surrogatepass')
+            string_refs[value] = (len(strings), len(encoded))
+            strings.extend(encoded)
+        return string_refs[value]
+
+    file_records = bytearray()
+    symbol_records = bytearray()
+    symbol_names = []
+    for entry in files:
+        first_symbol = len(symbol_names)
+        for name, kind, line in entry['symbols']:
+            symbol_records += SYMBOL_RECORD.pack(*ref(name), SYMBOL_KINDS.index(kind), len(file_records) // FILE_RECORD.size, line)
+            symbol_names.append(name)
+        file_records += FILE_RECORD.pack(*ref(entry['path']), entry['mtime_ns'], entry['size'],
+                                         first_symbol, len(symbol_names) - first_symbol)
+
+    trigram_records = bytearray()
+    posting_values = array('I')
+    for key, ids in sorted((trigram_key(trigram), sorted(ids)) for trigram, ids in postings.items()):
+        trigram_records += TRIGRAM_RECORD.pack(key, len(posting_values), len(ids))
+        posting_values.extend(ids)
+
+    order = sorted(range(len(symbol_names)), key=lambda index: (symbol_names[index].encode('utf-8', 'surrogatepass'), index))
+
+    sections = [bytes(strings), bytes(file_records), bytes(trigram_records),
+                _u32_bytes(posting_values), bytes(symbol_records), _u32_bytes(order)]
+
+    body = bytearray(CONTENTS.size)
+    contents = []
+    for section in sections:
+        body += b'\0' * (-(HEADER.size + len(body)) % _ALIGNMENT)
+        contents += [HEADER.size + len(body), len(section)]
+        body += section
+    CONTENTS.pack_into(body, 0, *contents)
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, 0, zlib.crc32(body), len(body))
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(body)
+    os.replace(tmp_path, path)
+
+
+class IndexReader:
+    """
+    Memory-mapped, read-only view of an index file.
+
+    Opening only validates the header and section bounds; the checksum is
+    checked by verify(), which reads the whole file.
+    """
+    def __init__(self, path: str):
+        """
+        Open an index file.
+
+        :param path: Path of the index file
+        :raises IndexFormatError: If the file is not a valid index
+        """
+        with open(path, 'rb') as f:
+            try:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise IndexFormatError(f"{path} is empty")
+
+        try:
+            if len(self._mm) < HEADER.size + CONTENTS.size:
+                raise IndexFormatError(f"{path} is truncated")
+            magic, version, _, self._checksum, body_length = HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC:
+                raise IndexFormatError(f"{path} is not a code index")
+            if version != FORMAT_VERSION:
+                raise IndexFormatError(f"{path} has unsupported version {version}")
+            if HEADER.size + body_length != len(self._mm):
+                raise IndexFormatError(f"{path} is truncated")
+
+            contents = CONTENTS.unpack_from(self._mm, HEADER.size)
+            self._sections = {}
+            for i, name in enumerate(SECTION_NAMES):
+                offset, length = contents[2 * i], contents[2 * i + 1]
+                if offset + length > len(self._mm):
+                    raise IndexFormatError(f"{path} has a corrupt {name} section")
+                self._sections[name] = (offset, length)
+        except BaseException:
+            self._mm.close()
+            raise
+
+        self.file_count = self._sections['files'][1] // FILE_RECORD.size
+        self.trigram_count = self._sections['trigrams'][1] // TRIGRAM_RECORD.size
+        self.symbol_count = self._sections['symbols'][1] // SYMBOL_RECORD.size
+
+    def verify(self):
+        """
+        Check the body against the header checksum.
+
+        :raises IndexFormatError: If the checksum does not match
+        """
+        if zlib.crc32(self._mm[HEADER.size:]) != self._checksum:
+            raise IndexFormatError("index checksum mismatch")
+
+    def file(self, file_id: int) -> Tuple[str, int, int]:
+        """
+        Read a file record.
+
+        :param file_id: File ID
+        :return: Tuple of (path, mtime_ns, size)
+        """
+        path_offset, path_length, mtime_ns, size, _, _ = self._file_record(file_id)
+        return self._string(path_offset, path_length), mtime_ns, size
+
+    def path(self, file_id: int) -> str:
+        """Path of a file."""
+        path_offset, path_length = struct.unpack_from('<II', self._mm, self._record_offset('files', FILE_RECORD, file_id))
+        return self._string(path_offset, path_length)
+
+    def iter_files(self) -> Iterator[Tuple[int, str, int, int]]:
+        """Yield (file ID, path, mtime_ns, size) for every file."""
+        for file_id in range(self.file_count):
+            yield (file_id, *self.file(file_id))
+
+    def file_symbols(self, file_id: int) -> List[List[Any]]:
+        """
+        Symbols defined in a file.
+
+        :param file_id: File ID
+        :return: (name, kind, line) tuples in line order
+        """
+        _, _, _, _, first, symbol_count = self._file_record(file_id)
+        return [self._symbol(index)[:3] for index in range(first, first + symbol_count)]
+
+    def postings(self, trigram: str) -> array:
+        """
+        IDs of the files containing a trigram.
+
+        :param trigram: Lowercase trigram
+        :return: Sorted file IDs (empty if the trigram is not indexed)
+        """
+        key = trigram_key(trigram)
+        low, high = 0, self.trigram_count
+        while low < high:
+            middle = (low + high) // 2
+            record_key, start, posting_count = TRIGRAM_RECORD.unpack_from(
+                self._mm, self._record_offset('trigrams', TRIGRAM_RECORD, middle))
+            if record_key < key:
+                low = middle + 1
+            elif record_key > key:
+                high = middle
+            else:
+                return self._postings(start, posting_count)
+        return array('I')
+
+    def iter_postings(self) -> Iterator[Tuple[str, array]]:
+        """Yield (trigram, file IDs) for every indexed trigram."""
+        for index in range(self.trigram_count):
+            key, start, posting_count = TRIGRAM_RECORD.unpack_from(
+                self._mm, self._record_offset('trigrams', TRIGRAM_RECORD, index))
+            # Trigrams are three characters; the rest of the key is padding (a trigram may itself contain NUL)
+            yield key.decode('utf-8', 'surrogatepass')[:3], self._postings(start, posting_count)
+
+    def find_symbol(self, name: str) -> List[Tuple[str, str, int, int]]:
+        """
+        Definitions of a symbol by exact name.
+
+        :param name: Symbol name
+        :return: Tuples of (name, kind, line, file ID)
+        """
+        key = name.encode('utf-8', 'surrogatepass')
+        order_offset = self._sections['order'][0]
+        low, high = 0, self.symbol_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._symbol_name_bytes(self._order(order_offset, middle)) < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        matches = []
+        while low < self.symbol_count:
+            index = self._order(order_offset, low)
+            if self._symbol_name_bytes(index) != key:
+                break
+            matches.append(self._symbol(index))
+            low += 1
+        return matches
+
+    def close(self):
+        """Unmap the file."""
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _record_offset(self, section: str, record: struct.Struct, index: int) -> int:
+        return self._sections[section][0] + index * record.size
+
+    def _file_record(self, file_id: int) -> Tuple[int, int, int, int, int, int]:
+        if not 0 <= file_id < self.file_count:
+            raise IndexError('file ID out of range')
+        return FILE_RECORD.unpack_from(self._mm, self._record_offset('files', FILE_RECORD, file_id))
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._sections['strings'][0] + offset
+        return self._mm[start:start + length].decode('utf-8', 'surrogatepass')
+
+    def _postings(self, start: int, posting_count: int) -> array:
+        offset = self._sections['postings'][0] + 4 * start
+        return _u32_array(self._mm[offset:offset + 4 * posting_count])
+
+    def _order(self, order_offset: int, position: int) -> int:
+        return struct.unpack_from('<I', self._mm, order_offset + 4 * position)[0]
+
+    def _symbol_name_bytes(self, index: int) -> bytes:
+        name_offset, name_length = struct.unpack_from('<II', self._mm, self._record_offset('symbols', SYMBOL_RECORD, index))
+        start = self._sections['strings'][0] + name_offset
+        return self._mm[start:start + name_length]
+
+    def _symbol(self, index: int) -> Tuple[str, str, int, int]:
+        name_offset, name_length, kind, file_id, line = SYMBOL_RECORD.unpack_from(
+            self._mm, self._record_offset('symbols', SYMBOL_RECORD, index))
+        return self._string(name_offset, name_length), SYMBOL_KINDS[kind], line, file_id
+
+
+def open_index(path: str) -> Optional[IndexReader]:
+    """
+    Open an index file if it exists and is valid.
+
+    :param path: Path of the index file
+    :return: Reader, or None when the file is missing or unreadable
+    """
+    try:
+        return IndexReader(path)
+    except (OSError, IndexFormatError):
+        return None
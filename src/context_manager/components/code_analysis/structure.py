@@ -0,0 +1,259 @@
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Dict, List, Any, Iterable, Iterator, Optional
+
+
+class StringTable:
+    """
+    Table of strings addressed by integer ID.
+
+    While being filled, strings are kept in a list (deduplicated when
+    interning). freeze() packs them into one string plus an offset array,
+    which removes the per-object overhead of every stored string; lookups
+    then slice the packed string on access.
+    """
+    __slots__ = ('_strings', '_ids', '_interning', '_blob', '_offsets')
+
+    def __init__(self, intern: bool = True):
+        """
+        Initialize the string table.
+
+        :param intern: Return the existing ID when an equal string is added again
+        """
+        self._interning = intern
+        self._strings: Optional[List[str]] = []
+        self._ids: Optional[Dict[str, int]] = {} if intern else None
+        self._blob: Optional[str] = None
+        self._offsets: Optional[array] = None
+
+    def add(self, value: str) -> int:
+        """
+        Add a string.
+
+        :param value: String to store
+        :return: ID of the string
+        """
+        if self._blob is not None:
+            self._thaw()
+        if self._ids is not None:
+            string_id = self._ids.get(value)
+            if string_id is not None:
+                return string_id
+            string_id = self._ids[value] = len(self._strings)
+        else:
+            string_id = len(self._strings)
+        self._strings.append(value)
+        return string_id
+
+    def freeze(self):
+        """Pack the strings into their compact read-only form."""
+        if self._blob is not None:
+            return
+        offsets, total = array('L', [0]), 0
+        for value in self._strings:
+            total += len(value)
+            offsets.append(total)
+        self._blob, self._offsets = ''.join(self._strings), offsets
+        self._strings = self._ids = None
+
+    def __getitem__(self, string_id: int) -> str:
+        if self._blob is None:
+            return self._strings[string_id]
+        offsets = self._offsets
+        return self._blob[offsets[string_id]:offsets[string_id + 1]]
+
+    def __len__(self) -> int:
+        return len(self._strings) if self._blob is None else len(self._offsets) - 1
+
+    def _thaw(self):
+        """Unpack a frozen table so more strings can be added."""
+        self._strings = [self[string_id] for string_id in range(len(self))]
+        self._blob = self._offsets = None
+        if self._interning:
+            self._ids = {value: string_id for string_id, value in enumerate(self._strings)}
+
+
+class SymbolList(Sequence):
+    """
+    Read-only list of symbol names backed by a slice of an ID column.
+    """
+    __slots__ = ('_symbols', '_ids', '_start', '_stop')
+
+    def __init__(self, symbols: StringTable, ids: array, start: int, stop: int):
+        self._symbols = symbols
+        self._ids = ids
+        self._start = start
+        self._stop = stop
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._symbols[symbol_id] for symbol_id in self._ids[self._start:self._stop][index]]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('symbol index out of range')
+        return self._symbols[self._ids[self._start + index]]
+
+    def __iter__(self) -> Iterator[str]:
+        symbols = self._symbols
+        for position in range(self._start, self._stop):
+            yield symbols[self._ids[position]]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, tuple, Sequence)) and not isinstance(other, str):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class FileRecord(Mapping):
+    """
+    Dict-compatible view of one analyzed file with 'path', 'classes' and 'functions' keys.
+    """
+    __slots__ = ('_structure', '_index')
+
+    KEYS = ('path', 'classes', 'functions')
+
+    def __init__(self, structure: 'ProjectStructure', index: int):
+        self._structure = structure
+        self._index = index
+
+    def __getitem__(self, key: str):
+        structure, index = self._structure, self._index
+        if key == 'path':
+            return structure._paths[index]
+        if key == 'classes':
+            offsets = structure._class_offsets
+            return SymbolList(structure._symbols, structure._class_ids, offsets[index], offsets[index + 1])
+        if key == 'functions':
+            offsets = structure._function_offsets
+            return SymbolList(structure._symbols, structure._function_ids, offsets[index], offsets[index + 1])
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialize the record as a plain dict."""
+        return {'path': self['path'], 'classes': list(self['classes']), 'functions': list(self['functions'])}
+
+    def __repr__(self) -> str:
+        return repr(self.to_dict())
+
+
+class FileList(Sequence):
+    """
+    Read-only list of FileRecord views, created on access.
+    """
+    __slots__ = ('_structure',)
+
+    def __init__(self, structure: 'ProjectStructure'):
+        self._structure = structure
+
+    def __len__(self) -> int:
+        return len(self._structure._paths)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [FileRecord(self._structure, i) for i in range(len(self))[index]]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('file index out of range')
+        return FileRecord(self._structure, index)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, tuple, Sequence)) and not isinstance(other, str):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr([record.to_dict() for record in self])
+
+
+class ProjectStructure(Mapping):
+    """
+    Columnar result of CodeGenerator.analyze_project_structure.
+
+    Symbol names are stored once in an interned string table and paths in a
+    second table; each file keeps only offsets into flat arrays of symbol
+    IDs. A large project therefore costs a few bytes per symbol instead of a
+    dict, two lists and several string objects per file. The object behaves
+    like the former dict: 'python_files' yields dict-like records with
+    'path', 'classes' and 'functions', created lazily on access.
+    """
+    KEYS = ('python_files', 'modules', 'packages')
+
+    def __init__(self):
+        self._symbols = StringTable()
+        self._paths = StringTable(intern=False)
+        self._class_ids = array('I')
+        self._class_offsets = array('I', [0])
+        self._function_ids = array('I')
+        self._function_offsets = array('I', [0])
+        self.modules: List[Any] = []
+        self.packages: List[Any] = []
+
+    def add_file(self, path: str, classes: Iterable[str], functions: Iterable[str]):
+        """
+        Append an analyzed file.
+
+        :param path: File path relative to the project
+        :param classes: Names of classes defined in the file
+        :param functions: Names of functions defined in the file
+        """
+        self._paths.add(path)
+        self._class_ids.extend(self._symbols.add(name) for name in classes)
+        self._class_offsets.append(len(self._class_ids))
+        self._function_ids.extend(self._symbols.add(name) for name in functions)
+        self._function_offsets.append(len(self._function_ids))
+
+    def freeze(self):
+        """Compact the string tables once all files were added."""
+        self._symbols.freeze()
+        self._paths.freeze()
+
+    @property
+    def python_files(self) -> FileList:
+        """Analyzed files as dict-like records."""
+        return FileList(self)
+
+    @property
+    def symbol_count(self) -> int:
+        """Number of distinct symbol names."""
+        return len(self._symbols)
+
+    def __getitem__(self, key: str):
+        if key == 'python_files':
+            return self.python_files
+        if key == 'modules':
+            return self.modules
+        if key == 'packages':
+            return self.packages
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Materialize the structure in the plain dict-of-lists form (e.g. for JSON).
+
+        :return: Dict with python_files, modules and packages
+        """
+        return {
+            'python_files': [record.to_dict() for record in self.python_files],
+            'modules': list(self.modules),
+            'packages': list(self.packages)
+        }
@@ -1 +1,3 @@
 from .dependency_tracker import DependencyTracker
+from .advisory_db import AdvisoryDatabase
+from .upgrade_planner import UpgradePlanner
@@ -0,0 +1,423 @@
+import io
+import os
+import re
+import gzip
+import json
+import sqlite3
+import zipfile
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
+from packaging.utils import canonicalize_version
+from packaging.version import InvalidVersion, Version
+
+from ...utils.profiling import span
+
+# OSV ecosystem whose advisories are matched against installed packages
+DEFAULT_ECOSYSTEM = 'PyPI'
+
+# Snapshot of all PyPI advisories; download it once to import offline
+OSV_SNAPSHOT_URL = 'https://osv-vulnerabilities.storage.googleapis.com/PyPI/all.zip'
+
+# Advisories written per executemany batch while importing
+IMPORT_BATCH_SIZE = 500
+
+# Size of the chunks read while streaming a JSON array
+_READ_CHUNK = 64 * 1024
+
+# Metadata key marking databases whose listed versions are stored as version_key()
+_VERSION_KEYS_MARKER = 'version_keys'
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS advisories (
+    id TEXT PRIMARY KEY,
+    modified TEXT,
+    summary TEXT,
+    aliases TEXT,
+    severity TEXT
+);
+CREATE TABLE IF NOT EXISTS ranges (
+    advisory_id TEXT NOT NULL,
+    package TEXT NOT NULL,
+    introduced TEXT,
+    fixed TEXT,
+    last_affected TEXT
+);
+CREATE TABLE IF NOT EXISTS versions (
+    advisory_id TEXT NOT NULL,
+    package TEXT NOT NULL,
+    version TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS ranges_by_package ON ranges (package);
+CREATE INDEX IF NOT EXISTS ranges_by_advisory ON ranges (advisory_id);
+CREATE INDEX IF NOT EXISTS versions_by_package ON versions (package, version);
+CREATE INDEX IF NOT EXISTS versions_by_advisory ON versions (advisory_id);
+'''
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalize a package name as in PEP 503.
+
+    :param name: Package name
+    :return: Lowercase name with runs of '-', '_' and '.' collapsed to '-'
+    """
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+
+def _parse_version(value: Optional[str]) -> Optional[Version]:
+    """Parse a version, returning None when it is missing or not PEP 440."""
+    if value is None:
+        return None
+    try:
+        return Version(value)
+    except InvalidVersion:
+        return None
+
+
+def version_key(value: str) -> str:
+    """
+    Canonical form of a version for exact-match lookups.
+
+    Versions that are equal under PEP 440 share one key, so 1.0 and 1.0.0 or
+    1.0rc1 and 1.0.0rc1 match each other. Versions that are not PEP 440 are
+    kept as they are.
+
+    :param value: Version string
+    :return: Lookup key
+    """
+    if _parse_version(value) is None:
+        return value
+    return canonicalize_version(value)
+
+
+def affected_intervals(events: List[Dict[str, str]]) -> List[Tuple[Optional[str], Optional[str], Optional[str]]]:
+    """
+    Turn the events of an OSV ECOSYSTEM range into affected intervals.
+
+    Events are ordered by version; each 'introduced' opens an interval that
+    the next 'fixed' (exclusive) or 'last_affected' (inclusive) closes. An
+    interval left open affects every later version.
+
+    :param events: OSV range events
+    :return: (introduced, fixed, last_affected) tuples; introduced is None for "0"
+    """
+    def sort_key(event):
+        kind, value = next(iter(event.items()))
+        parsed = Version('0') if value == '0' else _parse_version(value)
+        return parsed is None, parsed or Version('0')
+
+    intervals = []
+    start, opened = None, False
+    for event in sorted((event for event in events if event), key=sort_key):
+        kind, value = next(iter(event.items()))
+        if kind == 'introduced':
+            if not opened:
+                start, opened = (None if value == '0' else value), True
+        elif kind == 'fixed' and opened:
+            intervals.append((start, value, None))
+            opened = False
+        elif kind == 'last_affected' and opened:
+            intervals.append((start, None, value))
+            opened = False
+    if opened:
+        intervals.append((start, None, None))
+    return intervals
+
+
+def _iter_json_array(stream: io.TextIOBase) -> Iterator[Any]:
+    """Decode the elements of a top-level JSON array (or one object) chunk by chunk."""
+    decoder = json.JSONDecoder()
+    buffer, position, started = '', 0, False
+    while True:
+        chunk = stream.read(_READ_CHUNK)
+        buffer = buffer[position:] + chunk
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if not started and position < len(buffer):
+                if buffer[position] == '{':
+                    # A single advisory rather than an array
+                    break
+                if buffer[position] != '[':
+                    raise ValueError("Advisory file is neither a JSON object nor an array")
+                started, position = True, position + 1
+                continue
+            if position < len(buffer) and buffer[position] == ']':
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except ValueError:
+                # The element continues in the next chunk
+                break
+            yield item
+            position = end
+        if not chunk:
+            if not started and buffer.strip():
+                yield json.loads(buffer)
+                return
+            if buffer[position:].strip():
+                raise ValueError("Advisory file ends inside a JSON value")
+            return
+
+
+def iter_advisories(source: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream OSV advisories from a snapshot without loading it whole.
+
+    Supported snapshots are OSV's zip archives of one JSON file per advisory,
+    directories of JSON files, JSON Lines files (optionally gzip-compressed)
+    and JSON files holding one advisory or an array of them.
+
+    :param source: Path of the snapshot
+    :return: Iterator of advisory dicts
+    """
+    if os.path.isdir(source):
+        for root, _, files in os.walk(source):
+            for name in sorted(files):
+                if name.endswith('.json'):
+                    with open(os.path.join(root, name), 'r', encoding='utf-8') as f:
+                        yield from _iter_json_array(f)
+        return
+
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                if info.filename.endswith('.json'):
+                    with archive.open(info) as member:
+                        yield from _iter_json_array(io.TextIOWrapper(member, encoding='utf-8'))
+        return
+
+    opener = gzip.open if source.endswith('.gz') else open
+    with opener(source, 'rt', encoding='utf-8') as f:
+        if source.endswith(('.jsonl', '.jsonl.gz', '.ndjson', '.ndjson.gz')):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from _iter_json_array(f)
+
+
+class AdvisoryDatabase:
+    """
+    Local store of OSV vulnerability advisories, indexed by package.
+
+    Snapshots are streamed into an SQLite database: every affected range
+    becomes (introduced, fixed, last_affected) rows and every explicitly
+    listed version a row of its own, both indexed by normalized package
+    name. A lookup therefore reads only the rows of one package instead of
+    scanning all advisories, and needs no network access.
+    """
+    def __init__(self, db_path: str, ecosystem: str = DEFAULT_ECOSYSTEM):
+        """
+        Initialize the advisory database.
+
+        :param db_path: Path of the SQLite database (created on first import)
+        :param ecosystem: OSV ecosystem of the packages to index
+        """
+        self.db_path = db_path
+        self.ecosystem = ecosystem
+        self._connection: Optional[sqlite3.Connection] = None
+        self._intervals: Dict[str, List[Tuple[str, Optional[Version], Optional[Version], Optional[Version]]]] = {}
+
+    def exists(self) -> bool:
+        """Whether a database has been imported."""
+        return os.path.exists(self.db_path)
+
+    def import_snapshot(self, source: str) -> Dict[str, int]:
+        """
+        Import an OSV snapshot, replacing advisories whose 'modified' changed.
+
+        :param source: Path of the snapshot (see iter_advisories)
+        :return: Counts of added, updated, unchanged and skipped advisories
+        """
+        stats = {'added': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0}
+        connection = self._connect(create=True)
+        known = dict(connection.execute('SELECT id, modified FROM advisories'))
+
+        batch: List[Dict[str, Any]] = []
+        replaced: List[str] = []
+        with connection:
+            for advisory in iter_advisories(source):
+                advisory_id = advisory.get('id')
+                packages = self._affected(advisory)
+                if not advisory_id or advisory.get('withdrawn') or not packages:
+                    stats['skipped'] += 1
+                    continue
+                if advisory_id in known and known[advisory_id] == advisory.get('modified'):
+                    stats['unchanged'] += 1
+                    continue
+                if advisory_id in known:
+                    stats['updated'] += 1
+                    replaced.append(advisory_id)
+                else:
+                    stats['added'] += 1
+                known[advisory_id] = advisory.get('modified')
+                batch.append(advisory)
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    self._write(connection, batch, replaced)
+                    batch, replaced = [], []
+            if batch:
+                self._write(connection, batch, replaced)
+            connection.execute('INSERT OR REPLACE INTO metadata VALUES (?, ?)', ('source', os.path.abspath(source)))
+
+        self._intervals.clear()
+        return stats
+
+    def affected(self, package: str, installed_version: str) -> List[Dict[str, Any]]:
+        """
+        Advisories affecting one installed version of a package.
+
+        :param package: Package name
+        :param installed_version: Installed version
+        :return: Advisories with id, summary, aliases, severity and fixed versions
+        """
+        if not self.exists():
+            return []
+        name = normalize_name(package)
+        connection = self._connect()
+        matched = {advisory_id for (advisory_id,) in connection.execute(
+            'SELECT advisory_id FROM versions WHERE package = ? AND version = ?', (name, version_key(installed_version)))}
+
+        parsed = _parse_version(installed_version)
+        if parsed is not None:
+            for advisory_id, introduced, fixed, last_affected in self._package_intervals(name):
+                if introduced is not None and parsed < introduced:
+                    continue
+                if fixed is not None and parsed >= fixed:
+                    continue
+                if last_affected is not None and parsed > last_affected:
+                    continue
+                matched.add(advisory_id)
+        return [self._describe(advisory_id, name) for advisory_id in sorted(matched)]
+
+    def check(self, packages: Iterable[Tuple[str, str]]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Find advisories for several installed packages.
+
+        :param packages: (name, version) pairs
+        :return: Affected advisories per package name, only for affected packages
+        """
+        vulnerabilities = {}
+        with span('advisory_lookup'):
+            for name, installed_version in packages:
+                advisories = self.affected(name, installed_version)
+                if advisories:
+                    vulnerabilities[name] = advisories
+        return vulnerabilities
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Describe the imported data.
+
+        :return: Number of advisories and indexed packages, and the snapshot imported last
+        """
+        if not self.exists():
+            return {'advisories': 0, 'packages': 0, 'source': None}
+        connection = self._connect()
+        source = connection.execute("SELECT value FROM metadata WHERE key = 'source'").fetchone()
+        return {
+            'advisories': connection.execute('SELECT COUNT(*) FROM advisories').fetchone()[0],
+            'packages': connection.execute(
+                'SELECT COUNT(*) FROM (SELECT package FROM ranges UNION SELECT package FROM versions)').fetchone()[0],
+            'source': source[0] if source else None
+        }
+
+    def close(self):
+        """Close the database connection."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _connect(self, create: bool = False) -> sqlite3.Connection:
+        """Open the database, creating its schema when importing."""
+        if self._connection is None:
+            if create:
+                os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            self._connection = sqlite3.connect(self.db_path)
+            if create:
+                self._connection.executescript(_SCHEMA)
+            self._migrate_version_keys(self._connection)
+        return self._connection
+
+    @staticmethod
+    def _migrate_version_keys(connection: sqlite3.Connection):
+        """Rewrite listed versions imported before they were stored as version_key()."""
+        if connection.execute('SELECT 1 FROM metadata WHERE key = ?', (_VERSION_KEYS_MARKER,)).fetchone():
+            return
+        try:
+            with connection:
+                rows = connection.execute('SELECT rowid, version FROM versions').fetchall()
+                connection.executemany('UPDATE versions SET version = ? WHERE rowid = ?',
+                                       [(version_key(version), rowid) for rowid, version in rows
+                                        if version_key(version) != version])
+                connection.execute('INSERT OR REPLACE INTO metadata VALUES (?, ?)', (_VERSION_KEYS_MARKER, '1'))
+        except sqlite3.OperationalError:
+            # A read-only database keeps its rows; versions spelled as listed still match
+            pass
+
+    def _affected(self, advisory: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Affected entries of an advisory in this database's ecosystem."""
+        return [entry for entry in advisory.get('affected') or []
+                if (entry.get('package') or {}).get('ecosystem') == self.ecosystem
+                and entry['package'].get('name')]
+
+    def _write(self, connection: sqlite3.Connection, advisories: List[Dict[str, Any]], replaced: List[str]):
+        """Insert a batch of advisories, dropping the old rows of the replaced ones."""
+        ids = [(advisory_id,) for advisory_id in replaced]
+        connection.executemany('DELETE FROM ranges WHERE advisory_id = ?', ids)
+        connection.executemany('DELETE FROM versions WHERE advisory_id = ?', ids)
+
+        advisory_rows, range_rows, version_rows = [], [], []
+        for advisory in advisories:
+            severity = [entry.get('score') for entry in advisory.get('severity') or [] if entry.get('score')]
+            advisory_rows.append((advisory['id'], advisory.get('modified'), advisory.get('summary'),
+                                  json.dumps(advisory.get('aliases') or []), json.dumps(severity)))
+            for entry in self._affected(advisory):
+                package = normalize_name(entry['package']['name'])
+                for affected_range in entry.get('ranges') or []:
+                    if affected_range.get('type') not in ('ECOSYSTEM', 'SEMVER'):
+                        continue
+                    for interval in affected_intervals(affected_range.get('events') or []):
+                        range_rows.append((advisory['id'], package, *interval))
+                for affected_version in entry.get('versions') or []:
+                    version_rows.append((advisory['id'], package, version_key(affected_version)))
+
+        connection.executemany('INSERT OR REPLACE INTO advisories VALUES (?, ?, ?, ?, ?)', advisory_rows)
+        connection.executemany('INSERT INTO ranges VALUES (?, ?, ?, ?, ?)', range_rows)
+        connection.executemany('INSERT INTO versions VALUES (?, ?, ?)', version_rows)
+
+    def _package_intervals(self, package: str):
+        """Parsed affected intervals of a package, cached per database instance."""
+        intervals = self._intervals.get(package)
+        if intervals is None:
+            intervals = []
+            for advisory_id, introduced, fixed, last_affected in self._connect().execute(
+                    'SELECT advisory_id, introduced, fixed, last_affected FROM ranges WHERE package = ?', (package,)):
+                bounds = [_parse_version(value) for value in (introduced, fixed, last_affected)]
+                # Bounds that are not PEP 440 versions cannot be compared; rely on listed versions
+                if any(value is not None and bound is None
+                       for value, bound in zip((introduced, fixed, last_affected), bounds)):
+                    continue
+                intervals.append((advisory_id, *bounds))
+            self._intervals[package] = intervals
+        return intervals
+
+    def _describe(self, advisory_id: str, package: str) -> Dict[str, Any]:
+        """Advisory details with the versions fixing it for a package."""
+        connection = self._connect()
+        summary, aliases, severity = connection.execute(
+            'SELECT summary, aliases, severity FROM advisories WHERE id = ?', (advisory_id,)).fetchone()
+        fixed = [value for (value,) in connection.execute(
+            'SELECT DISTINCT fixed FROM ranges WHERE advisory_id = ? AND package = ? AND fixed IS NOT NULL',
+            (advisory_id, package))]
+        return {
+            'id': advisory_id,
+            'summary': summary,
+            'aliases': json.loads(aliases),
+            'severity': json.loads(severity),
+            'fixed': sorted(fixed, key=lambda value: _parse_version(value) or Version('0'))
+        }
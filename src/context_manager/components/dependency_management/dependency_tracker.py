@@ -5,6 +5,10 @@ import requests
 from typing import Dict, List, Any
 from packaging import version
 
+from ...utils.profiling import count, span
+from .advisory_db import AdvisoryDatabase
+from .upgrade_planner import PackageMetadataCache, UpgradePlanner
+
 class DependencyTracker:
     """
     Manages project dependencies, tracking versions, updates, and compatibility.
@@ -12,30 +16,54 @@ class DependencyTracker:
     def __init__(self, project_path: str):
         self.project_path = project_path
         self.pypi_url = "https://pypi.org/pypi"
+        self.advisories = AdvisoryDatabase(os.path.join(project_path, '.context', 'advisories', 'osv.db'))
+
+    def import_advisories(self, snapshot: str) -> Dict[str, Any]:
+        """
+        Import an OSV advisory snapshot into the project's local advisory database.
+        
+        :param snapshot: Path of the snapshot (e.g. OSV's PyPI all.zip)
+        :return: Import counts, or an error
+        """
+        try:
+            return self.advisories.import_snapshot(snapshot)
+        except Exception as e:
+            return {
+                'error': str(e),
+                'details': 'Unable to import advisories'
+            }
 
-    def check_dependencies(self) -> Dict[str, Any]:
+    def check_dependencies(self, offline: bool = False) -> Dict[str, Any]:
         """
         Check current project dependencies and potential updates.
         
+        When an advisory database was imported, installed versions with known
+        vulnerabilities are reported under 'vulnerabilities'; that check never
+        touches the network.
+        
+        :param offline: Skip the PyPI update check
         :return: Dictionary of dependency information
         """
         try:
             # Get installed packages
-            result = subprocess.run(
-                ['pip', 'list', '--format=json'], 
-                capture_output=True, 
-                text=True
-            )
+            with span('subprocess'):
+                result = subprocess.run(
+                    ['pip', 'list', '--format=json'], 
+                    capture_output=True, 
+                    text=True
+                )
             installed_packages = json.loads(result.stdout)
             
             # Check for updates
             updates = {}
-            for pkg in installed_packages:
+            for pkg in ([] if offline else installed_packages):
                 name, current_version = pkg['name'], pkg['version']
                 
                 try:
                     # Get latest version from PyPI
-                    response = requests.get(f"{self.pypi_url}/{name}/json")
+                    count('http_requests')
+                    with span('http'):
+                        response = requests.get(f"{self.pypi_url}/{name}/json")
                     latest_version = response.json()['info']['version']
                     
                     # Compare versions
@@ -48,10 +76,14 @@ class DependencyTracker:
                     # Skip if unable to fetch version
                     pass
             
-            return {
+            report = {
                 'installed_packages': installed_packages,
                 'updates_available': updates
             }
+            if self.advisories.exists():
+                report['vulnerabilities'] = self.advisories.check(
+                    (pkg['name'], pkg['version']) for pkg in installed_packages)
+            return report
         
         except Exception as e:
             return {
@@ -59,6 +91,38 @@ class DependencyTracker:
                 'details': 'Unable to check dependencies'
             }
 
+    def plan_upgrades(self, offline: bool = False, python_version: str = None) -> Dict[str, Any]:
+        """
+        Plan a mutually compatible set of upgrades for the installed packages.
+        
+        Unlike check_dependencies, which reports each package's latest version
+        on its own, the plan respects Requires-Dist and Requires-Python of the
+        chosen versions and explains which constraint holds back each package.
+        Metadata is cached under .context/pypi_cache.
+        
+        :param offline: Plan from cached metadata only
+        :param python_version: Python version to plan for (defaults to the running interpreter)
+        :return: Plan with upgrades, blocked and skipped packages and solver statistics
+        """
+        try:
+            with span('subprocess'):
+                result = subprocess.run(
+                    ['pip', 'list', '--format=json'],
+                    capture_output=True,
+                    text=True
+                )
+            installed = {pkg['name']: pkg['version'] for pkg in json.loads(result.stdout)}
+            
+            metadata = PackageMetadataCache(os.path.join(self.project_path, '.context', 'pypi_cache'),
+                                            pypi_url=self.pypi_url, offline=offline)
+            return UpgradePlanner(installed, metadata, python_version=python_version).plan()
+        
+        except Exception as e:
+            return {
+                'error': str(e),
+                'details': 'Unable to plan upgrades'
+            }
+
     def update_dependencies(self, dependencies: List[str]) -> Dict[str, str]:
         """
         Update specified dependencies.
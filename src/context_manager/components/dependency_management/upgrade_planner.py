@@ -0,0 +1,558 @@
+import os
+import json
+import time
+import platform
+from importlib import metadata as importlib_metadata
+from typing import Dict, List, Any, FrozenSet, Optional, Tuple
+import requests
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.specifiers import SpecifierSet
+from packaging.version import InvalidVersion, Version
+
+from ...utils.profiling import count, span
+from .advisory_db import normalize_name
+
+# Lifetime of cached release lists; per-release metadata never changes
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+# Upper bound on candidate versions tried before the resolver gives up
+DEFAULT_MAX_STEPS = 1_000_000
+
+
+class PackageMetadataCache:
+    """
+    On-disk cache of PyPI release metadata (Requires-Python, Requires-Dist).
+
+    Each package is one JSON file holding its release list and the
+    Requires-Dist of every release looked at so far. Release lists are
+    refreshed after the TTL; Requires-Dist of a release is fetched once.
+    Requirements of installed versions are read from the local distribution
+    metadata, so an offline plan never needs more than the cache.
+    """
+    def __init__(self, cache_dir: str, pypi_url: str = "https://pypi.org/pypi", offline: bool = False,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        """
+        Initialize the metadata cache.
+
+        :param cache_dir: Directory holding cached metadata (e.g. .context/pypi_cache)
+        :param pypi_url: Base URL of the PyPI JSON API
+        :param offline: Never fetch; missing metadata stays unknown
+        :param ttl_seconds: Age after which release lists are refetched when online
+        """
+        self.cache_dir = cache_dir
+        self.pypi_url = pypi_url
+        self.offline = offline
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Dict[str, Any]] = {}
+
+    def releases(self, name: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Published releases of a package.
+
+        :param name: Package name
+        :return: Version -> {'requires_python', 'yanked'}, or None when unknown
+        """
+        entry = self._entry(name)
+        if entry is None or 'releases' not in entry or (
+                not self.offline and time.time() - entry.get('fetched_at', 0) > self.ttl_seconds):
+            entry = self._fetch_releases(name) or entry
+        return entry.get('releases') if entry else None
+
+    def requires(self, name: str, release: str) -> Optional[List[str]]:
+        """
+        Requires-Dist of one release.
+
+        :param name: Package name
+        :param release: Version of the release
+        :return: Requirement strings, or None when unknown
+        """
+        installed = self._installed_requires(name, release)
+        if installed is not None:
+            return installed
+
+        entry = self._entry(name) or {}
+        if release in entry.get('requires', {}):
+            return entry['requires'][release]
+        if self.offline:
+            return None
+
+        try:
+            count('http_requests')
+            with span('http'):
+                response = requests.get(f"{self.pypi_url}/{name}/{release}/json", timeout=30)
+            response.raise_for_status()
+            requires = response.json()['info'].get('requires_dist') or []
+        except Exception:
+            return None
+
+        entry = self._entry(name) or {}
+        entry.setdefault('requires', {})[release] = requires
+        self._store(name, entry)
+        return requires
+
+    @staticmethod
+    def _installed_requires(name: str, release: str) -> Optional[List[str]]:
+        """Requires-Dist of the installed distribution if it is this release."""
+        try:
+            distribution = importlib_metadata.distribution(name)
+        except importlib_metadata.PackageNotFoundError:
+            return None
+        if distribution.version != release:
+            return None
+        return list(distribution.requires or [])
+
+    def _fetch_releases(self, name: str) -> Optional[Dict[str, Any]]:
+        """Fetch the release list (and the latest Requires-Dist) from PyPI."""
+        if self.offline:
+            return None
+        try:
+            count('http_requests')
+            with span('http'):
+                response = requests.get(f"{self.pypi_url}/{name}/json", timeout=30)
+            response.raise_for_status()
+            data = response.json()
+        except Exception:
+            return None
+
+        releases = {}
+        for release, files in (data.get('releases') or {}).items():
+            # Releases without files cannot be installed
+            if files:
+                releases[release] = {
+                    'requires_python': files[0].get('requires_python'),
+                    'yanked': all(f.get('yanked') for f in files)
+                }
+
+        entry = self._entry(name) or {}
+        entry.update(fetched_at=time.time(), releases=releases)
+        info = data.get('info') or {}
+        if info.get('version'):
+            entry.setdefault('requires', {})[info['version']] = info.get('requires_dist') or []
+        self._store(name, entry)
+        return entry
+
+    def _entry(self, name: str) -> Optional[Dict[str, Any]]:
+        """Cached entry of a package, loaded from disk on first use."""
+        key = normalize_name(name)
+        if key not in self._entries:
+            try:
+                with open(os.path.join(self.cache_dir, f"{key}.json"), 'r') as f:
+                    self._entries[key] = json.load(f)
+            except (OSError, ValueError):
+                self._entries[key] = None
+        return self._entries[key]
+
+    def _store(self, name: str, entry: Dict[str, Any]):
+        """Persist a package entry atomically."""
+        key = normalize_name(name)
+        self._entries[key] = entry
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = os.path.join(self.cache_dir, f"{key}.json")
+        tmp_path = f"{path}.tmp.{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+
+class UpgradePlanner:
+    """
+    Finds the newest mutually compatible versions of the installed packages.
+
+    Packages are assigned one at a time, newest candidate first; a candidate
+    must satisfy the requirements of the packages already assigned, and its
+    own requirements must hold for them. After each assignment the
+    constrained packages are checked to still have a viable candidate
+    (forward checking). Packages are taken in dependency order, so most
+    requirements are checked against versions already chosen.
+
+    When a package runs out of candidates, the assigned versions that ruled
+    them out form its conflict set. The failure is memoized as a nogood, and
+    the search jumps straight back to the latest package in the conflict set
+    (backjumping) instead of retrying unrelated packages in between. A
+    later state repeating a nogood's versions is skipped without being
+    re-explored.
+
+    Only upgrades are considered. Conflicts already present between the
+    installed versions are tolerated, so keeping everything as it is is
+    always a solution.
+    """
+    def __init__(self, installed: Dict[str, str], metadata: PackageMetadataCache,
+                 python_version: Optional[str] = None, allow_prereleases: bool = False,
+                 max_steps: int = DEFAULT_MAX_STEPS):
+        """
+        Initialize the upgrade planner.
+
+        :param installed: Installed version per package name
+        :param metadata: Source of release metadata
+        :param python_version: Python version to plan for (defaults to the running interpreter)
+        :param allow_prereleases: Consider pre-releases of packages not already on one
+        :param max_steps: Maximum number of candidates tried before giving up
+        """
+        self.metadata = metadata
+        self.python_version = Version(python_version or platform.python_version())
+        self.allow_prereleases = allow_prereleases
+        self.max_steps = max_steps
+        self.names: Dict[str, str] = {}
+        self.installed: Dict[str, Version] = {}
+        # Packages whose installed version is not PEP 440 cannot be compared;
+        # they are kept as they are and requirements on them are not checked
+        self.skipped: Dict[str, str] = {}
+        for name, release in installed.items():
+            try:
+                version = Version(release)
+            except InvalidVersion:
+                self.skipped[name] = release
+                continue
+            self.names[normalize_name(name)] = name
+            self.installed[normalize_name(name)] = version
+        self.order = sorted(self.installed)
+        self.level = {name: index for index, name in enumerate(self.order)}
+        self.stats = {'steps': 0, 'backtracks': 0, 'nogood_hits': 0, 'seconds': 0.0}
+
+        self._environment = {'python_version': f"{self.python_version.major}.{self.python_version.minor}",
+                             'python_full_version': str(self.python_version), 'extra': ''}
+        self._candidates: Dict[str, List[Version]] = {}
+        # Requirements refer to specifiers by index into _specifiers; hashing
+        # SpecifierSet objects for memo keys would dominate the solve time
+        self._specifiers: List[SpecifierSet] = []
+        self._specifier_ids: Dict[str, int] = {}
+        self._requirements: Dict[Tuple[str, Version], Optional[List[Tuple[str, int, str]]]] = {}
+        self._contains: Dict[Tuple[int, Version], bool] = {}
+        self._latest: Dict[str, Optional[Version]] = {}
+        self._dependents: Dict[str, set] = {}
+        self._excluded: Dict[Any, FrozenSet[Version]] = {}
+
+    def plan(self) -> Dict[str, Any]:
+        """
+        Compute a compatible set of upgrades.
+
+        :return: Dict with 'upgrades' (current, target), 'blocked' (latest,
+                 target and the constraints blocking the latest release),
+                 'unchanged', 'skipped' (installed versions that are not
+                 PEP 440) and solver 'stats'; or an 'error'
+        """
+        started = time.perf_counter()
+        try:
+            with span('resolve'):
+                solution = self._solve()
+        finally:
+            self.stats['seconds'] = round(time.perf_counter() - started, 6)
+        if solution is None:
+            return {'error': f"No solution within {self.max_steps} steps", 'stats': self.stats}
+
+        upgrades, blocked, unchanged = {}, {}, []
+        for name in sorted(self.installed):
+            current, target = self.installed[name], solution[name]
+            display = self.names[name]
+            if target != current:
+                upgrades[display] = {'current': str(current), 'target': str(target)}
+            else:
+                unchanged.append(display)
+
+            latest = self._latest_release(name)
+            if latest is not None and latest > target:
+                blocked[display] = {'current': str(current), 'target': str(target), 'latest': str(latest),
+                                    'blocked_by': self._blockers(name, latest, solution)}
+        return {'upgrades': upgrades, 'blocked': blocked, 'unchanged': unchanged,
+                'skipped': dict(sorted(self.skipped.items())), 'stats': self.stats}
+
+    def _solve(self) -> Optional[Dict[str, Version]]:
+        """Backtracking search assigning packages in dependency order."""
+        self.order = self._dependency_order()
+        self.level = {name: index for index, name in enumerate(self.order)}
+        assignment: Dict[str, Version] = {}
+        imposed: Dict[str, List[Tuple[int, str]]] = {name: [] for name in self.order}
+        # Learned nogoods, indexed by each package they mention
+        nogoods: Dict[str, List[Dict[str, FrozenSet[Version]]]] = {}
+        # Per level: [candidate iterator, packages the current candidate constrains, conflict]
+        frames: List[List[Any]] = []
+
+        descend = True
+        while True:
+            if descend:
+                level = len(frames)
+                if level == len(self.order):
+                    return dict(assignment)
+                frames.append([iter(self._candidates_of(self.order[level])), None, {}])
+
+            level = len(frames) - 1
+            frame = frames[level]
+            name = self.order[level]
+            if frame[1] is not None:
+                self._unassign(name, frame[1], assignment, imposed)
+                frame[1] = None
+
+            for candidate in frame[0]:
+                self.stats['steps'] += 1
+                if self.stats['steps'] > self.max_steps:
+                    return None
+                touched = self._try_assign(name, candidate, assignment, imposed, nogoods, frame[2])
+                if touched is not None:
+                    frame[1] = touched
+                    descend = True
+                    break
+            else:
+                # Out of candidates: learn the versions that ruled them all out,
+                # then jump back to the latest package involved
+                self.stats['backtracks'] += 1
+                conflict = frames.pop()[2]
+                if not conflict:
+                    return None
+                learned = {other: frozenset(versions) for other, versions in conflict.items()}
+                for other in learned:
+                    nogoods.setdefault(other, []).append(learned)
+                target = max(self.level[other] for other in conflict)
+                while len(frames) > target + 1:
+                    skipped = frames.pop()
+                    if skipped[1] is not None:
+                        self._unassign(self.order[len(frames)], skipped[1], assignment, imposed)
+                self._merge(frames[-1][2], {other: versions for other, versions in learned.items()
+                                            if other != self.order[target]})
+                descend = False
+
+    def _try_assign(self, name: str, candidate: Version, assignment: Dict[str, Version],
+                    imposed: Dict[str, List[Tuple[int, str]]],
+                    nogoods: Dict[str, List[Dict[str, FrozenSet[Version]]]],
+                    conflict: Dict[str, set]) -> Optional[List[str]]:
+        """
+        Assign a candidate if consistent and return the packages it newly constrains.
+
+        When the candidate is rejected, the versions of assigned packages that
+        would reject it the same way are merged into conflict.
+        """
+        for specifier, source in imposed[name]:
+            if not self._allows(specifier, name, candidate, source, assignment[source]):
+                self._merge(conflict, {source: self._excluding(source, name, candidate)})
+                return None
+
+        for nogood in nogoods.get(name, ()):
+            if candidate in nogood[name] and all(other == name or assignment.get(other) in versions
+                                                 for other, versions in nogood.items()):
+                self.stats['nogood_hits'] += 1
+                self._merge(conflict, {other: versions for other, versions in nogood.items() if other != name})
+                return None
+
+        requirements = self._requirements_of(name, candidate)
+        if requirements is None:
+            return None
+        for dependency, specifier, _ in requirements:
+            if dependency in assignment and not self._allows(specifier, dependency, assignment[dependency],
+                                                             name, candidate):
+                self._merge(conflict, {dependency: self._outside(specifier, dependency, name, candidate)})
+                return None
+
+        assignment[name] = candidate
+        touched = []
+        for dependency, specifier, _ in requirements:
+            if dependency not in assignment:
+                imposed[dependency].append((specifier, name))
+                touched.append(dependency)
+
+        # Look ahead: every package this one constrains, or may be constrained
+        # by, keeps at least one viable candidate
+        for other in touched + [dependent for dependent in self._dependents[name] if dependent not in assignment]:
+            reasons: Dict[str, set] = {}
+            if not self._viable(other, assignment, imposed, reasons):
+                reasons.pop(name, None)
+                self._merge(conflict, reasons)
+                self._unassign(name, touched, assignment, imposed)
+                return None
+        return touched
+
+    def _viable(self, name: str, assignment: Dict[str, Version],
+                imposed: Dict[str, List[Tuple[int, str]]], reasons: Dict[str, set]) -> bool:
+        """Whether an unassigned package has a candidate consistent with the assignment so far."""
+        for option in self._candidates_of(name):
+            rejected = next((source for specifier, source in imposed[name]
+                             if not self._allows(specifier, name, option, source, assignment[source])), None)
+            if rejected is not None:
+                self._merge(reasons, {rejected: self._excluding(rejected, name, option)})
+                continue
+            requirements = self._requirements_of(name, option)
+            if requirements is None:
+                continue
+            rejected = next(((dependency, specifier) for dependency, specifier, _ in requirements
+                             if dependency in assignment and not self._allows(
+                                 specifier, dependency, assignment[dependency], name, option)), None)
+            if rejected is None:
+                return True
+            self._merge(reasons, {rejected[0]: self._outside(rejected[1], rejected[0], name, option)})
+        return False
+
+    @staticmethod
+    def _merge(conflict: Dict[str, set], reasons: Dict[str, FrozenSet[Version]]):
+        """Add reasons to a conflict; a package named twice must satisfy both."""
+        for name, versions in reasons.items():
+            conflict[name] = conflict[name] & versions if name in conflict else set(versions)
+
+    def _excluding(self, source: str, name: str, candidate: Version) -> FrozenSet[Version]:
+        """Versions of source whose requirements rule out a candidate of name."""
+        key = (source, name, candidate)
+        versions = self._excluded.get(key)
+        if versions is None:
+            versions = self._excluded[key] = frozenset(
+                release for release in self._candidates_of(source)
+                if any(dependency == name and not self._allows(specifier, name, candidate, source, release)
+                       for dependency, specifier, _ in self._requirements_of(source, release) or []))
+        return versions
+
+    def _outside(self, specifier: int, dependency: str, name: str, candidate: Version) -> FrozenSet[Version]:
+        """Versions of dependency that a requirement of a candidate of name rules out."""
+        key = (name, candidate, dependency, specifier)
+        versions = self._excluded.get(key)
+        if versions is None:
+            versions = self._excluded[key] = frozenset(
+                release for release in self._candidates_of(dependency)
+                if not self._allows(specifier, dependency, release, name, candidate))
+        return versions
+
+    def _dependency_order(self) -> List[str]:
+        """
+        Packages ordered so dependencies come before their dependents.
+
+        Edges come from the requirements of every candidate, which also
+        gives the reverse index used when looking ahead.
+        """
+        self._dependents = {name: set() for name in self.installed}
+        pending = {}
+        for name in sorted(self.installed):
+            dependencies = set()
+            for candidate in self._candidates_of(name):
+                dependencies.update(dependency for dependency, _, _ in self._requirements_of(name, candidate) or [])
+            pending[name] = len(dependencies)
+            for dependency in dependencies:
+                self._dependents[dependency].add(name)
+
+        ready = sorted(name for name, remaining in pending.items() if not remaining)
+        order = []
+        while ready:
+            name = ready.pop()
+            order.append(name)
+            for dependent in sorted(self._dependents[name], reverse=True):
+                pending[dependent] -= 1
+                if not pending[dependent]:
+                    ready.append(dependent)
+        # Packages in dependency cycles go last
+        placed = set(order)
+        order += sorted(name for name in self.installed if name not in placed)
+        return order
+
+    @staticmethod
+    def _unassign(name: str, touched: List[str], assignment: Dict[str, Version],
+                  imposed: Dict[str, List[Tuple[int, str]]]):
+        """Undo an assignment made by _try_assign."""
+        del assignment[name]
+        for dependency in reversed(touched):
+            imposed[dependency].pop()
+
+    def _allows(self, specifier: int, name: str, candidate: Version, source: str,
+                source_version: Version) -> bool:
+        """Whether a requirement of source allows a version, tolerating conflicts already installed."""
+        key = (specifier, candidate)
+        allowed = self._contains.get(key)
+        if allowed is None:
+            allowed = self._contains[key] = self._specifiers[specifier].contains(candidate, prereleases=True)
+        return allowed or (candidate == self.installed[name] and source_version == self.installed[source])
+
+    def _candidates_of(self, name: str) -> List[Version]:
+        """Versions worth trying for a package, newest first, always ending with the installed one."""
+        candidates = self._candidates.get(name)
+        if candidates is None:
+            current = self.installed[name]
+            candidates = []
+            for release, info in (self.metadata.releases(self.names[name]) or {}).items():
+                try:
+                    parsed = Version(release)
+                except InvalidVersion:
+                    continue
+                if parsed <= current or info.get('yanked') or not self._python_allows(info.get('requires_python')):
+                    continue
+                if parsed.is_prerelease and not (self.allow_prereleases or current.is_prerelease):
+                    continue
+                candidates.append(parsed)
+            candidates.sort(reverse=True)
+            candidates.append(current)
+            self._candidates[name] = candidates
+        return candidates
+
+    def _requirements_of(self, name: str, release: Version) -> Optional[List[Tuple[str, int, str]]]:
+        """Requirements of a release on other installed packages, or None when unknown."""
+        key = (name, release)
+        try:
+            return self._requirements[key]
+        except KeyError:
+            pass
+
+        requires = self.metadata.requires(self.names[name], str(release))
+        if requires is None and release == self.installed[name]:
+            requires = []
+        parsed = None
+        if requires is not None:
+            parsed = []
+            for line in requires:
+                try:
+                    requirement = Requirement(line)
+                except InvalidRequirement:
+                    continue
+                if requirement.marker is not None and not requirement.marker.evaluate(self._environment):
+                    continue
+                dependency = normalize_name(requirement.name)
+                if dependency in self.installed and dependency != name:
+                    specifier = self._specifier_ids.get(str(requirement.specifier))
+                    if specifier is None:
+                        specifier = self._specifier_ids[str(requirement.specifier)] = len(self._specifiers)
+                        self._specifiers.append(requirement.specifier)
+                    parsed.append((dependency, specifier, line))
+        self._requirements[key] = parsed
+        return parsed
+
+    def _python_allows(self, requires_python: Optional[str]) -> bool:
+        if not requires_python:
+            return True
+        try:
+            return SpecifierSet(requires_python).contains(self.python_version, prereleases=True)
+        except ValueError:
+            return True
+
+    def _latest_release(self, name: str) -> Optional[Version]:
+        """Newest non-yanked release, ignoring the Python constraint."""
+        if name not in self._latest:
+            latest = None
+            current = self.installed[name]
+            for release, info in (self.metadata.releases(self.names[name]) or {}).items():
+                try:
+                    parsed = Version(release)
+                except InvalidVersion:
+                    continue
+                if info.get('yanked') or (parsed.is_prerelease and not (self.allow_prereleases or current.is_prerelease)):
+                    continue
+                if latest is None or parsed > latest:
+                    latest = parsed
+            self._latest[name] = latest
+        return self._latest[name]
+
+    def _blockers(self, name: str, latest: Version, solution: Dict[str, Version]) -> List[Dict[str, str]]:
+        """Constraints that rule out the latest release given the planned versions."""
+        info = (self.metadata.releases(self.names[name]) or {}).get(str(latest), {})
+        if not self._python_allows(info.get('requires_python')):
+            return [{'package': 'python', 'version': str(self.python_version),
+                     'requirement': f"Requires-Python {info['requires_python']}"}]
+
+        blockers = []
+        for other in sorted(self._dependents.get(name, ())):
+            for dependency, specifier, line in self._requirements_of(other, solution[other]) or []:
+                if dependency == name and not self._specifiers[specifier].contains(latest, prereleases=True):
+                    blockers.append({'package': self.names[other], 'version': str(solution[other]), 'requirement': line})
+
+        requirements = self._requirements_of(name, latest)
+        if requirements is None:
+            blockers.append({'package': self.names[name], 'version': str(latest),
+                             'requirement': 'metadata not available offline'})
+            return blockers
+        for dependency, specifier, line in requirements:
+            if not self._specifiers[specifier].contains(solution[dependency], prereleases=True):
+                blockers.append({'package': self.names[name], 'version': str(latest), 'requirement': line})
+        if not blockers:
+            blockers.append({'package': self.names[name], 'version': str(latest),
+                             'requirement': 'no compatible combination with the other upgrades'})
+        return blockers
@@ -1 +1,4 @@
 from .context_system import ProjectContextManager
+from .history_dataset import HistoryDatasetBuilder
+from .snapshots import SnapshotStore
+from .ownership import OwnershipIndex
@@ -3,6 +3,9 @@ import yaml
 from datetime import datetime
 from typing import Dict, Any, Optional
 
+from ...utils.profiling import span
+from .snapshots import SnapshotStore
+
 class ProjectContextManager:
     """
     Manages comprehensive project context, tracking development progress, milestones, and metadata.
@@ -17,6 +20,8 @@ class ProjectContextManager:
         
         # Initialize context if not exists
         self._initialize_context()
+        
+        self.snapshots = SnapshotStore(project_path)
 
     def _initialize_context(self):
         """
@@ -36,7 +41,7 @@ class ProjectContextManager:
                 }
             }
             
-            with open(self.context_file, 'w') as f:
+            with span('yaml'), open(self.context_file, 'w') as f:
                 yaml.safe_dump(initial_context, f, default_flow_style=False)
 
     def add_milestone(self, milestone: str):
@@ -46,7 +51,7 @@ class ProjectContextManager:
         :param milestone: Milestone description
         """
         # Load current context
-        with open(self.context_file, 'r') as f:
+        with span('yaml'), open(self.context_file, 'r') as f:
             context = yaml.safe_load(f)
         
         # Add milestone
@@ -60,7 +65,7 @@ class ProjectContextManager:
         context['project']['last_updated'] = datetime.now().isoformat()
         
         # Save updated context
-        with open(self.context_file, 'w') as f:
+        with span('yaml'), open(self.context_file, 'w') as f:
             yaml.safe_dump(context, f, default_flow_style=False)
 
     def get_current_context(self) -> Dict[str, Any]:
@@ -69,7 +74,7 @@ class ProjectContextManager:
         
         :return: Current project context
         """
-        with open(self.context_file, 'r') as f:
+        with span('yaml'), open(self.context_file, 'r') as f:
             return yaml.safe_load(f)
 
     def update_context(self, update_type: str, details: Dict[str, Any]):
@@ -80,7 +85,7 @@ class ProjectContextManager:
         :param details: Details of the update
         """
         # Load current context
-        with open(self.context_file, 'r') as f:
+        with span('yaml'), open(self.context_file, 'r') as f:
             context = yaml.safe_load(f)
         
         # Update timestamp
@@ -93,5 +98,24 @@ class ProjectContextManager:
             context['development']['current_phase'] = details.get('phase', context['development']['current_phase'])
         
         # Save updated context
-        with open(self.context_file, 'w') as f:
+        with span('yaml'), open(self.context_file, 'w') as f:
             yaml.safe_dump(context, f, default_flow_style=False)
+
+    def snapshot(self, label: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Record a snapshot of the context, milestones and code index summary.
+        
+        :param label: Optional description of the snapshot
+        :return: Snapshot entry with its ID
+        """
+        return self.snapshots.create(label)
+
+    def changes_since(self, ref: str = 'latest', until: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Report what changed since a snapshot.
+        
+        :param ref: Snapshot ID, ID prefix or 'latest'
+        :param until: Later snapshot to compare against (defaults to the current state)
+        :return: Changed paths with old and new values
+        """
+        return self.snapshots.diff(ref, until)
@@ -0,0 +1,317 @@
+import os
+import json
+import math
+import yaml
+import git
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional
+
+# Columns of the dataset and their array typecodes
+COLUMNS = {
+    'bucket_start': 'q',
+    'commits': 'q',
+    'insertions': 'q',
+    'deletions': 'q',
+    'files_changed': 'q',
+    'active_authors': 'q',
+    'milestones_created': 'q',
+    'milestones_completed': 'q',
+    'python_files': 'd',
+    'classes': 'd',
+    'functions': 'd',
+}
+
+# Columns recomputed on every build rather than accumulated from git
+MILESTONE_COLUMNS = ('milestones_created', 'milestones_completed')
+CODE_METRIC_COLUMNS = ('python_files', 'classes', 'functions')
+
+# 1970-01-05 was a Monday, so buckets start on Mondays (UTC)
+_BUCKET_ORIGIN = 4 * 24 * 60 * 60
+
+DATASET_VERSION = 1
+
+
+class HistoryDatasetBuilder:
+    """
+    Builds a compact, time-bucketed history of the project for trajectory analysis.
+
+    Git activity, milestone timestamps and code-metric snapshots are stored as
+    one array per metric under .context/history/. Each build only walks the
+    commits added since the last indexed HEAD, so even long histories stay
+    cheap to refresh and summarize.
+    """
+    def __init__(self, project_path: str, bucket_days: int = 7, repo: Optional[git.Repo] = None):
+        """
+        Initialize the dataset builder.
+
+        :param project_path: Path to the project (a git repository)
+        :param bucket_days: Width of a time bucket in days
+        :param repo: Optional already-open repository
+        """
+        self.project_path = project_path
+        self.bucket_seconds = bucket_days * 24 * 60 * 60
+        self.repo = repo or git.Repo(project_path)
+        self.history_dir = os.path.join(project_path, '.context', 'history')
+        self.meta_file = os.path.join(self.history_dir, 'meta.json')
+
+    def build(self, include_code_metrics: bool = True) -> Dict[str, array]:
+        """
+        Bring the dataset up to date with the repository and persist it.
+
+        :param include_code_metrics: Whether to record a code-metric snapshot for the current bucket
+        :return: Dataset columns keyed by metric name
+        """
+        columns, meta = self.load()
+        index = {start: i for i, start in enumerate(columns['bucket_start'])}
+        authors = {name: i for i, name in enumerate(meta['authors'])}
+        bucket_authors = [set(ids) for ids in meta['bucket_authors']]
+
+        head = self._head_sha()
+        if head and head != meta.get('head'):
+            rev_range = 'HEAD'
+            if meta.get('head') and self._is_ancestor(meta['head']):
+                rev_range = f"{meta['head']}..HEAD"
+            elif meta.get('head'):
+                # History was rewritten; start over
+                columns, meta = self._empty(), self._empty_meta()
+                index, authors, bucket_authors = {}, {}, []
+
+            for commit in self._walk(rev_range):
+                position = self._bucket_position(columns, index, bucket_authors, commit['timestamp'])
+                columns['commits'][position] += 1
+                columns['insertions'][position] += commit['insertions']
+                columns['deletions'][position] += commit['deletions']
+                columns['files_changed'][position] += commit['files_changed']
+
+                author_id = authors.setdefault(commit['author'], len(authors))
+                bucket_authors[position].add(author_id)
+                columns['active_authors'][position] = len(bucket_authors[position])
+
+        self._apply_milestones(columns, index, bucket_authors)
+        if include_code_metrics:
+            self._snapshot_code_metrics(columns, index, bucket_authors)
+
+        meta.update({
+            'head': head,
+            'authors': sorted(authors, key=authors.get),
+            'bucket_authors': [sorted(ids) for ids in bucket_authors],
+            'updated_at': datetime.now().isoformat()
+        })
+        self._save(columns, meta)
+        return columns
+
+    def load(self):
+        """
+        Load the persisted dataset.
+
+        :return: Tuple of (columns, metadata); empty when nothing was built yet
+        """
+        try:
+            with open(self.meta_file, 'r') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return self._empty(), self._empty_meta()
+
+        if meta.get('version') != DATASET_VERSION or meta.get('bucket_seconds') != self.bucket_seconds:
+            return self._empty(), self._empty_meta()
+
+        columns = {}
+        for name, typecode in COLUMNS.items():
+            column = array(typecode)
+            path = os.path.join(self.history_dir, f"{name}.bin")
+            with open(path, 'rb') as f:
+                column.frombytes(f.read())
+            columns[name] = column
+        return columns, meta
+
+    def to_records(self, columns: Optional[Dict[str, array]] = None,
+                   max_records: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Convert the dataset into compact records for the trajectory analysis prompt.
+
+        Adjacent buckets are merged so that at most max_records records are returned.
+
+        :param columns: Dataset columns (defaults to the persisted dataset)
+        :param max_records: Maximum number of records to produce
+        :return: Records ordered oldest first, keyed by 'period'
+        """
+        if columns is None:
+            columns, _ = self.load()
+
+        size = len(columns['bucket_start'])
+        if not size:
+            return []
+
+        group = max(1, math.ceil(size / max_records)) if max_records else 1
+        records = []
+        for start in range(0, size, group):
+            end = min(start + group, size)
+            record = {
+                'period': datetime.fromtimestamp(columns['bucket_start'][start], timezone.utc).strftime('%Y-%m-%d')
+            }
+            for name in COLUMNS:
+                if name == 'bucket_start':
+                    continue
+                values = columns[name][start:end]
+                if name in CODE_METRIC_COLUMNS:
+                    # Snapshots are point-in-time values; keep the latest one in the group
+                    snapshots = [value for value in values if not math.isnan(value)]
+                    if snapshots:
+                        record[name] = int(snapshots[-1])
+                elif name == 'active_authors':
+                    record[name] = max(values)
+                else:
+                    record[name] = sum(values)
+            records.append(record)
+        return records
+
+    def _walk(self, rev_range: str):
+        """Stream commits with line statistics from a single git log invocation."""
+        output = self.repo.git.log(rev_range, '--numstat', '--no-renames', '--format=%x1e%an%x1f%ct')
+        for entry in output.split('\x1e'):
+            if not entry.strip():
+                continue
+            header, _, stats = entry.partition('\n')
+            author, _, timestamp = header.partition('\x1f')
+
+            insertions = deletions = files_changed = 0
+            for line in stats.splitlines():
+                parts = line.split('\t')
+                if len(parts) < 3:
+                    continue
+                files_changed += 1
+                insertions += int(parts[0]) if parts[0].isdigit() else 0
+                deletions += int(parts[1]) if parts[1].isdigit() else 0
+
+            yield {
+                'author': author,
+                'timestamp': int(timestamp),
+                'insertions': insertions,
+                'deletions': deletions,
+                'files_changed': files_changed
+            }
+
+    def _bucket_position(self, columns: Dict[str, array], index: Dict[int, int],
+                         bucket_authors: List[set], timestamp: float) -> int:
+        """Find or create the bucket covering a timestamp, keeping buckets sorted."""
+        start = int(timestamp) - ((int(timestamp) - _BUCKET_ORIGIN) % self.bucket_seconds)
+        if start in index:
+            return index[start]
+
+        starts = columns['bucket_start']
+        position = len(starts)
+        while position > 0 and starts[position - 1] > start:
+            position -= 1
+
+        for name, typecode in COLUMNS.items():
+            default = float('nan') if typecode == 'd' else 0
+            columns[name].insert(position, start if name == 'bucket_start' else default)
+        bucket_authors.insert(position, set())
+
+        if position != len(starts) - 1:
+            index.clear()
+            index.update({value: i for i, value in enumerate(starts)})
+        else:
+            index[start] = position
+        return position
+
+    def _apply_milestones(self, columns: Dict[str, array], index: Dict[int, int], bucket_authors: List[set]):
+        """Recount milestone creation and completion per bucket from the tracking files."""
+        for name in MILESTONE_COLUMNS:
+            for i in range(len(columns[name])):
+                columns[name][i] = 0
+
+        for created_at, completed_at in self._milestone_timestamps():
+            if created_at:
+                position = self._bucket_position(columns, index, bucket_authors, created_at)
+                columns['milestones_created'][position] += 1
+            if completed_at:
+                position = self._bucket_position(columns, index, bucket_authors, completed_at)
+                columns['milestones_completed'][position] += 1
+
+    def _milestone_timestamps(self):
+        """Yield (created, completed) epoch timestamps from MILESTONES.yaml and GLOBAL_CONTEXT.yaml."""
+        sources = [
+            (os.path.join(self.project_path, 'MILESTONES.yaml'), None, 'created_at'),
+            (os.path.join(self.project_path, '.context', 'GLOBAL_CONTEXT.yaml'), 'development', 'added_at'),
+        ]
+        for path, section, created_key in sources:
+            try:
+                with open(path, 'r') as f:
+                    data = yaml.safe_load(f) or {}
+            except OSError:
+                continue
+
+            data = data.get(section, {}) if section else data
+            for key in ('milestones', 'completed_milestones'):
+                for milestone in data.get(key) or []:
+                    if isinstance(milestone, dict):
+                        yield (self._timestamp(milestone.get(created_key)),
+                               self._timestamp(milestone.get('completed_at')))
+
+    def _snapshot_code_metrics(self, columns: Dict[str, array], index: Dict[int, int], bucket_authors: List[set]):
+        """Record the current code metrics in the bucket covering now."""
+        from ..code_analysis.code_generator import CodeGenerator
+
+        structure = CodeGenerator(self.project_path).analyze_project_structure()
+        files = structure['python_files']
+        position = self._bucket_position(columns, index, bucket_authors, datetime.now().timestamp())
+        columns['python_files'][position] = len(files)
+        columns['classes'][position] = sum(len(f['classes']) for f in files)
+        columns['functions'][position] = sum(len(f['functions']) for f in files)
+
+    def _save(self, columns: Dict[str, array], meta: Dict[str, Any]):
+        """Persist columns as raw arrays next to a JSON metadata file."""
+        os.makedirs(self.history_dir, exist_ok=True)
+        for name, column in columns.items():
+            path = os.path.join(self.history_dir, f"{name}.bin")
+            with open(f"{path}.tmp", 'wb') as f:
+                column.tofile(f)
+            os.replace(f"{path}.tmp", path)
+
+        # Metadata is written last so it only ever describes complete columns
+        with open(f"{self.meta_file}.tmp", 'w') as f:
+            json.dump(meta, f)
+        os.replace(f"{self.meta_file}.tmp", self.meta_file)
+
+    def _head_sha(self) -> Optional[str]:
+        """Current HEAD commit, or None for an empty repository."""
+        try:
+            return self.repo.head.commit.hexsha
+        except ValueError:
+            return None
+
+    def _is_ancestor(self, sha: str) -> bool:
+        """Whether a previously indexed commit is still part of HEAD's history."""
+        try:
+            return self.repo.is_ancestor(sha, 'HEAD')
+        except git.GitCommandError:
+            return False
+
+    def _empty_meta(self) -> Dict[str, Any]:
+        """Metadata of a dataset that has not been built yet."""
+        return {
+            'version': DATASET_VERSION,
+            'bucket_seconds': self.bucket_seconds,
+            'head': None,
+            'authors': [],
+            'bucket_authors': []
+        }
+
+    @staticmethod
+    def _empty() -> Dict[str, array]:
+        """Columns of a dataset that has not been built yet."""
+        return {name: array(typecode) for name, typecode in COLUMNS.items()}
+
+    @staticmethod
+    def _timestamp(value: Any) -> Optional[float]:
+        """Parse an ISO timestamp from a tracking file into epoch seconds."""
+        if isinstance(value, datetime):
+            return value.timestamp()
+        if not value:
+            return None
+        try:
+            return datetime.fromisoformat(str(value)).timestamp()
+        except ValueError:
+            return None
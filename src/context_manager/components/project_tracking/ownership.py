@@ -0,0 +1,248 @@
+import os
+import json
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterable, Optional
+
+import git
+
+from ...utils.profiling import count, span
+
+# Default number of concurrent `git blame` processes
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+
+# Files with more lines than this (typically generated or vendored) are not blamed
+MAX_BLAME_LINES = 20_000
+
+# Paths passed to a single git diff when measuring changed files
+PATHSPEC_BATCH = 500
+
+OWNERSHIP_VERSION = 1
+
+
+class OwnershipIndex:
+    """
+    Lines per author for every text file at HEAD, computed with git blame.
+
+    Blaming is the expensive part, so files are blamed concurrently by a
+    pool of `git blame` processes, and after the first build only files
+    changed between the last indexed HEAD and the current one are blamed
+    again. Per-file counts are stored in .context/ownership.json and rolled
+    up to directories on demand.
+    """
+    def __init__(self, project_path: str, repo: Optional[git.Repo] = None, max_workers: int = DEFAULT_WORKERS):
+        """
+        Initialize the ownership index.
+
+        :param project_path: Path to the project (a git repository)
+        :param repo: Optional already-open repository
+        :param max_workers: Number of concurrent blame processes
+        """
+        self.project_path = project_path
+        self.repo = repo or git.Repo(project_path)
+        self.max_workers = max_workers
+        self.index_file = os.path.join(project_path, '.context', 'ownership.json')
+
+    def update(self) -> Dict[str, Any]:
+        """
+        Bring the index up to date with HEAD and persist it.
+
+        :return: HEAD commit and counts of blamed, removed and unchanged files
+        """
+        index = self.load()
+        head = self._head_sha()
+        if head is None or head == index['head']:
+            return {'head': head, 'blamed': 0, 'removed': 0, 'unchanged': len(index['files'])}
+
+        if index['head'] and self._is_ancestor(index['head']):
+            deleted = set(self.repo.git.diff('--name-only', '--no-renames', '--diff-filter=D', '-z',
+                                             index['head'], head).split('\0')) - {''}
+            # Between two commits numstat counts added lines; the size limit needs full lengths at HEAD
+            changed = {path: None for path in self._numstat(index['head'], head)}
+            present = [path for path in changed if path not in deleted]
+            for start in range(0, len(present), PATHSPEC_BATCH):
+                changed.update(self._numstat(self._empty_tree(), head, present[start:start + PATHSPEC_BATCH]))
+        else:
+            # First build, or history was rewritten: blame everything
+            index = self._empty()
+            changed = self._numstat(self._empty_tree(), head)
+            deleted = set()
+
+        files = index['files']
+        unchanged = len(set(files) - set(changed))
+        removed = 0
+        to_blame = []
+        for path, lines in changed.items():
+            if path in deleted or lines is None or lines > MAX_BLAME_LINES:
+                # Deleted, binary or too large to be worth blaming
+                if files.pop(path, None) is not None:
+                    removed += 1
+            else:
+                to_blame.append(path)
+
+        with span('git'), ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for path, authors in zip(to_blame, executor.map(lambda path: self._blame(head, path), to_blame)):
+                if authors:
+                    files[path] = authors
+                else:
+                    files.pop(path, None)
+        count('files_blamed', len(to_blame))
+
+        index['head'] = head
+        self._save(index)
+        return {'head': head, 'blamed': len(to_blame), 'removed': removed, 'unchanged': unchanged}
+
+    def ownership(self, path: str = '') -> Dict[str, int]:
+        """
+        Lines per author within a file or directory, largest first.
+
+        :param path: File or directory relative to the repository root ('' for everything)
+        :return: Mapping of author to line count
+        """
+        prefix = path.strip('/')
+        totals: Dict[str, int] = {}
+        for file_path, authors in self.load()['files'].items():
+            if prefix and file_path != prefix and not file_path.startswith(prefix + '/'):
+                continue
+            for author, lines in authors.items():
+                totals[author] = totals.get(author, 0) + lines
+        return dict(sorted(totals.items(), key=lambda item: (-item[1], item[0])))
+
+    def rollup(self, depth: int = 1) -> Dict[str, Dict[str, int]]:
+        """
+        Lines per author for every directory at a given depth.
+
+        Files above that depth are grouped under their own directory ('.' for the root).
+
+        :param depth: Number of leading path components that name a directory
+        :return: Mapping of directory to lines per author, largest directories first
+        """
+        directories: Dict[str, Dict[str, int]] = {}
+        for file_path, authors in self.load()['files'].items():
+            parts = file_path.split('/')[:-1][:depth]
+            totals = directories.setdefault('/'.join(parts) or '.', {})
+            for author, lines in authors.items():
+                totals[author] = totals.get(author, 0) + lines
+        ordered = sorted(directories.items(), key=lambda item: (-sum(item[1].values()), item[0]))
+        return {directory: dict(sorted(totals.items(), key=lambda item: (-item[1], item[0])))
+                for directory, totals in ordered}
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Load the persisted index.
+
+        :return: Index with head and per-file author line counts; empty when nothing was built yet
+        """
+        try:
+            with open(self.index_file, 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return self._empty()
+        if index.get('version') != OWNERSHIP_VERSION:
+            return self._empty()
+        return index
+
+    @staticmethod
+    def to_markdown(rollup: Dict[str, Dict[str, int]], max_directories: int = 10, max_owners: int = 3) -> str:
+        """
+        Render a directory rollup as a Markdown table.
+
+        :param rollup: Result of rollup()
+        :param max_directories: Number of largest directories to list
+        :param max_owners: Number of owners listed per directory
+        :return: Markdown table, or a note when nothing is indexed
+        """
+        if not rollup:
+            return "_No tracked text files at HEAD._\n"
+        rows = ["| Directory | Lines | Main owners |", "| --- | ---: | --- |"]
+        for directory, authors in list(rollup.items())[:max_directories]:
+            total = sum(authors.values())
+            owners = ', '.join(f"{author} {lines / total:.0%}" for author, lines in list(authors.items())[:max_owners])
+            rows.append(f"| {directory} | {total:,} | {owners} |")
+        return '\n'.join(rows) + '\n'
+
+    def _blame(self, head: str, path: str) -> Dict[str, int]:
+        """Lines per author of one file at a commit; empty if blame fails."""
+        result = subprocess.run(
+            ['git', 'blame', '--porcelain', head, '--', path],
+            cwd=self.repo.working_tree_dir, capture_output=True, text=True, errors='replace'
+        )
+        if result.returncode != 0:
+            return {}
+        return parse_blame(result.stdout.splitlines())
+
+    def _numstat(self, old: str, new: str, paths: Iterable[str] = ()) -> Dict[str, Optional[int]]:
+        """Files changed between two trees with their added line counts (None for binary files)."""
+        pathspecs = [f':(literal){path}' for path in paths]
+        if pathspecs:
+            pathspecs.insert(0, '--')
+        output = self.repo.git.diff('--numstat', '--no-renames', '-z', old, new, *pathspecs)
+        changed = {}
+        for record in output.split('\0'):
+            if not record:
+                continue
+            added, _, path = record.split('\t', 2)
+            changed[path] = None if added == '-' else int(added)
+        return changed
+
+    def _empty_tree(self) -> str:
+        """Hash of the empty tree, diffed against HEAD to get full line counts."""
+        return self.repo.git.hash_object('-t', 'tree', os.devnull)
+
+    def _head_sha(self) -> Optional[str]:
+        """Current HEAD commit, or None for an empty repository."""
+        try:
+            return self.repo.head.commit.hexsha
+        except ValueError:
+            return None
+
+    def _is_ancestor(self, sha: str) -> bool:
+        """Whether a previously indexed commit is still part of HEAD's history."""
+        try:
+            return self.repo.is_ancestor(sha, 'HEAD')
+        except git.GitCommandError:
+            return False
+
+    def _save(self, index: Dict[str, Any]):
+        """Write the index atomically."""
+        os.makedirs(os.path.dirname(self.index_file), exist_ok=True)
+        tmp_path = f"{self.index_file}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f, separators=(',', ':'))
+        os.replace(tmp_path, self.index_file)
+
+    @staticmethod
+    def _empty() -> Dict[str, Any]:
+        """Index that has not been built yet."""
+        return {'version': OWNERSHIP_VERSION, 'head': None, 'files': {}}
+
+
+def parse_blame(lines: Iterable[str]) -> Dict[str, int]:
+    """
+    Count lines per author in `git blame --porcelain` output.
+
+    Every source line is preceded by a header naming its commit; author
+    details are only printed the first time a commit appears.
+
+    :param lines: Output lines of git blame --porcelain
+    :return: Mapping of author name to line count
+    """
+    commit_lines: Dict[str, int] = {}
+    authors: Dict[str, str] = {}
+    commit = None
+    for line in lines:
+        if line.startswith('\t'):
+            # Source line content
+            continue
+        head, _, rest = line.partition(' ')
+        if head == 'author':
+            authors[commit] = rest
+        elif len(head) in (40, 64) and rest and all(c in '0123456789abcdef' for c in head):
+            commit = head
+            commit_lines[commit] = commit_lines.get(commit, 0) + 1
+
+    totals: Dict[str, int] = {}
+    for sha, line_count in commit_lines.items():
+        author = authors.get(sha, 'Unknown')
+        totals[author] = totals.get(author, 0) + line_count
+    return totals
@@ -0,0 +1,331 @@
+import os
+import json
+import time
+import zlib
+import hashlib
+from typing import Dict, List, Any, Optional
+
+import yaml
+
+from ...utils.profiling import count, span
+from ..code_analysis.code_index import INDEX_FILE
+from ..code_analysis.index_format import open_index
+
+# Name of the snapshot log inside the snapshot directory
+SNAPSHOT_LOG = 'snapshots.jsonl'
+
+# Name of the file remembering the subtree hash of each unchanged source file
+SOURCE_CACHE = 'sources.json'
+
+# Length of the hex prefix used as a snapshot ID
+SNAPSHOT_ID_LENGTH = 12
+
+# libyaml's loader is several times faster when it is available
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+class SnapshotStore:
+    """
+    Content-addressed snapshots of the project context.
+
+    A snapshot is a Merkle tree: GLOBAL_CONTEXT.yaml, MILESTONES.yaml and a
+    per-file summary of the code search index are split into sections (one
+    tree node per mapping, list or directory, one blob per scalar or file
+    summary), and every node is stored under the hash of its contents. A new
+    snapshot only writes the nodes that changed, so unchanged sections are
+    shared by all snapshots. Diffs compare hashes top-down and only descend
+    into subtrees whose hashes differ. Source files whose modification time
+    and size did not change since the last snapshot are not parsed again;
+    their subtree hash is reused.
+    """
+    def __init__(self, project_path: str, snapshot_dir: Optional[str] = None):
+        """
+        Initialize the snapshot store.
+
+        :param project_path: Path to the project
+        :param snapshot_dir: Directory holding snapshots (defaults to .context/snapshots)
+        """
+        self.project_path = os.path.abspath(project_path)
+        self.context_dir = os.path.join(self.project_path, '.context')
+        self.snapshot_dir = snapshot_dir or os.path.join(self.context_dir, 'snapshots')
+        self.objects_dir = os.path.join(self.snapshot_dir, 'objects')
+        self.log_file = os.path.join(self.snapshot_dir, SNAPSHOT_LOG)
+        self.source_cache_file = os.path.join(self.snapshot_dir, SOURCE_CACHE)
+        # Nodes of the current state that are hashed but not persisted
+        self._pending: Dict[str, Any] = {}
+
+    def create(self, label: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Snapshot the current project context.
+
+        :param label: Optional description of the snapshot
+        :return: Snapshot entry with id, root, created_at and label, plus
+                 counts of written and reused objects
+        """
+        stats = {'written': 0, 'reused': 0}
+        sources = self._load_source_cache()
+        with span('snapshot'):
+            root = self._build(self._current_state(sources, stats), stats)
+
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        tmp_path = f"{self.source_cache_file}.tmp.{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            json.dump(sources, f)
+        os.replace(tmp_path, self.source_cache_file)
+
+        created_at = time.time()
+        snapshot_id = hashlib.sha256(f"{root}:{created_at}".encode()).hexdigest()[:SNAPSHOT_ID_LENGTH]
+        entry = {'id': snapshot_id, 'root': root, 'created_at': created_at, 'label': label}
+        with open(self.log_file, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+        return {**entry, 'objects_written': stats['written'], 'objects_reused': stats['reused']}
+
+    def list(self) -> List[Dict[str, Any]]:
+        """
+        List snapshots, oldest first.
+
+        :return: Snapshot entries with id, root, created_at and label
+        """
+        try:
+            with open(self.log_file, 'r') as f:
+                lines = f.readlines()
+        except OSError:
+            return []
+
+        entries = []
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # A partially written last line
+                continue
+        return entries
+
+    def resolve(self, ref: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a snapshot by ID prefix, or 'latest'.
+
+        :param ref: Snapshot ID, unique ID prefix or 'latest'
+        :return: Snapshot entry, or None if no single snapshot matches
+        """
+        entries = self.list()
+        if ref == 'latest':
+            return entries[-1] if entries else None
+        matches = [entry for entry in entries if entry['id'].startswith(ref)]
+        return matches[0] if len(matches) == 1 else None
+
+    def diff(self, old_ref: str, new_ref: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Report what changed between two snapshots.
+
+        :param old_ref: Earlier snapshot (ID, ID prefix or 'latest')
+        :param new_ref: Later snapshot; defaults to the current project state
+        :return: Changes as path/change/old/new entries, plus the number of
+                 nodes compared
+        """
+        old = self.resolve(old_ref)
+        if old is None:
+            return {'error': f"Unknown snapshot: {old_ref}", 'details': 'Use an ID from the snapshot list or "latest"'}
+
+        if new_ref is None:
+            new_id = None
+            self._pending = {}
+            with span('snapshot'):
+                new_root = self._build(self._current_state(self._load_source_cache(), None), None)
+        else:
+            new = self.resolve(new_ref)
+            if new is None:
+                return {'error': f"Unknown snapshot: {new_ref}", 'details': 'Use an ID from the snapshot list or "latest"'}
+            new_id, new_root = new['id'], new['root']
+
+        changes: List[Dict[str, Any]] = []
+        stats = {'nodes_compared': 0}
+        try:
+            self._diff(old['root'], new_root, [], changes, stats)
+        except (OSError, ValueError) as e:
+            return {'error': str(e), 'details': 'A snapshot object is missing or corrupt'}
+        finally:
+            self._pending = {}
+        return {'from': old['id'], 'to': new_id, 'changes': changes, **stats}
+
+    def _current_state(self, sources: Dict[str, Any], stats: Optional[Dict[str, int]]) -> Dict[str, Any]:
+        """
+        Collect the sections that make up a snapshot.
+
+        Sections read from an unchanged source file are returned as the hash
+        recorded in the source cache; sections read from a changed file are
+        hashed (and their cache entry refreshed when stats are given).
+        """
+        state = {}
+        for name, path, read in (
+            ('context', os.path.join(self.context_dir, 'GLOBAL_CONTEXT.yaml'), self._read_yaml),
+            ('milestones', os.path.join(self.project_path, 'MILESTONES.yaml'), self._read_yaml),
+            ('code_index', os.path.join(self.context_dir, 'code_index', INDEX_FILE), self._code_index_summary),
+        ):
+            try:
+                stat = os.stat(path)
+                signature = [stat.st_mtime_ns, stat.st_size]
+            except OSError:
+                signature = None
+
+            cached = sources.get(name)
+            if signature and cached and cached['signature'] == signature and \
+                    os.path.exists(self._object_path(cached['hash'])):
+                state[name] = _Hashed(cached['hash'])
+                continue
+
+            value = read(path) if signature else None
+            if stats is not None and signature:
+                digest = self._build(value, stats)
+                sources[name] = {'signature': signature, 'hash': digest}
+                state[name] = _Hashed(digest)
+            else:
+                state[name] = value
+        return state
+
+    @staticmethod
+    def _read_yaml(path: str) -> Any:
+        """Parse a YAML file, treating an unreadable file as missing."""
+        try:
+            with span('yaml'), open(path, 'r') as f:
+                return yaml.load(f, Loader=_YAML_LOADER)
+        except (OSError, yaml.YAMLError):
+            return None
+
+    def _load_source_cache(self) -> Dict[str, Any]:
+        """Read the per-source signatures and hashes of the last snapshot."""
+        try:
+            with open(self.source_cache_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _code_index_summary(self, path: str) -> Dict[str, Any]:
+        """Size and symbols of every indexed file, nested by directory."""
+        reader = open_index(path)
+        if reader is None:
+            return {}
+
+        summary: Dict[str, Any] = {}
+        try:
+            for file_id, path, _, size in reader.iter_files():
+                *directories, name = path.split(os.sep)
+                node = summary
+                for directory in directories:
+                    node = node.setdefault(directory + '/', {})
+                # A file summary is one leaf; wrapping keeps it from being split into sections
+                node[name] = _Leaf({'size': size, 'symbols': reader.file_symbols(file_id)})
+        finally:
+            reader.close()
+        return summary
+
+    def _build(self, value: Any, stats: Optional[Dict[str, int]]) -> str:
+        """
+        Hash a value bottom-up and return the hash of its node.
+
+        Mappings and lists become tree nodes holding the hashes of their
+        children; everything else becomes a blob. With stats the nodes are
+        persisted, otherwise they are kept in memory.
+        """
+        if isinstance(value, _Hashed):
+            return value.digest
+        if isinstance(value, dict):
+            node = {'map': {str(key): self._build(child, stats) for key, child in value.items()}}
+        elif isinstance(value, list):
+            node = {'list': [self._build(child, stats) for child in value]}
+        elif isinstance(value, _Leaf):
+            node = {'blob': value.value}
+        else:
+            node = {'blob': value}
+
+        data = json.dumps(node, sort_keys=True, separators=(',', ':'), default=str).encode()
+        digest = hashlib.sha256(data).hexdigest()
+        if stats is None:
+            self._pending[digest] = json.loads(data)
+            return digest
+
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            stats['reused'] += 1
+            return digest
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp.{os.getpid()}"
+        with open(tmp_path, 'wb') as f:
+            f.write(zlib.compress(data))
+        os.replace(tmp_path, path)
+        stats['written'] += 1
+        count('snapshot_objects_written')
+        return digest
+
+    def _load(self, digest: str) -> Dict[str, Any]:
+        """Read a node from memory or the object store."""
+        if digest in self._pending:
+            return self._pending[digest]
+        with open(self._object_path(digest), 'rb') as f:
+            data = zlib.decompress(f.read())
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Snapshot object {digest} is corrupt")
+        return json.loads(data)
+
+    def _diff(self, old: Optional[str], new: Optional[str], path: List[str],
+              changes: List[Dict[str, Any]], stats: Dict[str, int]):
+        """Compare two nodes, descending only where their hashes differ."""
+        stats['nodes_compared'] += 1
+        if old == new:
+            return
+        location = '/'.join(key.rstrip('/') for key in path)
+        if old is None:
+            changes.append({'path': location, 'change': 'added', 'old': None, 'new': self._value(new)})
+            return
+        if new is None:
+            changes.append({'path': location, 'change': 'removed', 'old': self._value(old), 'new': None})
+            return
+
+        old_node, new_node = self._load(old), self._load(new)
+        if 'map' in old_node and 'map' in new_node:
+            old_entries, new_entries = old_node['map'], new_node['map']
+            for key in sorted(set(old_entries) | set(new_entries)):
+                self._diff(old_entries.get(key), new_entries.get(key), path + [key], changes, stats)
+            return
+        if 'list' in old_node and 'list' in new_node:
+            old_items, new_items = old_node['list'], new_node['list']
+            for index in range(max(len(old_items), len(new_items))):
+                self._diff(old_items[index] if index < len(old_items) else None,
+                           new_items[index] if index < len(new_items) else None,
+                           path + [str(index)], changes, stats)
+            return
+        changes.append({'path': location, 'change': 'modified',
+                        'old': self._expand(old_node), 'new': self._expand(new_node)})
+
+    def _value(self, digest: str) -> Any:
+        """Reconstruct the value stored under a hash."""
+        return self._expand(self._load(digest))
+
+    def _expand(self, node: Dict[str, Any]) -> Any:
+        """Reconstruct the value of a loaded node."""
+        if 'map' in node:
+            return {key: self._value(child) for key, child in node['map'].items()}
+        if 'list' in node:
+            return [self._value(child) for child in node['list']]
+        return node['blob']
+
+    def _object_path(self, digest: str) -> str:
+        """Shard objects by hash prefix to keep directories small."""
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+
+class _Hashed:
+    """Marks a section whose subtree is already stored under a known hash."""
+    __slots__ = ('digest',)
+
+    def __init__(self, digest: str):
+        self.digest = digest
+
+
+class _Leaf:
+    """Marks a structured value that is stored as a single blob."""
+    __slots__ = ('value',)
+
+    def __init__(self, value: Any):
+        self.value = value
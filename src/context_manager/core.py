@@ -8,6 +8,31 @@ import anthropic
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 
+from .utils.context_sections import ContextArchive, extract_legacy_blocks, replace_section, write_atomic
+from .utils.doc_renderer import DocumentationRenderer
+from .utils.profiling import count, span
+from .components.ai_insights.context_packer import CODE_CONTEXT_CHUNKS, UPDATE_CONTEXT_TOKENS, ContextPacker
+from .components.ai_insights.response_cache import ResponseCache
+from .components.ai_insights.ai_client import get_shared_client
+from .components.ai_insights.local_insights import LocalInsightEngine
+from .components.code_analysis.code_retrieval import CodeRetrievalIndex, diff_query
+from .components.project_tracking.ownership import OwnershipIndex
+
+INSIGHTS_PROMPT = """Analyze the development context of this project based on its recent git commits and provide strategic insights for improvement.
+Findings from local heuristics are included under "local_findings"; synthesize them rather than repeating them.
+
+Project context (compact JSON):
+{context}{code}"""
+
+# Commits whose combined diff selects the code shown with AI insights
+RECENT_DIFF_COMMITS = 5
+
+# Diff text beyond this many characters is ignored when building the retrieval query
+MAX_DIFF_CHARS = 200_000
+
+# Directory depth at which code ownership is rolled up in CONTEXT.md
+OWNERSHIP_DEPTH = 2
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -18,7 +43,15 @@ class ContextManager:
         self.context_file = os.path.join(project_path, 'CONTEXT.md')
         self.milestones_file = os.path.join(project_path, 'MILESTONES.yaml')
         self.user_context_file = os.path.join(project_path, 'USER_CONTEXT.md')
+        self.archive = ContextArchive(os.path.join(project_path, '.context', 'archive'))
+        self.doc_renderer = DocumentationRenderer(self.project_path)
         self.anthropic_api_key = os.getenv('ANTHROPIC_API_KEY')
+        self.context_packer = ContextPacker(max_tokens=int(os.getenv('CONTEXT_MANAGER_PROMPT_TOKENS', UPDATE_CONTEXT_TOKENS)))
+        self.response_cache = ResponseCache(os.path.join(self.project_path, '.context', 'ai_cache'))
+        self.ai_client = get_shared_client(self.anthropic_api_key)
+        self.local_insights = LocalInsightEngine(self.project_path)
+        self.code_retrieval = CodeRetrievalIndex(self.project_path)
+        self.ownership = OwnershipIndex(self.project_path, repo=self.repo)
         
         # Initialize files if they don't exist
         self._initialize_context_files()
@@ -30,6 +63,11 @@ class ContextManager:
             with open(self.context_file, 'w') as f:
                 f.write("# Project Context\n")
         
+        # Create user context file if not exists
+        if not os.path.exists(self.user_context_file):
+            with open(self.user_context_file, 'w') as f:
+                f.write("# User Context\n")
+        
         # Create milestones file if not exists
         if not os.path.exists(self.milestones_file):
             with open(self.milestones_file, 'w') as f:
@@ -69,76 +107,182 @@ class ContextManager:
         with open(self.context_file, 'w') as f:
             f.write(template.format(start_date=datetime.now().strftime("%Y-%m-%d")))
 
-    def update_context(self, ai_insights: bool = False):
-        """Update project context, optionally with AI-generated insights."""
+    def update_context(self, ai_insights: bool = False, use_cache: bool = True):
+        """
+        Update project context, optionally with AI-generated insights.
+
+        Managed sections of CONTEXT.md are replaced in place; the content they
+        supersede is rotated into the archive under .context/archive.
+
+        :param ai_insights: Whether to add AI-generated insights
+        :param use_cache: Whether to reuse a cached AI response for unchanged context
+        """
         # Gather git-based insights
-        commits = list(self.repo.iter_commits())
+        with span('git'):
+            commits = list(self.repo.iter_commits())
+            branch_count = len(self.repo.branches)
+            active_branch = self.repo.active_branch.name
+        count('commits_walked', len(commits))
         recent_commits = commits[:5]  # Last 5 commits
         
-        context_update = f"""
-## Recent Changes
+        sections = {
+            'recent-changes': f"""## Recent Changes
 {len(commits)} total commits
 
 ### Last 5 Commits:
 {chr(10).join([f"- {commit.summary}" for commit in recent_commits])}
 
 ### Repository Statistics
-- Total Branches: {len(self.repo.branches)}
-- Active Branch: {self.repo.active_branch.name}
+- Total Branches: {branch_count}
+- Active Branch: {active_branch}
 """
+        }
+        
+        # Only files changed since the last indexed HEAD are blamed again
+        self.ownership.update()
+        sections['ownership'] = f"""## Code Ownership
+{OwnershipIndex.to_markdown(self.ownership.rollup(OWNERSHIP_DEPTH))}"""
         
         # Optional AI-powered insights
-        if ai_insights and self.anthropic_api_key:
-            context_update += self._generate_ai_insights()
+        if ai_insights:
+            # Local heuristics run first; the model only synthesizes their findings
+            findings = self.local_insights.analyze()
+            
+            if self.anthropic_api_key:
+                project_context = {
+                    'total_commits': len(commits),
+                    'active_branch': active_branch,
+                    'milestones': self.list_milestones(),
+                    'local_findings': [finding['message'] for finding in findings],
+                    'recent_commits': [
+                        {
+                            'summary': commit.summary,
+                            'author': commit.author.name,
+                            'committed_at': commit.committed_datetime.isoformat()
+                        }
+                        for commit in commits[:50]
+                    ]
+                }
+                code_chunks = self._relevant_code(commits)
+                sections['ai-insights'] = self._generate_ai_insights(project_context, use_cache, code_chunks).lstrip('\n')
+            else:
+                sections['ai-insights'] = (
+                    "### Local Insights\n"
+                    f"{LocalInsightEngine.to_markdown(findings)}\n"
+                    "_Set ANTHROPIC_API_KEY for an AI-synthesized summary._\n"
+                )
+        
+        with open(self.context_file, 'r') as f:
+            context = f.read()
+        
+        # Move blocks appended by older versions into the archive
+        context, legacy_blocks = extract_legacy_blocks(context, 'Recent Changes')
+        for block in legacy_blocks:
+            self.archive.append('recent-changes', block)
         
-        # Append to context file
-        with open(self.context_file, 'a') as f:
-            f.write(context_update)
+        # Replace sections in place, archiving what they supersede
+        for name, body in sections.items():
+            context, previous = replace_section(context, name, body)
+            if previous is not None and previous.strip() != body.strip():
+                self.archive.append(name, previous)
+        
+        write_atomic(self.context_file, context)
+
+    def _relevant_code(self, commits: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Retrieve the code chunks most related to the recent diff.
+
+        :param commits: Commits, newest first
+        :return: Code chunks from CodeRetrievalIndex.retrieve, best first
+        """
+        if not commits:
+            return []
+        try:
+            with span('git'):
+                base = commits[min(RECENT_DIFF_COMMITS, len(commits) - 1)]
+                diff = self.repo.git.diff(base.hexsha, commits[0].hexsha) if base != commits[0] else ''
+            query = diff_query(diff[:MAX_DIFF_CHARS]) + '\n' + '\n'.join(
+                commit.summary for commit in commits[:RECENT_DIFF_COMMITS])
+            self.code_retrieval.update()
+            return self.code_retrieval.retrieve(query, k=CODE_CONTEXT_CHUNKS)
+        except Exception:
+            # Code context is optional; insights are generated without it
+            return []
 
-    def _generate_ai_insights(self) -> str:
-        """Generate AI-powered project insights."""
+    def _generate_ai_insights(self, project_context: Optional[Dict[str, Any]] = None,
+                              use_cache: bool = True, code_chunks: Optional[List[Dict[str, Any]]] = None) -> str:
+        """
+        Generate AI-powered project insights.
+
+        :param project_context: Project data packed into the prompt token budget
+        :param use_cache: Whether to reuse a cached response for an identical prompt
+        :param code_chunks: Retrieved code included alongside the context
+        """
         try:
-            client = anthropic.Anthropic(api_key=self.anthropic_api_key)
-            response = client.messages.create(
-                model="claude-3-opus-20240229",
-                max_tokens=300,
-                messages=[
-                    {
-                        "role": "user", 
-                        "content": f"Analyze the development context of this project based on its recent git commits and provide strategic insights for improvement."
-                    }
-                ]
-            )
-            return f"\n### AI Development Insights\n{response.content[0].text}"
+            prompt = self.context_packer.pack_prompt(INSIGHTS_PROMPT, project_context or {}, code_chunks=code_chunks)
+            with span('ai'):
+                insights = self.ai_client.complete_sync(
+                    prompt,
+                    max_tokens=300,
+                    model="claude-3-opus-20240229",
+                    cache=self.response_cache,
+                    use_cache=use_cache
+                )
+            
+            return f"\n### AI Development Insights\n{insights}"
         except Exception as e:
             return f"\n### AI Insights Error\n{str(e)}"
 
     def generate_documentation(self, output_format: str = "markdown") -> str:
-        """Generate comprehensive project documentation."""
-        with open(self.context_file, 'r') as f:
-            context = f.read()
-        
+        """
+        Generate comprehensive project documentation.
+
+        :param output_format: One of 'markdown', 'html' or 'json'
+        :return: Path of the generated documentation file
+        """
         output_path = os.path.join(self.project_path, f"PROJECT_DOCS.{output_format}")
         
-        with open(output_path, 'w') as f:
-            f.write(context)
-        
-        return output_path
+        # Only sections whose content changed since the last run are re-rendered
+        return self.doc_renderer.render(self.context_file, output_path, output_format)
 
     def get_project_status(self) -> Dict[str, Any]:
         """Retrieve comprehensive project status."""
-        commits = list(self.repo.iter_commits())
+        with span('git'):
+            commits = list(self.repo.iter_commits())
+            active_branch = self.repo.active_branch.name
+        count('commits_walked', len(commits))
         
         return {
             "Total Commits": len(commits),
-            "Active Branch": self.repo.active_branch.name,
+            "Active Branch": active_branch,
             "Last Commit": commits[0].committed_datetime.strftime("%Y-%m-%d %H:%M:%S") if commits else "No commits",
             "Days Since Start": (datetime.now() - datetime.fromtimestamp(os.path.getctime(self.project_path))).days
         }
 
+    def get_ownership(self, path: str = '') -> Dict[str, int]:
+        """
+        Lines per author at HEAD within a file or directory.
+
+        :param path: File or directory relative to the repository root ('' for the whole project)
+        :return: Mapping of author to line count, largest first
+        """
+        self.ownership.update()
+        return self.ownership.ownership(path)
+
+    def get_data_sources(self, github=None):
+        """
+        Build a planner answering repository questions from the local clone when possible.
+
+        :param github: Optional GitHubIntegration for issues, pull requests and CI status
+        :return: DataSourcePlanner bound to this project's repository
+        """
+        from .integrations.data_sources import DataSourcePlanner
+
+        return DataSourcePlanner(self.repo, github=github)
+
     def track_milestone(self, milestone: str):
         """Add a new milestone to track."""
-        with open(self.milestones_file, 'r') as f:
+        with span('yaml'), open(self.milestones_file, 'r') as f:
             milestones_data = yaml.safe_load(f)
         
         milestones_data['milestones'].append({
@@ -147,12 +291,12 @@ class ContextManager:
             'status': 'in_progress'
         })
         
-        with open(self.milestones_file, 'w') as f:
+        with span('yaml'), open(self.milestones_file, 'w') as f:
             yaml.dump(milestones_data, f)
 
     def complete_milestone(self, milestone: str):
         """Mark a milestone as complete."""
-        with open(self.milestones_file, 'r') as f:
+        with span('yaml'), open(self.milestones_file, 'r') as f:
             milestones_data = yaml.safe_load(f)
         
         # Move milestone from active to completed
@@ -164,12 +308,12 @@ class ContextManager:
                 milestones_data['milestones'].remove(m)
                 break
         
-        with open(self.milestones_file, 'w') as f:
+        with span('yaml'), open(self.milestones_file, 'w') as f:
             yaml.dump(milestones_data, f)
 
     def list_milestones(self) -> List[str]:
         """List all active milestones."""
-        with open(self.milestones_file, 'r') as f:
+        with span('yaml'), open(self.milestones_file, 'r') as f:
             milestones_data = yaml.safe_load(f)
         
         return [m['name'] for m in milestones_data.get('milestones', [])]
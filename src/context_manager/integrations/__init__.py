@@ -0,0 +1,3 @@
+from .github_integration import GitHubIntegration
+from .org_scanner import OrganizationScanner
+from .data_sources import DataSourcePlanner
@@ -0,0 +1,235 @@
+import os
+import re
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Optional, Tuple
+import git
+import requests
+
+from .github_integration import GitHubIntegration
+
+# Matches owner/name in HTTPS and SSH GitHub remote URLs
+_GITHUB_REMOTE_PATTERN = re.compile(r'github\.com[:/](?P<owner>[^/]+)/(?P<name>[^/]+?)(?:\.git)?/?$')
+
+
+class DataSourcePlanner:
+    """
+    Answers repository questions from the cheapest source that has the data.
+
+    Commit lists, authors and recent activity come from the local clone when
+    its remote-tracking refs were fetched recently enough; otherwise, and for
+    data that only exists on GitHub (issues, pull requests, CI status), the
+    GitHub API is used. Every result reports the source that answered it.
+    """
+    def __init__(self, repo: git.Repo, github: Optional[GitHubIntegration] = None,
+                 owner: Optional[str] = None, name: Optional[str] = None,
+                 remote: str = 'origin', max_staleness: timedelta = timedelta(hours=1)):
+        """
+        Initialize the data source planner.
+
+        :param repo: Local clone of the repository
+        :param github: Optional GitHub integration for remote-only data
+        :param owner: Repository owner (defaults to the one in the remote URL)
+        :param name: Repository name (defaults to the one in the remote URL)
+        :param remote: Name of the remote tracking the GitHub repository
+        :param max_staleness: Maximum age of the last fetch for local answers
+        """
+        self.repo = repo
+        self.github = github
+        self.remote = remote
+        self.max_staleness = max_staleness
+
+        if not (owner and name):
+            owner, name = self._parse_remote()
+        self.owner = owner
+        self.name = name
+
+    def recent_commits(self, limit: int = 10) -> Dict[str, Any]:
+        """
+        Recent commits on the default branch.
+
+        :param limit: Number of commits to return
+        :return: Result with 'source' and 'data'
+        """
+        ref, reason = self._fresh_ref()
+        if ref:
+            commits = [self._commit_summary(commit) for commit in self.repo.iter_commits(ref, max_count=limit)]
+            return self._result('local', commits, reason)
+
+        return self._from_github(
+            lambda: self.github.get_recent_commits(self.owner, self.name, limit=limit), reason
+        )
+
+    def authors(self, days: int = 90) -> Dict[str, Any]:
+        """
+        Commit counts per author over a recent window.
+
+        :param days: Window size in days
+        :return: Result with 'source' and 'data' (author -> commit count)
+        """
+        activity = self._commits_since(days)
+        if activity['source'] in ('local', 'github'):
+            counts = Counter(commit['author'] for commit in activity['data'])
+            activity['data'] = dict(counts.most_common())
+        return activity
+
+    def recent_activity(self, days: int = 30) -> Dict[str, Any]:
+        """
+        Summary of commit activity over a recent window.
+
+        :param days: Window size in days
+        :return: Result with 'source' and 'data' (commit count, active authors, last commit)
+        """
+        activity = self._commits_since(days)
+        if activity['source'] in ('local', 'github'):
+            commits = activity['data']
+            activity['data'] = {
+                'days': days,
+                'commits': len(commits),
+                'active_authors': len({commit['author'] for commit in commits}),
+                'last_commit': commits[0]['date'] if commits else None
+            }
+        return activity
+
+    def open_issues(self, limit: int = 30) -> Dict[str, Any]:
+        """
+        Open issues, which only exist on GitHub.
+
+        :param limit: Maximum number of issues
+        :return: Result with 'source' and 'data'
+        """
+        return self._from_github(
+            lambda: list(self.github.iter_issues(self.owner, self.name, limit=limit)), 'GitHub-only data'
+        )
+
+    def open_pull_requests(self, limit: int = 30) -> Dict[str, Any]:
+        """
+        Open pull requests, which only exist on GitHub.
+
+        :param limit: Maximum number of pull requests
+        :return: Result with 'source' and 'data'
+        """
+        return self._from_github(
+            lambda: list(self.github.iter_pull_requests(self.owner, self.name, limit=limit)), 'GitHub-only data'
+        )
+
+    def ci_status(self, ref: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Combined CI status, which only exists on GitHub.
+
+        :param ref: Commit, branch or tag (defaults to the local HEAD commit)
+        :return: Result with 'source' and 'data'
+        """
+        ref = ref or self.repo.head.commit.hexsha
+        return self._from_github(
+            lambda: self.github.get_ci_status(self.owner, self.name, ref), 'GitHub-only data'
+        )
+
+    def last_fetch_age(self) -> Optional[timedelta]:
+        """
+        Time since the remote-tracking refs were last updated.
+
+        :return: Age of the last fetch, or None if the remote was never fetched
+        """
+        fetch_head = os.path.join(self.repo.git_dir, 'FETCH_HEAD')
+        timestamps = []
+        if os.path.exists(fetch_head):
+            timestamps.append(os.path.getmtime(fetch_head))
+
+        # A clone only logs the remote's HEAD, a fetch the branches it updated
+        try:
+            refs = self.repo.remote(self.remote).refs
+        except ValueError:
+            refs = []
+        for ref in refs:
+            try:
+                timestamps.append(ref.log_entry(-1).time[0])
+            except (IndexError, ValueError, OSError):
+                continue
+
+        if not timestamps:
+            return None
+        return timedelta(seconds=max(time.time() - max(timestamps), 0))
+
+    def _commits_since(self, days: int) -> Dict[str, Any]:
+        """Commits newer than a number of days, from the cheapest fresh source."""
+        since = datetime.now(timezone.utc) - timedelta(days=days)
+        ref, reason = self._fresh_ref()
+        if ref:
+            commits = [
+                self._commit_summary(commit)
+                for commit in self.repo.iter_commits(ref, since=since.strftime('%Y-%m-%dT%H:%M:%SZ'))
+            ]
+            return self._result('local', commits, reason)
+
+        return self._from_github(
+            lambda: list(self.github.iter_commits(self.owner, self.name,
+                                                  since=since.strftime('%Y-%m-%dT%H:%M:%SZ'))),
+            reason
+        )
+
+    def _fresh_ref(self) -> Tuple[Optional[str], str]:
+        """Remote-tracking ref to answer from locally, with the reason for the decision."""
+        ref = self._remote_ref()
+        if ref is None:
+            return None, f"no remote-tracking branch for '{self.remote}'"
+
+        age = self.last_fetch_age()
+        if age is None or age > self.max_staleness:
+            return None, f"remote-tracking refs are stale (last fetch: {age or 'never'})"
+        return ref.path, f"remote-tracking refs fetched {int(age.total_seconds())}s ago"
+
+    def _remote_ref(self) -> Optional[git.Reference]:
+        """Remote-tracking reference of the default branch."""
+        try:
+            remote = self.repo.remote(self.remote)
+        except ValueError:
+            return None
+
+        refs = {ref.remote_head: ref for ref in remote.refs}
+        head = refs.get('HEAD')
+        if head is not None:
+            try:
+                return head.reference
+            except TypeError:
+                pass
+        for branch in ('main', 'master'):
+            if branch in refs:
+                return refs[branch]
+        return None
+
+    def _from_github(self, fetch, reason: str) -> Dict[str, Any]:
+        """Answer from the GitHub API, or report that no source could answer."""
+        if self.github is None or not (self.owner and self.name):
+            return self._result('unavailable', None, f"{reason}; no GitHub repository configured")
+        try:
+            return self._result('github', fetch(), reason)
+        except requests.RequestException as e:
+            return self._result('unavailable', None, f"{reason}; GitHub request failed: {e}")
+
+    def _parse_remote(self) -> Tuple[Optional[str], Optional[str]]:
+        """Owner and name of the GitHub repository behind the remote."""
+        try:
+            url = self.repo.remote(self.remote).url
+        except ValueError:
+            return None, None
+        match = _GITHUB_REMOTE_PATTERN.search(url)
+        return (match.group('owner'), match.group('name')) if match else (None, None)
+
+    @staticmethod
+    def _commit_summary(commit: git.Commit) -> Dict[str, Any]:
+        """Local commit in the same shape GitHubIntegration returns."""
+        return {
+            'sha': commit.hexsha,
+            'message': commit.summary,
+            'author': commit.author.name,
+            'login': None,
+            'date': commit.committed_datetime.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'url': None
+        }
+
+    @staticmethod
+    def _result(source: str, data: Any, reason: str) -> Dict[str, Any]:
+        """Wrap an answer with the source that produced it."""
+        return {'source': source, 'reason': reason, 'data': data}
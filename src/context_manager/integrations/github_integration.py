@@ -1,48 +1,389 @@
+import os
+import json
+import time
+import hashlib
+import threading
 import github3
-from typing import Dict, Any, Optional
+import requests
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+from ..utils.profiling import count, span
+
+# Maximum page size accepted by the GitHub REST API
+MAX_PER_PAGE = 100
+
 
 class GitHubIntegration:
     """
     Provides integration with GitHub for repository tracking and analysis.
+
+    Requests go through github3's authenticated session. GET responses are
+    cached on disk with their ETag and revalidated with conditional requests,
+    which GitHub does not count against the rate limit when unchanged.
     """
-    def __init__(self, token: Optional[str] = None):
+    def __init__(self, token: Optional[str] = None, api_url: Optional[str] = None,
+                 project_path: Optional[str] = None, max_rate_limit_wait: float = 300.0,
+                 max_retries: int = 3):
         """
         Initialize GitHub integration.
-        
+
         :param token: Optional GitHub authentication token
+        :param api_url: Optional REST API base URL (e.g. a GitHub Enterprise or test server)
+        :param project_path: Project whose .context/ directory holds the response cache
+        :param max_rate_limit_wait: Longest time to sleep for a rate limit reset, in seconds
+        :param max_retries: Retries after a rate-limited response
         """
         self.gh = github3.login(token=token) if token else github3.GitHub()
+        self.session = self.gh.session
+        if api_url:
+            self.session.base_url = api_url.rstrip('/')
+        self.api_url = self.session.base_url
+
+        self.cache_dir = os.path.join(project_path or os.getcwd(), '.context', 'github_cache')
+        self.max_rate_limit_wait = max_rate_limit_wait
+        self.max_retries = max_retries
+        self.rate_limit: Dict[str, Optional[int]] = {'limit': None, 'remaining': None, 'reset': None}
+        self.stats = {'requests': 0, 'not_modified': 0}
+        # The session is shared by worker threads during bulk scans
+        self._lock = threading.Lock()
 
     def get_repository_info(self, owner: str, repo: str) -> Dict[str, Any]:
         """
         Retrieve comprehensive information about a GitHub repository.
-        
+
         :param owner: Repository owner's username
         :param repo: Repository name
         :return: Repository information dictionary
         """
-        # TODO: Implement repository information retrieval
-        pass
+        try:
+            data, _ = self._get(self._url('repos', owner, repo))
+        except requests.RequestException as e:
+            return {
+                'error': str(e),
+                'repository': f"{owner}/{repo}"
+            }
+
+        return {
+            'name': data.get('name'),
+            'full_name': data.get('full_name'),
+            'description': data.get('description'),
+            'url': data.get('html_url'),
+            'default_branch': data.get('default_branch'),
+            'language': data.get('language'),
+            'topics': data.get('topics', []),
+            'license': (data.get('license') or {}).get('spdx_id'),
+            'stars': data.get('stargazers_count', 0),
+            'forks': data.get('forks_count', 0),
+            'open_issues': data.get('open_issues_count', 0),
+            'archived': data.get('archived', False),
+            'created_at': data.get('created_at'),
+            'updated_at': data.get('updated_at'),
+            'pushed_at': data.get('pushed_at')
+        }
 
     def get_recent_commits(self, owner: str, repo: str, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Retrieve recent commits for a repository.
-        
+
         :param owner: Repository owner's username
         :param repo: Repository name
         :param limit: Number of commits to retrieve
         :return: List of recent commits
         """
-        # TODO: Implement recent commits retrieval
-        pass
+        return list(self.iter_commits(owner, repo, limit=limit))
+
+    def iter_commits(self, owner: str, repo: str, limit: Optional[int] = None,
+                     since: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily iterate over a repository's commits, newest first.
+
+        Pages are only fetched as the iterator is consumed, and no further
+        page is requested once limit commits have been produced.
+
+        :param owner: Repository owner's username
+        :param repo: Repository name
+        :param limit: Maximum number of commits to produce
+        :param since: Optional ISO 8601 timestamp of the oldest commit to include
+        :return: Iterator of commit summaries
+        """
+        params = {'since': since} if since else {}
+        for item in self._paginate(self._url('repos', owner, repo, 'commits'), params, limit):
+            commit = item.get('commit', {})
+            author = commit.get('author') or {}
+            yield {
+                'sha': item.get('sha'),
+                'message': (commit.get('message') or '').split('\n', 1)[0],
+                'author': author.get('name'),
+                'login': (item.get('author') or {}).get('login'),
+                'date': author.get('date'),
+                'url': item.get('html_url')
+            }
+
+    def iter_organization_repositories(self, org: str, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily iterate over an organization's repositories.
+
+        :param org: Organization login
+        :param limit: Maximum number of repositories to produce
+        :return: Iterator of repository summaries with owner and name
+        """
+        for item in self._paginate(self._url('orgs', org, 'repos'), {'type': 'all'}, limit):
+            yield {
+                'owner': (item.get('owner') or {}).get('login', org),
+                'name': item.get('name'),
+                'full_name': item.get('full_name'),
+                'archived': item.get('archived', False)
+            }
+
+    def iter_issues(self, owner: str, repo: str, state: str = 'open',
+                    limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily iterate over a repository's issues, excluding pull requests.
+
+        :param owner: Repository owner's username
+        :param repo: Repository name
+        :param state: Issue state ('open', 'closed' or 'all')
+        :param limit: Maximum number of issues to produce
+        :return: Iterator of issue summaries
+        """
+        produced = 0
+        for item in self._paginate(self._url('repos', owner, repo, 'issues'), {'state': state}, None):
+            if 'pull_request' in item:
+                continue
+            yield {
+                'number': item.get('number'),
+                'title': item.get('title'),
+                'state': item.get('state'),
+                'author': (item.get('user') or {}).get('login'),
+                'labels': [label.get('name') for label in item.get('labels', [])],
+                'created_at': item.get('created_at'),
+                'updated_at': item.get('updated_at'),
+                'url': item.get('html_url')
+            }
+            produced += 1
+            if limit is not None and produced >= limit:
+                return
+
+    def iter_pull_requests(self, owner: str, repo: str, state: str = 'open',
+                           limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily iterate over a repository's pull requests.
+
+        :param owner: Repository owner's username
+        :param repo: Repository name
+        :param state: Pull request state ('open', 'closed' or 'all')
+        :param limit: Maximum number of pull requests to produce
+        :return: Iterator of pull request summaries
+        """
+        for item in self._paginate(self._url('repos', owner, repo, 'pulls'), {'state': state}, limit):
+            yield {
+                'number': item.get('number'),
+                'title': item.get('title'),
+                'state': item.get('state'),
+                'draft': item.get('draft', False),
+                'author': (item.get('user') or {}).get('login'),
+                'created_at': item.get('created_at'),
+                'updated_at': item.get('updated_at'),
+                'url': item.get('html_url')
+            }
+
+    def get_ci_status(self, owner: str, repo: str, ref: str) -> Dict[str, Any]:
+        """
+        Retrieve the combined CI status of a commit or branch.
+
+        :param owner: Repository owner's username
+        :param repo: Repository name
+        :param ref: Commit SHA, branch or tag
+        :return: Combined state and individual status contexts
+        """
+        data, _ = self._get(self._url('repos', owner, repo, 'commits', ref, 'status'))
+        return {
+            'ref': ref,
+            'state': data.get('state'),
+            'total_count': data.get('total_count', 0),
+            'statuses': [
+                {'context': status.get('context'), 'state': status.get('state')}
+                for status in data.get('statuses', [])
+            ]
+        }
 
     def check_repository_health(self, owner: str, repo: str) -> Dict[str, Any]:
         """
         Perform a comprehensive health check on a repository.
-        
+
         :param owner: Repository owner's username
         :param repo: Repository name
         :return: Repository health metrics
         """
-        # TODO: Implement repository health check
-        pass
+        info = self.get_repository_info(owner, repo)
+        if 'error' in info:
+            return info
+
+        try:
+            since = (datetime.now(timezone.utc) - timedelta(days=30)).strftime('%Y-%m-%dT%H:%M:%SZ')
+            recent_commits = sum(1 for _ in self.iter_commits(owner, repo, limit=MAX_PER_PAGE, since=since))
+            readme, _ = self._get(self._url('repos', owner, repo, 'readme'), allow_missing=True)
+        except requests.RequestException as e:
+            return {
+                'error': str(e),
+                'repository': f"{owner}/{repo}"
+            }
+
+        days_since_push = None
+        if info.get('pushed_at'):
+            pushed_at = datetime.fromisoformat(info['pushed_at'].replace('Z', '+00:00'))
+            days_since_push = (datetime.now(timezone.utc) - pushed_at).days
+
+        issues = []
+        if info['archived']:
+            issues.append('Repository is archived')
+        if readme is None:
+            issues.append('No README found')
+        if not info['license']:
+            issues.append('No license detected')
+        if days_since_push is not None and days_since_push > 90:
+            issues.append(f"No pushes for {days_since_push} days")
+        if recent_commits == 0:
+            issues.append('No commits in the last 30 days')
+
+        return {
+            'repository': info['full_name'],
+            'score': max(0, 100 - 20 * len(issues)),
+            'issues': issues,
+            'metrics': {
+                'has_readme': readme is not None,
+                'license': info['license'],
+                'archived': info['archived'],
+                'open_issues': info['open_issues'],
+                'days_since_push': days_since_push,
+                'commits_last_30_days': recent_commits
+            },
+            'checked_at': datetime.now().isoformat()
+        }
+
+    def _url(self, *parts: str) -> str:
+        """Build an API URL relative to the configured base URL."""
+        return '/'.join([self.api_url] + [str(part).strip('/') for part in parts])
+
+    def _paginate(self, url: str, params: Dict[str, Any], limit: Optional[int]) -> Iterator[Dict[str, Any]]:
+        """Follow Link headers page by page, stopping as soon as limit items were produced."""
+        per_page = min(limit, MAX_PER_PAGE) if limit else MAX_PER_PAGE
+        params = dict(params, per_page=per_page)
+        produced = 0
+
+        while url:
+            items, response_links = self._get(url, params)
+            for item in items or []:
+                yield item
+                produced += 1
+                if limit is not None and produced >= limit:
+                    return
+
+            # The next link already carries the query parameters
+            url, params = response_links.get('next'), None
+
+    def _get(self, url: str, params: Optional[Dict[str, Any]] = None,
+             allow_missing: bool = False) -> Tuple[Any, Dict[str, str]]:
+        """
+        Issue a conditional GET, serving unchanged responses from the on-disk cache.
+
+        :param url: Request URL
+        :param params: Query parameters
+        :param allow_missing: Return None instead of raising on 404
+        :return: Tuple of (decoded JSON body, pagination links)
+        """
+        cache_path = self._cache_path(url, params)
+        cached = self._read_cache(cache_path)
+        headers = {}
+        if cached and cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        elif cached and cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+
+        response = self._request(url, params, headers)
+
+        if response.status_code == 304 and cached:
+            with self._lock:
+                self.stats['not_modified'] += 1
+            return cached['body'], cached.get('links', {})
+        if response.status_code == 404 and allow_missing:
+            return None, {}
+        response.raise_for_status()
+
+        body = response.json()
+        links = {rel: link['url'] for rel, link in response.links.items()}
+        if response.headers.get('ETag') or response.headers.get('Last-Modified'):
+            self._write_cache(cache_path, {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'links': links,
+                'body': body
+            })
+        return body, links
+
+    def _request(self, url: str, params: Optional[Dict[str, Any]], headers: Dict[str, str]) -> requests.Response:
+        """Send a request, waiting for the rate limit window when it is exhausted."""
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_rate_limit()
+            with self._lock:
+                self.stats['requests'] += 1
+            count('http_requests')
+            with span('http'):
+                response = self.session.get(url, params=params, headers=headers)
+            with self._lock:
+                self._record_rate_limit(response)
+
+            if response.status_code in (403, 429) and attempt < self.max_retries and self._is_rate_limited(response):
+                retry_after = response.headers.get('Retry-After')
+                if retry_after and retry_after.isdigit():
+                    time.sleep(min(int(retry_after), self.max_rate_limit_wait))
+                continue
+            return response
+        return response
+
+    def _wait_for_rate_limit(self):
+        """Sleep until the rate limit resets if no requests remain."""
+        if self.rate_limit['remaining'] == 0 and self.rate_limit['reset']:
+            delay = self.rate_limit['reset'] - time.time()
+            if delay > 0:
+                time.sleep(min(delay, self.max_rate_limit_wait))
+            self.rate_limit['remaining'] = None
+
+    def _record_rate_limit(self, response: requests.Response):
+        """Track the rate limit headers of the latest response."""
+        for key, header in (('limit', 'X-RateLimit-Limit'), ('remaining', 'X-RateLimit-Remaining'),
+                            ('reset', 'X-RateLimit-Reset')):
+            value = response.headers.get(header)
+            if value is not None and value.isdigit():
+                self.rate_limit[key] = int(value)
+
+    @staticmethod
+    def _is_rate_limited(response: requests.Response) -> bool:
+        """Whether a 403/429 response signals a primary or secondary rate limit."""
+        return response.headers.get('X-RateLimit-Remaining') == '0' or 'Retry-After' in response.headers
+
+    def _cache_path(self, url: str, params: Optional[Dict[str, Any]]) -> str:
+        """Cache file for a request, keyed by URL, parameters and credentials."""
+        credentials = getattr(self.session.auth, 'token', None) or self.session.headers.get('Authorization')
+        key = json.dumps([url, sorted((params or {}).items()), credentials], default=str)
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.json")
+
+    @staticmethod
+    def _read_cache(path: str) -> Optional[Dict[str, Any]]:
+        """Load a cached response, treating unreadable entries as missing."""
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_cache(path: str, entry: Dict[str, Any]):
+        """Store a cached response atomically."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
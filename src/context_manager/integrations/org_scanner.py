@@ -0,0 +1,111 @@
+import os
+import json
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, Any, Iterator, Optional, Set
+
+from .github_integration import GitHubIntegration
+
+
+class OrganizationScanner:
+    """
+    Runs repository health checks across a whole GitHub organization.
+
+    Checks fan out over a bounded worker pool that shares one authenticated
+    GitHubIntegration session. Every successful result is appended to a JSON
+    Lines checkpoint, so an interrupted scan resumes with the repositories it
+    has not checked yet.
+    """
+    def __init__(self, github: GitHubIntegration, max_workers: int = 8,
+                 checkpoint_dir: Optional[str] = None):
+        """
+        Initialize the organization scanner.
+
+        :param github: GitHub integration whose session is shared by all workers
+        :param max_workers: Maximum number of concurrent health checks
+        :param checkpoint_dir: Directory holding scan checkpoints (defaults to .context/github_scan)
+        """
+        self.github = github
+        self.max_workers = max_workers
+        self.checkpoint_dir = checkpoint_dir or os.path.join(os.getcwd(), '.context', 'github_scan')
+
+    def checkpoint_path(self, org: str) -> str:
+        """
+        Path of the checkpoint file for an organization.
+
+        :param org: Organization login
+        :return: Checkpoint file path
+        """
+        return os.path.join(self.checkpoint_dir, f"{org}.jsonl")
+
+    def scan(self, org: str, restart: bool = False, include_archived: bool = False,
+             limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Check every repository of an organization, yielding results as they complete.
+
+        :param org: Organization login
+        :param restart: Discard an existing checkpoint and scan everything again
+        :param include_archived: Whether to check archived repositories
+        :param limit: Maximum number of repositories to list
+        :return: Iterator of per-repository health results
+        """
+        checkpoint = self.checkpoint_path(org)
+        if restart and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        completed = self._completed(checkpoint)
+
+        repositories = (
+            repository for repository in self.github.iter_organization_repositories(org, limit=limit)
+            if repository['full_name'] not in completed and (include_archived or not repository['archived'])
+        )
+
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor, open(checkpoint, 'a') as log:
+            pending = set()
+            exhausted = False
+
+            # Keep a bounded window of work in flight so listing stays lazy
+            while pending or not exhausted:
+                while not exhausted and len(pending) < 2 * self.max_workers:
+                    repository = next(repositories, None)
+                    if repository is None:
+                        exhausted = True
+                        break
+                    pending.add(executor.submit(self._check, repository))
+
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    # Failed checks stay out of the checkpoint so a resumed scan retries them
+                    if 'error' not in result:
+                        log.write(json.dumps(result) + '\n')
+                        log.flush()
+                    yield result
+
+    def _check(self, repository: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one health check, turning failures into error results."""
+        try:
+            result = self.github.check_repository_health(repository['owner'], repository['name'])
+        except Exception as e:
+            result = {'error': str(e)}
+
+        result['repository'] = repository['full_name']
+        result.setdefault('checked_at', datetime.now().isoformat())
+        return result
+
+    @staticmethod
+    def _completed(checkpoint: str) -> Set[str]:
+        """Repositories already recorded in a checkpoint, ignoring a torn last line."""
+        completed = set()
+        if not os.path.exists(checkpoint):
+            return completed
+
+        with open(checkpoint, 'r') as f:
+            for line in f:
+                try:
+                    completed.add(json.loads(line)['repository'])
+                except (ValueError, KeyError):
+                    continue
+        return completed
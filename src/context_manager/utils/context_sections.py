@@ -0,0 +1,147 @@
+import os
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+SECTION_BEGIN = '<!-- BEGIN SECTION: {name} -->'
+SECTION_END = '<!-- END SECTION: {name} -->'
+
+_SECTION_PATTERN = re.compile(
+    r'<!-- BEGIN SECTION: (?P<name>[\w-]+) -->\n(?P<body>.*?)<!-- END SECTION: (?P=name) -->\n?',
+    re.S
+)
+
+
+def read_sections(text: str) -> Dict[str, str]:
+    """
+    Collect the managed sections of a context document.
+
+    :param text: Context document contents
+    :return: Mapping of section name to section body
+    """
+    return {match.group('name'): match.group('body') for match in _SECTION_PATTERN.finditer(text)}
+
+
+def replace_section(text: str, name: str, body: str) -> Tuple[str, Optional[str]]:
+    """
+    Replace a managed section in place, appending it if it does not exist yet.
+
+    :param text: Context document contents
+    :param name: Section name
+    :param body: New section body
+    :return: Updated document and the previous section body (if any)
+    """
+    if not body.endswith('\n'):
+        body += '\n'
+    block = f"{SECTION_BEGIN.format(name=name)}\n{body}{SECTION_END.format(name=name)}\n"
+
+    for match in _SECTION_PATTERN.finditer(text):
+        if match.group('name') == name:
+            updated = text[:match.start()] + block + text[match.end():]
+            return updated, match.group('body')
+
+    if text and not text.endswith('\n'):
+        text += '\n'
+    return f"{text}\n{block}", None
+
+
+def extract_legacy_blocks(text: str, heading: str) -> Tuple[str, List[str]]:
+    """
+    Strip unmanaged blocks that older versions appended under a level-2 heading.
+
+    :param text: Context document contents
+    :param heading: Heading title of the appended blocks (e.g. 'Recent Changes')
+    :return: Document without the legacy blocks and the blocks that were removed
+    """
+    pattern = re.compile(rf'^## {re.escape(heading)}\n.*?(?=^## |^<!-- BEGIN SECTION|\Z)', re.S | re.M)
+    blocks: List[str] = []
+    pieces: List[str] = []
+    position = 0
+    # Managed sections use the same headings, so only the text between them is searched
+    for match in list(_SECTION_PATTERN.finditer(text)) + [None]:
+        end = match.start() if match else len(text)
+        unmanaged = text[position:end]
+        blocks.extend(pattern.findall(unmanaged))
+        pieces.append(pattern.sub('', unmanaged))
+        if match:
+            pieces.append(match.group(0))
+            position = match.end()
+    if not blocks:
+        return text, []
+    return ''.join(pieces).rstrip('\n') + '\n', blocks
+
+
+def write_atomic(path: str, text: str):
+    """
+    Write a file via a temporary sibling so readers never see a partial file.
+
+    :param path: Destination path
+    :param text: File contents
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class ContextArchive:
+    """
+    Size-bounded history of superseded context sections, rotated like a log file.
+    """
+    def __init__(self, archive_dir: str, max_bytes: int = 512 * 1024, backup_count: int = 5):
+        """
+        Initialize the archive.
+
+        :param archive_dir: Directory holding the archive files
+        :param max_bytes: Size at which the active archive file is rotated
+        :param backup_count: Number of rotated archive files to keep
+        """
+        self.archive_dir = archive_dir
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.archive_file = os.path.join(archive_dir, 'CONTEXT_HISTORY.md')
+
+    def append(self, name: str, content: str):
+        """
+        Archive a superseded section.
+
+        :param name: Section name
+        :param content: Section body that was replaced
+        """
+        if not content.strip():
+            return
+
+        os.makedirs(self.archive_dir, exist_ok=True)
+        entry = f"<!-- archived {name} at {datetime.now().isoformat()} -->\n{content.rstrip()}\n\n"
+
+        if os.path.exists(self.archive_file) and \
+                os.path.getsize(self.archive_file) + len(entry.encode()) > self.max_bytes:
+            self._rotate()
+
+        with open(self.archive_file, 'a') as f:
+            f.write(entry)
+
+    def archive_files(self) -> List[str]:
+        """
+        List existing archive files, newest first.
+
+        :return: Archive file paths
+        """
+        paths = [self.archive_file] + [f"{self.archive_file}.{i}" for i in range(1, self.backup_count + 1)]
+        return [path for path in paths if os.path.exists(path)]
+
+    def _rotate(self):
+        """Shift archive files by one, dropping the oldest."""
+        oldest = f"{self.archive_file}.{self.backup_count}"
+        if os.path.exists(oldest):
+            os.remove(oldest)
+
+        for i in range(self.backup_count - 1, 0, -1):
+            source = f"{self.archive_file}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.archive_file}.{i + 1}")
+
+        if self.backup_count > 0:
+            os.replace(self.archive_file, f"{self.archive_file}.1")
+        else:
+            os.remove(self.archive_file)
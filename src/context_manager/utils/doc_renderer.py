@@ -0,0 +1,272 @@
+import os
+import re
+import json
+import hashlib
+from datetime import datetime
+from html import escape
+from typing import Dict, List, Any, Iterable, Optional, Union
+from jinja2 import ChoiceLoader, DictLoader, Environment, FileSystemBytecodeCache, FileSystemLoader
+
+from .context_sections import write_atomic
+
+# Built-in templates; projects can override any of them under .context/templates/
+DEFAULT_TEMPLATES = {
+    'markdown/header.j2': '',
+    'markdown/section.j2': '{{ section.body }}\n',
+    'markdown/footer.j2': '',
+    'html/header.j2': (
+        '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n'
+        '<title>{{ project_name | e }} Documentation</title>\n</head>\n<body>\n'
+    ),
+    'html/section.j2': '<section id="{{ section.id }}">\n{{ section.body | markdown_to_html }}\n</section>\n',
+    'html/footer.j2': '<footer>Generated {{ generated_at }}</footer>\n</body>\n</html>\n',
+    'json/header.j2': (
+        '{"project": {{ project_name | tojson }}, "generated_at": {{ generated_at | tojson }}, "sections": [\n'
+    ),
+    'json/section.j2': (
+        '{"id": {{ section.id | tojson }}, "title": {{ section.title | tojson }}, '
+        '"level": {{ section.level }}, "content": {{ section.body | tojson }}, '
+        '"items": {{ section.body | list_items | tojson }}}'
+    ),
+    'json/footer.j2': '\n]}\n',
+}
+
+# Text placed between rendered sections for each format
+SECTION_SEPARATORS = {
+    'markdown': '\n',
+    'html': '',
+    'json': ',\n',
+}
+
+SUPPORTED_FORMATS = tuple(SECTION_SEPARATORS)
+
+_HEADING_PATTERN = re.compile(r'^(#{1,2}) (.+)$')
+_MARKER_PATTERN = re.compile(r'^<!-- (BEGIN|END) SECTION: [\w-]+ -->$')
+_LIST_ITEM_PATTERN = re.compile(r'^\s*(?:[-*•]|\d+\.)\s+(.*)$')
+
+
+def split_sections(text: Union[str, Iterable[str]]) -> List[Dict[str, Any]]:
+    """
+    Split a markdown context document into sections at level-1 and level-2 headings.
+
+    :param text: Markdown document contents, or an iterable of its lines such as an open file
+    :return: Ordered list of sections with id, title, level and body
+    """
+    sections = []
+    seen_ids: Dict[str, int] = {}
+    current: Optional[Dict[str, Any]] = None
+    lines = text.split('\n') if isinstance(text, str) else (line.rstrip('\n') for line in text)
+
+    for line in lines:
+        if _MARKER_PATTERN.match(line.strip()):
+            continue
+
+        heading = _HEADING_PATTERN.match(line)
+        if heading or current is None:
+            title = heading.group(2).strip() if heading else ''
+            section_id = re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-') or 'preamble'
+            seen_ids[section_id] = seen_ids.get(section_id, 0) + 1
+            if seen_ids[section_id] > 1:
+                section_id = f"{section_id}-{seen_ids[section_id]}"
+
+            current = {
+                'id': section_id,
+                'title': title,
+                'level': len(heading.group(1)) if heading else 0,
+                'lines': []
+            }
+            sections.append(current)
+
+        current['lines'].append(line)
+
+    result = []
+    for section in sections:
+        body = '\n'.join(section.pop('lines')).strip('\n')
+        if body.strip():
+            section['body'] = body
+            result.append(section)
+    return result
+
+
+def _list_items(markdown_text: str) -> List[str]:
+    """Extract bullet and numbered list items from markdown text."""
+    items = []
+    for line in markdown_text.split('\n'):
+        match = _LIST_ITEM_PATTERN.match(line)
+        if match and match.group(1).strip():
+            items.append(match.group(1).strip())
+    return items
+
+
+def _markdown_to_html(markdown_text: str) -> str:
+    """Convert the small markdown subset used by context files into HTML."""
+    html_lines = []
+    list_tag = None
+
+    def close_list():
+        nonlocal list_tag
+        if list_tag:
+            html_lines.append(f'</{list_tag}>')
+            list_tag = None
+
+    for line in markdown_text.split('\n'):
+        stripped = line.strip()
+        heading = re.match(r'^(#{1,6}) (.+)$', stripped)
+        bullet = re.match(r'^[-*•]\s+(.*)$', stripped)
+        numbered = re.match(r'^\d+\.\s+(.*)$', stripped)
+
+        if heading:
+            close_list()
+            level = len(heading.group(1))
+            html_lines.append(f'<h{level}>{escape(heading.group(2))}</h{level}>')
+        elif bullet or numbered:
+            tag = 'ul' if bullet else 'ol'
+            if list_tag != tag:
+                close_list()
+                html_lines.append(f'<{tag}>')
+                list_tag = tag
+            html_lines.append(f'<li>{escape((bullet or numbered).group(1))}</li>')
+        elif stripped:
+            close_list()
+            html_lines.append(f'<p>{escape(stripped)}</p>')
+        else:
+            close_list()
+
+    close_list()
+    return '\n'.join(html_lines)
+
+
+class DocumentationRenderer:
+    """
+    Renders project documentation from CONTEXT.md through jinja2 templates.
+
+    Rendered sections are cached per format together with a content hash of
+    their inputs, so regenerating documentation only re-renders the sections
+    that changed since the last run.
+    """
+    def __init__(self, project_path: str):
+        """
+        Initialize the documentation renderer.
+
+        :param project_path: Path to the project
+        """
+        self.project_path = project_path
+        self.context_dir = os.path.join(project_path, '.context')
+        self.templates_dir = os.path.join(self.context_dir, 'templates')
+        self.cache_dir = os.path.join(self.context_dir, 'docs_cache')
+        self.last_render_stats = {'rendered': 0, 'reused': 0}
+        self._env: Optional[Environment] = None
+        self._template_hashes: Dict[str, str] = {}
+
+    @property
+    def env(self) -> Environment:
+        """Template environment, created (with its cache directory) on first render."""
+        if self._env is None:
+            bytecode_dir = os.path.join(self.cache_dir, 'templates')
+            os.makedirs(bytecode_dir, exist_ok=True)
+
+            # Compiled templates are kept in memory by the environment and on disk
+            # by the bytecode cache, so repeated runs skip template compilation.
+            self._env = Environment(
+                loader=ChoiceLoader([
+                    FileSystemLoader(self.templates_dir),
+                    DictLoader(DEFAULT_TEMPLATES)
+                ]),
+                bytecode_cache=FileSystemBytecodeCache(bytecode_dir),
+                autoescape=False,
+                keep_trailing_newline=True
+            )
+            self._env.filters['markdown_to_html'] = _markdown_to_html
+            self._env.filters['list_items'] = _list_items
+        return self._env
+
+    def render(self, source_path: str, output_path: str, output_format: str = 'markdown') -> str:
+        """
+        Render a context document into the requested output format.
+
+        :param source_path: Markdown context document to render
+        :param output_path: Destination file
+        :param output_format: One of 'markdown', 'html' or 'json'
+        :return: Path of the rendered document
+        """
+        if output_format not in SUPPORTED_FORMATS:
+            raise ValueError(
+                f"Unsupported documentation format '{output_format}'. "
+                f"Expected one of: {', '.join(SUPPORTED_FORMATS)}"
+            )
+
+        # Stream the document line by line instead of holding a second full copy
+        with open(source_path, 'r') as f:
+            sections = split_sections(f)
+
+        fragment_dir = os.path.join(self.cache_dir, output_format)
+        os.makedirs(fragment_dir, exist_ok=True)
+        manifest_path = os.path.join(fragment_dir, 'manifest.json')
+        manifest = self._load_manifest(manifest_path)
+
+        section_template = f"{output_format}/section.j2"
+        template_hash = self._template_hash(section_template)
+        new_manifest = {}
+        stats = {'rendered': 0, 'reused': 0}
+
+        for section in sections:
+            digest = hashlib.sha256(
+                json.dumps([template_hash, section], sort_keys=True).encode()
+            ).hexdigest()
+            fragment_path = os.path.join(fragment_dir, f"{section['id']}.frag")
+
+            if manifest.get(section['id']) == digest and os.path.exists(fragment_path):
+                stats['reused'] += 1
+            else:
+                fragment = self.env.get_template(section_template).render(section=section)
+                write_atomic(fragment_path, fragment)
+                stats['rendered'] += 1
+            new_manifest[section['id']] = digest
+
+        # Drop fragments of sections that no longer exist
+        for section_id in set(manifest) - set(new_manifest):
+            stale_path = os.path.join(fragment_dir, f"{section_id}.frag")
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+
+        write_atomic(manifest_path, json.dumps(new_manifest, indent=2))
+        self._write_document(output_path, output_format, [s['id'] for s in sections], fragment_dir)
+
+        self.last_render_stats = stats
+        return output_path
+
+    def _write_document(self, output_path: str, output_format: str, section_ids: List[str], fragment_dir: str):
+        """Assemble the document by streaming cached fragments to the output file."""
+        document_vars = {
+            'project_name': os.path.basename(os.path.abspath(self.project_path)),
+            'generated_at': datetime.now().isoformat()
+        }
+        separator = SECTION_SEPARATORS[output_format]
+
+        tmp_path = f"{output_path}.tmp"
+        with open(tmp_path, 'w') as out:
+            out.write(self.env.get_template(f"{output_format}/header.j2").render(**document_vars))
+            for index, section_id in enumerate(section_ids):
+                if index:
+                    out.write(separator)
+                with open(os.path.join(fragment_dir, f"{section_id}.frag"), 'r') as fragment:
+                    for chunk in iter(lambda: fragment.read(64 * 1024), ''):
+                        out.write(chunk)
+            out.write(self.env.get_template(f"{output_format}/footer.j2").render(**document_vars))
+        os.replace(tmp_path, output_path)
+
+    def _template_hash(self, name: str) -> str:
+        """Hash a template's source so template edits invalidate cached sections."""
+        if name not in self._template_hashes:
+            source, _, _ = self.env.loader.get_source(self.env, name)
+            self._template_hashes[name] = hashlib.sha256(source.encode()).hexdigest()
+        return self._template_hashes[name]
+
+    @staticmethod
+    def _load_manifest(manifest_path: str) -> Dict[str, str]:
+        """Load the section hash manifest, treating a missing or corrupt file as empty."""
+        try:
+            with open(manifest_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
@@ -1,92 +1,206 @@
 import os
+import re
+import json
+import string
 import yaml
 import typer
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Dict, List, Any, Optional
 from rich.console import Console
 from rich.prompt import Prompt, Confirm
-import anthropic
+
+from ..components.ai_insights.ai_client import AIClient, get_shared_client
+from ..components.ai_insights.context_packer import ONBOARDING_CONTEXT_TOKENS, ContextPacker
+
+STRATEGY_PROMPT = """Help create a comprehensive development strategy for a new software project with these characteristics (compact JSON):
+
+{context}
+
+Please provide:
+1. Phased development roadmap
+2. Key milestones
+3. Potential technical challenges
+4. Recommended best practices
+5. Initial architectural considerations"""
+
+# Appended to the prompt when the model is asked for machine-readable output
+STRUCTURED_STRATEGY_SUFFIX = """
+
+Respond with a single JSON object with the keys "roadmap", "milestones", "challenges" and "best_practices", each a list of short strings, followed by nothing else."""
+
+# Sections of a parsed strategy and the keywords that classify a line into them
+STRATEGY_SECTIONS = {
+    'roadmap': ('Phase', 'Stage'),
+    'milestones': ('milestone', 'key deliverable', 'major goal'),
+    'challenges': ('challenge', 'potential issue', 'complexity'),
+    'best_practices': ('best practice', 'recommendation', 'should'),
+}
+
+# Maximum number of entries kept per section
+STRATEGY_SECTION_LIMIT = 5
+
+# Sections whose keywords must match with their exact capitalization
+CASE_SENSITIVE_SECTIONS = ('roadmap',)
+
+# Section of every lowercased keyword
+_KEYWORD_SECTIONS = {
+    keyword.lower(): section for section, keywords in STRATEGY_SECTIONS.items() for keyword in keywords
+}
+
+# One alternation over every keyword; kept free of groups so the regex engine can scan fast
+_STRATEGY_PATTERN = re.compile('|'.join(re.escape(keyword) for keyword in _KEYWORD_SECTIONS))
+
+# Length-preserving ASCII lowercasing, so match offsets map back onto the original text
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# Answers the strategy prompt depends on; the request starts once all are known
+STRATEGY_FIELDS = ('name', 'domain', 'type', 'primary_language')
+
+PROJECT_TYPES = ["Web Application", "Mobile App", "Desktop App", "CLI Tool", "Library/Package", "Machine Learning", "Other"]
+
+# Defaults used for prompts and for answers missing from an answers file
+DEFAULT_ANSWERS = {
+    'name': 'MyProject',
+    'domain': 'General',
+    'type': 'Other',
+    'primary_language': 'Python',
+    'description': 'A new software project',
+    'frameworks': ''
+}
 
 class ProjectOnboarding:
-    def __init__(self, project_path: str):
+    def __init__(self, project_path: str, ai_client: Optional[AIClient] = None, quiet: bool = False,
+                 structured: bool = False):
+        """
+        Initialize project onboarding.
+
+        :param project_path: Path to the project
+        :param ai_client: Client used for the strategy request (defaults to the shared client)
+        :param quiet: Suppress console output, e.g. when onboarding in batch
+        :param structured: Ask the model for a JSON strategy instead of free text
+        """
         self.project_path = project_path
-        self.console = Console()
-        self.anthropic_client = anthropic.Anthropic()
+        self.console = Console(quiet=quiet)
+        self.ai_client = ai_client or get_shared_client()
         self.onboarding_file = os.path.join(project_path, 'PROJECT_BLUEPRINT.yaml')
+        self.context_packer = ContextPacker(max_tokens=ONBOARDING_CONTEXT_TOKENS)
+        self.structured = structured
+        self._strategy_future: Optional[Future] = None
+
+    def start_onboarding(self, answers: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Run project onboarding.
 
-    def start_onboarding(self):
-        """Initiate interactive project onboarding process."""
+        :param answers: Pre-filled answers for non-interactive onboarding
+        :return: The project blueprint that was written
+        """
         self.console.print("[bold cyan]🚀 Welcome to Project Initialization[/bold cyan]")
         
-        # Gather initial project details
-        project_details = self._gather_project_details()
-        
-        # Generate development strategy with Claude
-        development_strategy = self._generate_development_strategy(project_details)
+        try:
+            # Gather project details; the strategy request starts as soon as its inputs are known
+            if answers is None:
+                project_details = self._gather_project_details()
+            else:
+                project_details = self._details_from_answers(answers)
+            
+            # Wait for the development strategy requested in the background
+            development_strategy = self._generate_development_strategy(project_details)
+        except BaseException:
+            self.cancel_strategy()
+            raise
         
         # Create project blueprint
-        self._create_project_blueprint(project_details, development_strategy)
+        blueprint = self._create_project_blueprint(project_details, development_strategy)
         
         # Provide development standards guidance
         self._provide_development_standards()
+        return blueprint
+
+    def start_strategy(self, project_details: Dict[str, Any]) -> Future:
+        """
+        Start the development strategy request in the background.
+
+        :param project_details: Project details containing at least STRATEGY_FIELDS
+        :return: Cancellable future resolving to the strategy text
+        """
+        self.cancel_strategy()
+        context = {field: project_details[field] for field in STRATEGY_FIELDS}
+        instructions = STRATEGY_PROMPT + (STRUCTURED_STRATEGY_SUFFIX if self.structured else '')
+        prompt = self.context_packer.pack_prompt(instructions, context)
+        self._strategy_future = self.ai_client.submit(self.ai_client.complete(prompt, max_tokens=1000))
+        return self._strategy_future
+
+    def cancel_strategy(self):
+        """Cancel a pending strategy request, if any."""
+        if self._strategy_future is not None:
+            self._strategy_future.cancel()
+            self._strategy_future = None
+
+    @staticmethod
+    def load_answers(path: str) -> Dict[str, Any]:
+        """
+        Load onboarding answers from a YAML or JSON file.
+
+        :param path: Path to the answers file
+        :return: Answers keyed by field name
+        """
+        with open(path, 'r') as f:
+            # JSON documents are valid YAML, so one loader handles both
+            answers = yaml.safe_load(f) or {}
+        if not isinstance(answers, dict):
+            raise ValueError(f"Answers file {path} must contain a mapping")
+        return answers
 
     def _gather_project_details(self) -> dict:
         """Interactively gather project details."""
         details = {}
         
-        details['name'] = Prompt.ask("🏷️  Project Name", default="MyProject")
-        details['description'] = Prompt.ask("📝 Project Description", default="A new software project")
-        details['domain'] = Prompt.ask("🌐 Project Domain/Industry", default="General")
+        details['name'] = Prompt.ask("🏷️  Project Name", default=DEFAULT_ANSWERS['name'])
+        details['domain'] = Prompt.ask("🌐 Project Domain/Industry", default=DEFAULT_ANSWERS['domain'])
         
         # Project type selection
-        project_types = ["Web Application", "Mobile App", "Desktop App", "CLI Tool", "Library/Package", "Machine Learning", "Other"]
-        details['type'] = Prompt.ask("🔧 Project Type", choices=project_types, default="Other")
+        details['type'] = Prompt.ask("🔧 Project Type", choices=PROJECT_TYPES, default=DEFAULT_ANSWERS['type'])
         
         # Technology stack preferences
-        details['primary_language'] = Prompt.ask("💻 Primary Programming Language", default="Python")
-        details['frameworks'] = Prompt.ask("🔬 Preferred Frameworks/Libraries", default="")
+        details['primary_language'] = Prompt.ask("💻 Primary Programming Language", default=DEFAULT_ANSWERS['primary_language'])
+        
+        # Everything the strategy needs is known; request it while the remaining questions are answered
+        self.start_strategy(details)
+        
+        details['description'] = Prompt.ask("📝 Project Description", default=DEFAULT_ANSWERS['description'])
+        details['frameworks'] = Prompt.ask("🔬 Preferred Frameworks/Libraries", default=DEFAULT_ANSWERS['frameworks'])
         
         return details
 
+    def _details_from_answers(self, answers: Dict[str, Any]) -> dict:
+        """Build project details from pre-filled answers and start the strategy request."""
+        details = dict(DEFAULT_ANSWERS)
+        details.update({key: value for key, value in answers.items() if value is not None})
+        if details['type'] not in PROJECT_TYPES:
+            raise ValueError(f"Unknown project type '{details['type']}', expected one of {PROJECT_TYPES}")
+        
+        self.start_strategy(details)
+        return details
+
     def _generate_development_strategy(self, project_details: dict) -> dict:
-        """Use Claude to generate a tailored development strategy."""
+        """Wait for the tailored development strategy and parse it."""
         try:
-            response = self.anthropic_client.messages.create(
-                model="claude-3-opus-20240229",
-                max_tokens=1000,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": f"""
-                        Help create a comprehensive development strategy for a new software project with these characteristics:
-                        
-                        Project Name: {project_details['name']}
-                        Project Type: {project_details['type']}
-                        Primary Language: {project_details['primary_language']}
-                        Domain: {project_details['domain']}
-
-                        Please provide:
-                        1. Phased development roadmap
-                        2. Key milestones
-                        3. Potential technical challenges
-                        4. Recommended best practices
-                        5. Initial architectural considerations
-                        """
-                    }
-                ]
-            )
-            
-            strategy_text = response.content[0].text
+            future = self._strategy_future or self.start_strategy(project_details)
+            strategy_text = future.result()
             
             # Parse strategy into structured format
-            return {
-                "roadmap": self._extract_roadmap(strategy_text),
-                "milestones": self._extract_milestones(strategy_text),
-                "challenges": self._extract_challenges(strategy_text),
-                "best_practices": self._extract_best_practices(strategy_text)
-            }
+            if self.structured:
+                return parse_structured_strategy(strategy_text)
+            return parse_strategy(strategy_text)
         
+        except CancelledError:
+            self.console.print("[yellow]Strategy generation cancelled[/yellow]")
+            return {}
         except Exception as e:
             self.console.print(f"[red]Error generating strategy: {e}[/red]")
             return {}
+        finally:
+            self._strategy_future = None
 
     def _create_project_blueprint(self, project_details: dict, strategy: dict):
         """Create a comprehensive project blueprint YAML file."""
@@ -99,6 +213,7 @@ class ProjectOnboarding:
             yaml.dump(blueprint, f, default_flow_style=False)
         
         self.console.print(f"[green]📋 Project blueprint created at {self.onboarding_file}[/green]")
+        return blueprint
 
     def _provide_development_standards(self):
         """Offer guidance on development standards and best practices."""
@@ -117,39 +232,89 @@ class ProjectOnboarding:
         for standard in standards:
             self.console.print(standard)
 
-    def _extract_roadmap(self, strategy_text: str) -> list:
-        """Extract development roadmap from strategy text."""
-        roadmap_lines = [line.strip() for line in strategy_text.split('\n') if 'Phase' in line or 'Stage' in line]
-        return roadmap_lines[:5]  # Limit to first 5 phases
-
-    def _extract_milestones(self, strategy_text: str) -> list:
-        """Extract key milestones from strategy text."""
-        milestone_keywords = ['milestone', 'key deliverable', 'major goal']
-        milestones = []
-        for line in strategy_text.split('\n'):
-            if any(keyword in line.lower() for keyword in milestone_keywords):
-                milestones.append(line.strip())
-        return milestones[:5]  # Limit to first 5 milestones
-
-    def _extract_challenges(self, strategy_text: str) -> list:
-        """Extract potential technical challenges."""
-        challenge_keywords = ['challenge', 'potential issue', 'complexity']
-        challenges = []
-        for line in strategy_text.split('\n'):
-            if any(keyword in line.lower() for keyword in challenge_keywords):
-                challenges.append(line.strip())
-        return challenges[:5]  # Limit to first 5 challenges
-
-    def _extract_best_practices(self, strategy_text: str) -> list:
-        """Extract recommended best practices."""
-        practice_keywords = ['best practice', 'recommendation', 'should']
-        practices = []
-        for line in strategy_text.split('\n'):
-            if any(keyword in line.lower() for keyword in practice_keywords):
-                practices.append(line.strip())
-        return practices[:5]  # Limit to first 5 practices
-
-def start_project_onboarding(project_path: str):
+def parse_strategy(strategy_text: str, limit: int = STRATEGY_SECTION_LIMIT) -> Dict[str, List[str]]:
+    """
+    Classify the lines of a free-text strategy into sections in a single pass.
+
+    A line belongs to every section whose keywords it contains.
+
+    :param strategy_text: Strategy text returned by the model
+    :param limit: Maximum number of lines kept per section
+    :return: Lines keyed by section name
+    """
+    sections = {section: [] for section in STRATEGY_SECTIONS}
+    remaining = len(sections)
+    line_start, line_sections = -1, set()
+    
+    # Scan the whole text once and only materialize lines containing a keyword
+    for match in _STRATEGY_PATTERN.finditer(strategy_text.translate(_ASCII_LOWER)):
+        section = _KEYWORD_SECTIONS[match.group()]
+        if (section in CASE_SENSITIVE_SECTIONS
+                and strategy_text[match.start():match.end()] not in STRATEGY_SECTIONS[section]):
+            continue
+        start = strategy_text.rfind('\n', 0, match.start()) + 1
+        if start != line_start:
+            line_start, line_sections = start, set()
+        lines = sections[section]
+        if section in line_sections or len(lines) >= limit:
+            continue
+        
+        line_sections.add(section)
+        end = strategy_text.find('\n', match.end())
+        lines.append(strategy_text[start:end if end != -1 else len(strategy_text)].strip())
+        if len(lines) == limit:
+            remaining -= 1
+            if not remaining:
+                break
+    return sections
+
+def parse_structured_strategy(strategy_text: str, limit: int = STRATEGY_SECTION_LIMIT) -> Dict[str, List[str]]:
+    """
+    Parse a JSON strategy, falling back to line classification for free text.
+
+    :param strategy_text: Strategy text returned by the model
+    :param limit: Maximum number of entries kept per section
+    :return: Entries keyed by section name
+    """
+    start, end = strategy_text.find('{'), strategy_text.rfind('}')
+    try:
+        data = json.loads(strategy_text[start:end + 1]) if start != -1 else None
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        return parse_strategy(strategy_text, limit)
+    
+    return {
+        section: [str(entry).strip() for entry in (data.get(section) or [])][:limit]
+        for section in STRATEGY_SECTIONS
+    }
+
+def start_project_onboarding(project_path: str, answers_file: Optional[str] = None):
     """CLI-friendly function to start project onboarding."""
     onboarding = ProjectOnboarding(project_path)
-    onboarding.start_onboarding()
+    answers = ProjectOnboarding.load_answers(answers_file) if answers_file else None
+    onboarding.start_onboarding(answers)
+
+def onboard_projects(projects: Dict[str, Dict[str, Any]], max_workers: int = 4,
+                     ai_client: Optional[AIClient] = None) -> List[Dict[str, Any]]:
+    """
+    Onboard several projects non-interactively in parallel.
+
+    Strategy requests share the AI client, whose concurrency limit bounds the
+    number of requests in flight. A failing project does not affect the others.
+
+    :param projects: Answers keyed by project path
+    :param max_workers: Number of projects onboarded at the same time
+    :param ai_client: Client used for the strategy requests (defaults to the shared client)
+    :return: One result per project with project_path, blueprint and error
+    """
+    def onboard(project_path: str, answers: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            onboarding = ProjectOnboarding(project_path, ai_client=ai_client, quiet=True)
+            return {'project_path': project_path, 'blueprint': onboarding.start_onboarding(answers), 'error': None}
+        except Exception as e:
+            return {'project_path': project_path, 'blueprint': None, 'error': str(e)}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(onboard, path, answers) for path, answers in projects.items()]
+        return [future.result() for future in futures]
@@ -0,0 +1,262 @@
+import io
+import json
+import time
+import cProfile
+import pstats
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional
+from rich.console import Console
+from rich.table import Table
+
+# Number of functions listed from cProfile output
+TOP_FUNCTIONS = 15
+
+# Profiler receiving spans and counters; None keeps every hook a no-op
+_active: Optional['Profiler'] = None
+
+
+class _NullSpan:
+    """Span returned while profiling is disabled."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Times one phase and records it on exit."""
+    __slots__ = ('profiler', 'phase', 'start')
+
+    def __init__(self, profiler: 'Profiler', phase: str):
+        self.profiler = profiler
+        self.phase = phase
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.phase, time.perf_counter() - self.start)
+        return False
+
+
+def span(phase: str):
+    """
+    Time a phase of work when profiling is enabled.
+
+    Phases used by the instrumented modules are 'git', 'file_scan', 'parse',
+    'http', 'subprocess', 'yaml' and 'ai'. While profiling is disabled this
+    returns a shared no-op context manager.
+
+    :param phase: Phase name
+    :return: Context manager timing the enclosed block
+    """
+    profiler = _active
+    if profiler is None:
+        return _NULL_SPAN
+    return _Span(profiler, phase)
+
+
+def count(counter: str, amount: int = 1):
+    """
+    Increment a counter when profiling is enabled.
+
+    :param counter: Counter name (e.g. 'files_parsed', 'http_requests', 'cache_hits')
+    :param amount: Amount to add
+    """
+    profiler = _active
+    if profiler is not None:
+        profiler.increment(counter, amount)
+
+
+class Profiler:
+    """
+    Collects per-phase timings, counters and optionally cProfile statistics.
+
+    Spans from every thread are aggregated into the same profiler.
+    """
+    def __init__(self, cprofile: bool = False):
+        """
+        Initialize the profiler.
+
+        :param cprofile: Whether to also collect function-level statistics with cProfile
+        """
+        self.phases: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, int] = {}
+        self.wall_time = 0.0
+        self._lock = threading.Lock()
+        self._cprofile = cProfile.Profile() if cprofile else None
+        self._started: Optional[float] = None
+
+    def record(self, phase: str, seconds: float):
+        """
+        Record one timed occurrence of a phase.
+
+        :param phase: Phase name
+        :param seconds: Duration in seconds
+        """
+        with self._lock:
+            stats = self.phases.get(phase)
+            if stats is None:
+                stats = self.phases[phase] = {'calls': 0, 'seconds': 0.0}
+            stats['calls'] += 1
+            stats['seconds'] += seconds
+
+    def increment(self, counter: str, amount: int = 1):
+        """
+        Increment a counter.
+
+        :param counter: Counter name
+        :param amount: Amount to add
+        """
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def start(self):
+        """Start collecting."""
+        self._started = time.perf_counter()
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    def stop(self):
+        """Stop collecting."""
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self._started is not None:
+            self.wall_time += time.perf_counter() - self._started
+            self._started = None
+
+    def dump_stats(self, path: str):
+        """
+        Write cProfile statistics in pstats format (e.g. for snakeviz).
+
+        :param path: Output file path
+        """
+        if self._cprofile is None:
+            raise ValueError("cProfile collection was not enabled")
+        self._cprofile.dump_stats(path)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Summarize the collected data.
+
+        :return: Wall time, phases sorted by total time, counters and top functions
+        """
+        with self._lock:
+            phases = {
+                name: {'calls': stats['calls'], 'seconds': round(stats['seconds'], 6)}
+                for name, stats in sorted(self.phases.items(), key=lambda item: -item[1]['seconds'])
+            }
+            counters = dict(sorted(self.counters.items()))
+
+        report = {'wall_time': round(self.wall_time, 6), 'phases': phases, 'counters': counters}
+        if self._cprofile is not None:
+            report['functions'] = self._top_functions()
+        return report
+
+    def to_json(self) -> str:
+        """Render the report as JSON."""
+        return json.dumps(self.report(), indent=2)
+
+    def print_report(self, console: Optional[Console] = None):
+        """
+        Render the report as rich tables.
+
+        :param console: Console to print to (defaults to stderr)
+        """
+        console = console or Console(stderr=True)
+        report = self.report()
+
+        phases = Table(title=f"Profile ({report['wall_time'] * 1000:.1f} ms wall time)")
+        phases.add_column("Phase")
+        phases.add_column("Calls", justify="right")
+        phases.add_column("Total (ms)", justify="right")
+        phases.add_column("Share", justify="right")
+        for name, stats in report['phases'].items():
+            share = stats['seconds'] / report['wall_time'] if report['wall_time'] else 0
+            phases.add_row(name, str(stats['calls']), f"{stats['seconds'] * 1000:.1f}", f"{share:.0%}")
+        console.print(phases)
+
+        if report['counters']:
+            counters = Table(title="Counters")
+            counters.add_column("Counter")
+            counters.add_column("Value", justify="right")
+            for name, value in report['counters'].items():
+                counters.add_row(name, str(value))
+            console.print(counters)
+
+        if report.get('functions'):
+            functions = Table(title="Top functions (cumulative)")
+            functions.add_column("Function")
+            functions.add_column("Calls", justify="right")
+            functions.add_column("Cumulative (ms)", justify="right")
+            for entry in report['functions']:
+                functions.add_row(entry['function'], str(entry['calls']), f"{entry['cumulative'] * 1000:.1f}")
+            console.print(functions)
+
+    def _top_functions(self):
+        """Functions with the highest cumulative time from cProfile."""
+        stats = pstats.Stats(self._cprofile, stream=io.StringIO())
+        rows = []
+        for (filename, line, name), (_, calls, _, cumulative, _) in stats.stats.items():
+            rows.append({'function': f"{name} ({filename}:{line})", 'calls': calls,
+                         'cumulative': round(cumulative, 6)})
+        rows.sort(key=lambda row: -row['cumulative'])
+        return rows[:TOP_FUNCTIONS]
+
+
+def start_profiling(cprofile: bool = False) -> Profiler:
+    """
+    Enable profiling process-wide.
+
+    :param cprofile: Whether to also collect cProfile statistics
+    :return: The active profiler
+    """
+    global _active
+    profiler = Profiler(cprofile=cprofile)
+    profiler.start()
+    _active = profiler
+    return profiler
+
+
+def stop_profiling(profiler: Profiler):
+    """
+    Disable profiling enabled by start_profiling.
+
+    :param profiler: Profiler returned by start_profiling
+    """
+    global _active
+    profiler.stop()
+    if _active is profiler:
+        _active = None
+
+
+@contextmanager
+def profile(cprofile: bool = False) -> Iterator[Profiler]:
+    """
+    Profile the enclosed block.
+
+    Example::
+
+        with profile() as profiler:
+            ContextManager('.').update_context()
+        profiler.print_report()
+
+    :param cprofile: Whether to also collect cProfile statistics
+    :return: Profiler holding the results once the block exits
+    """
+    global _active
+    previous = _active
+    profiler = start_profiling(cprofile=cprofile)
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        _active = previous
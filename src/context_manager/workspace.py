@@ -0,0 +1,266 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Callable, Dict, List, Any, Iterator, Optional, Sequence
+import yaml
+
+# Operations a workspace run can perform on every repository
+OPERATIONS = ('update_context', 'status', 'project_context', 'dependencies', 'code_analysis')
+
+DEFAULT_OPERATIONS = ('update_context', 'status')
+
+
+def _update_context(project_path: str) -> Dict[str, Any]:
+    from .core import ContextManager
+
+    manager = ContextManager(project_path)
+    manager.update_context()
+    return {'context_file': manager.context_file}
+
+
+def _status(project_path: str) -> Dict[str, Any]:
+    from .core import ContextManager
+
+    return ContextManager(project_path).get_project_status()
+
+
+def _project_context(project_path: str) -> Dict[str, Any]:
+    from .components.project_tracking.context_system import ProjectContextManager
+
+    context = ProjectContextManager(project_path).get_current_context() or {}
+    development = context.get('development', {})
+    return {
+        'current_phase': development.get('current_phase'),
+        'milestones': len(development.get('milestones') or []),
+        'completed_milestones': len(development.get('completed_milestones') or [])
+    }
+
+
+def _dependencies(project_path: str) -> Dict[str, Any]:
+    from .components.dependency_management.dependency_tracker import DependencyTracker
+
+    result = DependencyTracker(project_path).check_dependencies()
+    if 'error' in result:
+        raise RuntimeError(result['error'])
+    # The full package list is the same for every repository; keep the report small
+    return {
+        'installed_packages': len(result['installed_packages']),
+        'updates_available': result['updates_available']
+    }
+
+
+def _code_analysis(project_path: str) -> Dict[str, Any]:
+    from .components.code_analysis.code_generator import CodeGenerator
+
+    files = CodeGenerator(project_path).analyze_project_structure()['python_files']
+    return {
+        'python_files': len(files),
+        'classes': sum(len(f['classes']) for f in files),
+        'functions': sum(len(f['functions']) for f in files)
+    }
+
+
+_OPERATION_FUNCTIONS: Dict[str, Callable[[str], Dict[str, Any]]] = {
+    'update_context': _update_context,
+    'status': _status,
+    'project_context': _project_context,
+    'dependencies': _dependencies,
+    'code_analysis': _code_analysis,
+}
+
+
+def process_repository(project_path: str, operations: Sequence[str]) -> Dict[str, Any]:
+    """
+    Run operations on one repository, isolating failures per operation.
+
+    Runs inside a worker process, so it only takes and returns plain data.
+
+    :param project_path: Path to the repository
+    :param operations: Names of operations to run
+    :return: Result with path, per-operation results and errors, and duration
+    """
+    started = time.perf_counter()
+    results, errors = {}, {}
+    for operation in operations:
+        try:
+            results[operation] = _OPERATION_FUNCTIONS[operation](project_path)
+        except Exception as e:
+            errors[operation] = f"{type(e).__name__}: {e}"
+
+    return {
+        'path': project_path,
+        'ok': not errors,
+        'results': results,
+        'errors': errors,
+        'duration': round(time.perf_counter() - started, 3)
+    }
+
+
+class Workspace:
+    """
+    A set of repositories processed together.
+
+    Repositories come from a manifest or from scanning a root directory for
+    git checkouts. Runs fan out over a process pool with a bounded number of
+    repositories in flight; a failure in one repository, or a crashed worker,
+    only affects that repository's result.
+    """
+    def __init__(self, repositories: List[str], max_workers: Optional[int] = None):
+        """
+        Initialize the workspace.
+
+        :param repositories: Paths of the repositories
+        :param max_workers: Maximum number of repositories processed concurrently
+        """
+        self.repositories = [os.path.abspath(path) for path in repositories]
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    @classmethod
+    def from_root(cls, root: str, max_depth: int = 2, **kwargs) -> 'Workspace':
+        """
+        Discover git checkouts below a root directory.
+
+        :param root: Directory containing the repositories
+        :param max_depth: How many directory levels below root to search
+        :return: Workspace of the repositories found, sorted by path
+        """
+        root = os.path.abspath(root)
+        base_depth = root.rstrip(os.sep).count(os.sep)
+        repositories = []
+        for current, dirs, _ in os.walk(root):
+            if '.git' in dirs or os.path.isfile(os.path.join(current, '.git')):
+                repositories.append(current)
+                # Nested checkouts are treated as part of their parent
+                dirs[:] = []
+                continue
+            if current.count(os.sep) - base_depth >= max_depth:
+                dirs[:] = []
+            dirs[:] = [name for name in dirs if not name.startswith('.')]
+        return cls(sorted(repositories), **kwargs)
+
+    @classmethod
+    def from_manifest(cls, manifest_path: str, **kwargs) -> 'Workspace':
+        """
+        Load repositories from a YAML or JSON manifest.
+
+        The manifest is either a list of paths or a mapping with a
+        'repositories' list; relative paths resolve against the manifest's directory.
+
+        :param manifest_path: Path to the manifest
+        :return: Workspace of the listed repositories
+        """
+        with open(manifest_path, 'r') as f:
+            manifest = yaml.safe_load(f) or []
+        if isinstance(manifest, dict):
+            manifest = manifest.get('repositories', [])
+        if not isinstance(manifest, list):
+            raise ValueError(f"Manifest {manifest_path} must list repositories")
+
+        base = os.path.dirname(os.path.abspath(manifest_path))
+        entries = [entry['path'] if isinstance(entry, dict) else entry for entry in manifest]
+        return cls([os.path.join(base, os.path.expanduser(str(entry))) for entry in entries], **kwargs)
+
+    def iter_run(self, operations: Sequence[str] = DEFAULT_OPERATIONS) -> Iterator[Dict[str, Any]]:
+        """
+        Run operations on every repository, yielding results as they complete.
+
+        :param operations: Names of operations to run (see OPERATIONS)
+        :return: Iterator of per-repository results
+        """
+        unknown = [operation for operation in operations if operation not in OPERATIONS]
+        if unknown:
+            raise ValueError(f"Unknown operations {unknown}, expected some of {list(OPERATIONS)}")
+
+        queued = iter(self.repositories)
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            pending: Dict[Any, str] = {}
+            exhausted = False
+
+            # Keep a bounded window of repositories in flight
+            while pending or not exhausted:
+                while not exhausted and len(pending) < 2 * self.max_workers:
+                    path = next(queued, None)
+                    if path is None:
+                        exhausted = True
+                        break
+                    pending[executor.submit(process_repository, path, list(operations))] = path
+
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    try:
+                        yield future.result()
+                    except BrokenProcessPool:
+                        # A crashed worker takes the pool down; report what is left instead of aborting
+                        yield self._failed(path, 'worker process terminated abruptly')
+                        for remaining in list(pending.values()) + list(queued):
+                            yield self._failed(remaining, 'worker process terminated abruptly')
+                        return
+                    except Exception as e:
+                        yield self._failed(path, f"{type(e).__name__}: {e}")
+
+    def run(self, operations: Sequence[str] = DEFAULT_OPERATIONS,
+            progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Run operations on every repository and aggregate the results.
+
+        :param operations: Names of operations to run (see OPERATIONS)
+        :param progress: Optional callback receiving each repository result as it completes
+        :return: Aggregated report
+        """
+        started = time.perf_counter()
+        repositories = []
+        for result in self.iter_run(operations):
+            repositories.append(result)
+            if progress:
+                progress(result)
+
+        repositories.sort(key=lambda result: result['path'])
+        return {
+            'generated_at': datetime.now().isoformat(),
+            'operations': list(operations),
+            'duration': round(time.perf_counter() - started, 3),
+            'summary': self.summarize(repositories),
+            'repositories': repositories
+        }
+
+    @staticmethod
+    def summarize(repositories: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Aggregate totals across repository results.
+
+        :param repositories: Per-repository results from iter_run
+        :return: Counts of repositories and totals of the collected metrics
+        """
+        summary = {
+            'repositories': len(repositories),
+            'succeeded': sum(1 for result in repositories if result['ok']),
+            'failed': sum(1 for result in repositories if not result['ok']),
+            'failures': {result['path']: result['errors'] for result in repositories if not result['ok']}
+        }
+
+        totals: Dict[str, int] = {}
+        for result in repositories:
+            results = result['results']
+            if 'status' in results:
+                totals['commits'] = totals.get('commits', 0) + results['status'].get('Total Commits', 0)
+            if 'code_analysis' in results:
+                for key, value in results['code_analysis'].items():
+                    totals[key] = totals.get(key, 0) + value
+            if 'project_context' in results:
+                for key in ('milestones', 'completed_milestones'):
+                    totals[key] = totals.get(key, 0) + results['project_context'][key]
+            if 'dependencies' in results:
+                outdated = totals.setdefault('outdated_packages', 0)
+                totals['outdated_packages'] = outdated + len(results['dependencies']['updates_available'])
+        summary['totals'] = totals
+        return summary
+
+    @staticmethod
+    def _failed(path: str, error: str) -> Dict[str, Any]:
+        """Result for a repository whose worker did not return."""
+        return {'path': path, 'ok': False, 'results': {}, 'errors': {'worker': error}, 'duration': None}
@@ -0,0 +1,235 @@
+import os
+import json
+import pytest
+from datetime import datetime
+from context_manager.components.ai_insights.ai_client import AIClient, FakeAIBackend, RateLimitExceeded
+from context_manager.components.ai_insights.context_packer import ContextPacker
+from context_manager.components.ai_insights.insight_generator import AIInsightGenerator
+from context_manager.components.ai_insights.local_insights import LocalInsightEngine
+from context_manager.components.ai_insights.response_cache import ResponseCache
+from context_manager.components.code_analysis.code_retrieval import CodeRetrievalIndex
+
+def test_pack_serializes_compactly():
+    """
+    Test that small contexts are packed as compact JSON without indentation.
+    """
+    packer = ContextPacker(max_tokens=100)
+    packed = packer.pack({'name': 'demo', 'phase': 'development'})
+    
+    assert packed == '{"name":"demo","phase":"development"}'
+
+def test_pack_fits_budget_and_keeps_recent_items():
+    """
+    Test that large contexts are reduced to the budget, newest items first.
+    """
+    packer = ContextPacker(max_tokens=200)
+    history = [
+        {'timestamp': f'2024-01-{day:02d}', 'summary': 'x' * 400}
+        for day in range(1, 29)
+    ]
+    packed = packer.pack({'history': history})
+    
+    assert packer.estimate_tokens(packed) <= 200
+    data = json.loads(packed)
+    assert data['history'][0]['timestamp'] == '2024-01-28'
+    assert data['history'][-1].endswith('omitted')
+
+def test_pack_drops_fields_instead_of_cutting_json():
+    """
+    Test that context too large for any detail level still packs as valid JSON.
+    """
+    packer = ContextPacker(max_tokens=20)
+    data = {'name': 'demo', **{f'field_{i}': 'value' for i in range(40)}}
+    packed = packer.pack(data)
+    
+    assert packer.estimate_tokens(packed) <= 20
+    decoded = json.loads(packed)
+    assert decoded['name'] == 'demo'
+    assert len(decoded) < len(data)
+
+def test_pack_prompt_accounts_for_instructions():
+    """
+    Test that the instructions are included in the prompt budget.
+    """
+    packer = ContextPacker(max_tokens=50)
+    prompt = packer.pack_prompt('Summarize: {context}', {'items': list(range(500))})
+    
+    assert prompt.startswith('Summarize: ')
+    # Allow one token of rounding between the two estimates
+    assert packer.estimate_tokens(prompt) <= 51
+
+def test_response_cache_hit_and_miss(tmp_path):
+    """
+    Test that identical requests are served from the on-disk cache.
+    """
+    backend = FakeAIBackend(default_response="- Add integration tests")
+    generator = AIInsightGenerator(client=AIClient(backend=backend), project_path=str(tmp_path))
+    
+    first = generator.generate_strategic_recommendations({'name': 'demo'})
+    second = generator.generate_strategic_recommendations({'name': 'demo'})
+    generator.generate_strategic_recommendations({'name': 'changed'})
+    
+    assert first['strategic_recommendations'] == ['- Add integration tests']
+    assert second['raw_response'] == first['raw_response']
+    assert len(backend.prompts) == 2
+    assert generator.cache.stats == {'hits': 1, 'misses': 2}
+    assert os.path.isdir(os.path.join(str(tmp_path), '.context', 'ai_cache'))
+
+def test_response_cache_bypass(tmp_path):
+    """
+    Test that disabling the cache always calls the model.
+    """
+    backend = FakeAIBackend()
+    generator = AIInsightGenerator(client=AIClient(backend=backend), project_path=str(tmp_path), use_cache=False)
+    
+    generator.generate_strategic_recommendations({'name': 'demo'})
+    generator.generate_strategic_recommendations({'name': 'demo'})
+    
+    assert len(backend.prompts) == 2
+
+def test_response_cache_ttl_and_eviction(tmp_path):
+    """
+    Test expiry of stale entries and size-bounded LRU eviction.
+    """
+    cache = ResponseCache(str(tmp_path), ttl_seconds=0)
+    cache.put('a' * 64, 'stale')
+    assert cache.get('a' * 64) is None
+    
+    cache = ResponseCache(str(tmp_path), max_bytes=300)
+    for key in ('b', 'c', 'd'):
+        cache.put(key * 64, 'x' * 100)
+    
+    assert cache.get('b' * 64) is None
+    assert cache.get('d' * 64) == 'x' * 100
+
+def test_generate_insights_runs_concurrently(tmp_path):
+    """
+    Test that strategic and trajectory analyses are requested in parallel.
+    """
+    backend = FakeAIBackend(
+        responses={'strategic insights': '- Strategy', 'development history': '- Trajectory'},
+        latency=0.2
+    )
+    generator = AIInsightGenerator(client=AIClient(backend=backend), project_path=str(tmp_path))
+    
+    result = generator.generate_insights({'name': 'demo'}, [{'period': '2024-01', 'commits': 3}])
+    
+    assert result['strategic']['strategic_recommendations'] == ['- Strategy']
+    assert result['trajectory']['trajectory_insights'] == ['- Trajectory']
+    assert backend.max_in_flight == 2
+
+def test_client_retries_rate_limited_requests():
+    """
+    Test that rate-limited requests are retried with backoff.
+    """
+    backend = FakeAIBackend(rate_limit_failures=2)
+    client = AIClient(backend=backend, base_delay=0)
+    
+    assert client.complete_sync('hello') == '- Example insight'
+    assert len(backend.prompts) == 3
+    
+    exhausted = AIClient(backend=FakeAIBackend(rate_limit_failures=5), max_retries=1, base_delay=0)
+    with pytest.raises(RateLimitExceeded):
+        exhausted.complete_sync('hello')
+
+def test_client_bounds_concurrency():
+    """
+    Test that fan-out never exceeds the configured concurrency limit.
+    """
+    backend = FakeAIBackend(latency=0.05)
+    client = AIClient(backend=backend, max_concurrency=3)
+    
+    responses = client.run(client.complete_many([f'prompt {i}' for i in range(10)]))
+    
+    assert len(responses) == 10
+    assert backend.max_in_flight == 3
+
+def test_stream_strategic_recommendations(tmp_path):
+    """
+    Test that streamed text parses into the same insights as the full response.
+    """
+    response = "Overview\n- Add tests\n- Split modules\nClosing remarks"
+    backend = FakeAIBackend(default_response=response, chunk_size=5)
+    generator = AIInsightGenerator(client=AIClient(backend=backend), project_path=str(tmp_path))
+    
+    chunks = list(generator.stream_strategic_recommendations({'name': 'demo'}))
+    
+    assert len(chunks) > 1
+    assert ''.join(chunks) == response
+    assert list(generator.iter_insights(chunks)) == ['- Add tests', '- Split modules']
+    
+    # The streamed response is cached for the next run
+    assert list(generator.stream_strategic_recommendations({'name': 'demo'})) == [response]
+    assert len(backend.prompts) == 1
+
+def test_local_engine_flags_stalled_milestones(tmp_path):
+    """
+    Test that the local engine finds stalled milestones without any API access.
+    """
+    with open(os.path.join(str(tmp_path), 'MILESTONES.yaml'), 'w') as f:
+        f.write("milestones:\n- name: Beta\n  created_at: '2024-01-01T00:00:00'\n  status: in_progress\n"
+                "completed_milestones: []\n")
+    engine = LocalInsightEngine(str(tmp_path), now=datetime(2024, 4, 1))
+    
+    findings = engine.analyze()
+    
+    assert [finding['rule'] for finding in findings] == ['stalled_milestone']
+    assert findings[0]['severity'] == 'high'
+
+def test_generator_falls_back_to_local_insights(tmp_path, monkeypatch):
+    """
+    Test that recommendations come from local heuristics when no API key is set.
+    """
+    monkeypatch.delenv('ANTHROPIC_API_KEY', raising=False)
+    engine = LocalInsightEngine(str(tmp_path))
+    generator = AIInsightGenerator(project_path=str(tmp_path), local_engine=engine)
+    
+    result = generator.generate_strategic_recommendations({'name': 'demo'})
+    trajectory = generator.analyze_development_trajectory(
+        [{'period': f'2024-01-{day:02d}', 'commits': commits} for day, commits in enumerate([9, 8, 9, 1, 0, 1], 1)]
+    )
+    
+    assert result['source'] == 'local'
+    assert 'error' not in result
+    assert 'slowing down' in trajectory['trajectory_insights'][0]
+
+def test_prompts_include_relevant_code(tmp_path):
+    """
+    Test that prompts carry the retrieved code most related to the context, within budget.
+    """
+    (tmp_path / 'payments.py').write_text('def refund_payment(payment):\n    payment.status = "refunded"\n')
+    (tmp_path / 'reports.py').write_text('def render_report(rows):\n    return "\\n".join(rows)\n')
+    backend = FakeAIBackend()
+    generator = AIInsightGenerator(client=AIClient(backend=backend), project_path=str(tmp_path), use_cache=False)
+    
+    generator.generate_strategic_recommendations({'name': 'demo', 'open_issue': 'refund payment fails'})
+    
+    prompt = backend.prompts[0]
+    assert 'Relevant code:' in prompt
+    assert '# payments.py:1-2 (refund_payment)' in prompt
+    assert 'render_report' not in prompt
+    
+    packer = ContextPacker(max_tokens=100)
+    chunks = [{'path': 'a.py', 'start': 1, 'end': 2, 'name': 'big', 'code': 'x' * 1000},
+              {'path': 'b.py', 'start': 1, 'end': 1, 'name': 'small', 'code': 'pass'}]
+    prompt = packer.pack_prompt('Context: {context}{code}', {'items': list(range(100))}, code_chunks=chunks)
+    assert '(small)' in prompt and '(big)' not in prompt
+    assert packer.estimate_tokens(prompt) <= 102
+    assert packer.pack_prompt('Context: {context}{code}', {'a': 1}) == 'Context: {"a":1}'
+
+
+def test_prompts_skip_code_when_retrieval_fails(tmp_path):
+    """
+    Test that a broken retrieval index only drops the code section from prompts.
+    """
+    (tmp_path / 'payments.py').write_text('def refund_payment(payment):\n    pass\n')
+    backend = FakeAIBackend()
+    # A directory cannot be opened as the SQLite database
+    retriever = CodeRetrievalIndex(str(tmp_path), db_path=str(tmp_path))
+    generator = AIInsightGenerator(client=AIClient(backend=backend), project_path=str(tmp_path),
+                                   use_cache=False, retriever=retriever)
+    
+    result = generator.generate_strategic_recommendations({'name': 'demo', 'open_issue': 'refund payment'})
+    
+    assert 'error' not in result
+    assert 'Relevant code:' not in backend.prompts[0]
@@ -0,0 +1,265 @@
+import os
+import json
+from typer.testing import CliRunner
+from context_manager.cli import app
+from context_manager.components.code_analysis.code_generator import CodeGenerator
+from context_manager.components.code_analysis.code_index import CodeSearchIndex, required_literals
+from context_manager.components.code_analysis.clone_detector import NEAR_CLONE_SIMILARITY, CloneDetector, token_fingerprints
+from context_manager.components.code_analysis.code_retrieval import CodeRetrievalIndex, chunk_source, diff_query, tokenize
+from context_manager.components.code_analysis.index_format import IndexFormatError, IndexReader, open_index, write_index
+from context_manager.components.code_analysis.structure import ProjectStructure, StringTable
+
+def test_project_structure_keeps_dict_interface(tmp_path):
+    """
+    Test that the columnar analysis result reads like the former list of dicts.
+    """
+    (tmp_path / 'models.py').write_text('class User:\n    def save(self):\n        pass\n\nclass Team:\n    pass\n')
+    (tmp_path / 'broken.py').write_text('def (:\n')
+    
+    structure = CodeGenerator(str(tmp_path)).analyze_project_structure()
+    files = structure['python_files']
+    
+    assert len(files) == 1
+    assert files[0]['path'] == 'models.py'
+    assert files[0]['classes'] == ['User', 'Team']
+    assert len(files[-1]['functions']) == 1
+    assert dict(files[0]) == {'path': 'models.py', 'classes': ['User', 'Team'], 'functions': ['save']}
+    assert structure['modules'] == [] and set(structure) == {'python_files', 'modules', 'packages'}
+    assert json.loads(json.dumps(structure.to_dict()))['python_files'][0]['functions'] == ['save']
+
+def test_symbols_are_interned_across_files():
+    """
+    Test that repeated symbol names are stored once and stay readable after freezing.
+    """
+    structure = ProjectStructure()
+    structure.add_file('a.py', ['Base'], ['__init__', 'run'])
+    structure.add_file('b.py', ['Base'], ['__init__'])
+    structure.freeze()
+    
+    assert structure.symbol_count == 3
+    assert [list(f['functions']) for f in structure['python_files']] == [['__init__', 'run'], ['__init__']]
+    
+    structure.add_file('c.py', [], ['run', 'stop'])
+    assert structure.symbol_count == 4
+    assert structure['python_files'][2]['functions'] == ['run', 'stop']
+
+def test_string_table_packs_on_freeze():
+    """
+    Test that a frozen table answers lookups from its packed form.
+    """
+    table = StringTable(intern=False)
+    ids = [table.add(value) for value in ('alpha', '', 'beta', 'alpha')]
+    table.freeze()
+    
+    assert ids == [0, 1, 2, 3]
+    assert [table[i] for i in ids] == ['alpha', '', 'beta', 'alpha']
+
+def test_code_search_substring_regex_and_symbols(tmp_path):
+    """
+    Test substring, regex and symbol queries against the trigram index.
+    """
+    (tmp_path / 'app.py').write_text('class Server:\n    def handle_request(self):\n        return "OK"\n')
+    (tmp_path / 'README.md').write_text('# Demo\nCall handle_request to serve.\n')
+    generator = CodeGenerator(str(tmp_path))
+    
+    assert [(m['path'], m['line']) for m in generator.search_code('handle_request')] == [('README.md', 2), ('app.py', 2)]
+    assert generator.search_code('HANDLE_REQUEST') == []
+    assert len(generator.search_code('HANDLE_REQUEST', ignore_case=True)) == 2
+    assert [m['path'] for m in generator.search_code(r'def \w+_request', regex=True)] == ['app.py']
+    assert generator.find_symbol('Server') == [{'name': 'Server', 'kind': 'class', 'path': 'app.py', 'line': 1}]
+    assert required_literals(r'def \w+_request') == ['def ', '_request']
+
+def test_cli_reports_invalid_regex(tmp_path):
+    """
+    Test that an invalid regular expression is a usage error rather than a traceback.
+    """
+    (tmp_path / 'app.py').write_text('print("hi")\n')
+    result = CliRunner().invoke(app, ['code', 'search', '(', '--regex', '--project-path', str(tmp_path)])
+    
+    assert result.exit_code == 1
+    assert isinstance(result.exception, SystemExit)
+    assert 'Invalid regular expression' in result.output
+
+def test_code_index_updates_incrementally(tmp_path):
+    """
+    Test that only changed files are re-indexed and removed files disappear.
+    """
+    (tmp_path / 'a.py').write_text('def alpha():\n    pass\n')
+    (tmp_path / 'b.py').write_text('def beta():\n    pass\n')
+    index = CodeSearchIndex(str(tmp_path))
+    assert index.update() == {'added': 2, 'updated': 0, 'removed': 0, 'unchanged': 0}
+    
+    (tmp_path / 'a.py').write_text('def gamma():\n    return 1\n')
+    os.remove(tmp_path / 'b.py')
+    reloaded = CodeSearchIndex(str(tmp_path))
+    
+    assert reloaded.update() == {'added': 0, 'updated': 1, 'removed': 1, 'unchanged': 0}
+    assert reloaded.search('alpha') == [] and reloaded.search('beta') == []
+    assert reloaded.find_symbol('gamma')[0]['path'] == 'a.py'
+    assert CodeSearchIndex(str(tmp_path)).search('return 1')[0]['line'] == 2
+
+def test_index_file_round_trip(tmp_path):
+    """
+    Test that the binary index reads back files, postings and symbols in place.
+    """
+    path = str(tmp_path / 'index.bin')
+    files = [
+        {'path': 'a.py', 'mtime_ns': 1, 'size': 10, 'symbols': [['Alpha', 'class', 1], ['run', 'function', 3]]},
+        {'path': 'b.py', 'mtime_ns': 2, 'size': 20, 'symbols': [['run', 'function', 5]]},
+    ]
+    write_index(path, files, {'run': {0, 1}, 'alp': {0}, 'ünï': {1}, 'ab\0': {0}})
+    
+    with IndexReader(path) as reader:
+        reader.verify()
+        assert list(reader.iter_files()) == [(0, 'a.py', 1, 10), (1, 'b.py', 2, 20)]
+        assert list(reader.postings('run')) == [0, 1] and list(reader.postings('zzz')) == []
+        assert list(reader.postings('ünï')) == [1]
+        assert {trigram: list(ids) for trigram, ids in reader.iter_postings()}['ab\0'] == [0]
+        assert reader.find_symbol('run') == [('run', 'function', 3, 0), ('run', 'function', 5, 1)]
+        assert reader.find_symbol('Missing') == []
+        assert reader.file_symbols(0) == [('Alpha', 'class', 1), ('run', 'function', 3)]
+
+def test_index_file_rejects_corruption(tmp_path):
+    """
+    Test that a foreign file fails to open and a flipped byte fails the checksum.
+    """
+    path = tmp_path / 'index.bin'
+    write_index(str(path), [{'path': 'a.py', 'mtime_ns': 1, 'size': 1, 'symbols': []}], {'abc': {0}})
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+    
+    with IndexReader(str(path)) as reader:
+        try:
+            reader.verify()
+            assert False, 'checksum mismatch not detected'
+        except IndexFormatError:
+            pass
+    
+    path.write_bytes(b'{"version": 1}' + bytes(64))
+    assert open_index(str(path)) is None
+
+def test_code_index_rebuilds_corrupt_index(tmp_path):
+    """
+    Test that a corrupt index file is rebuilt on update and queries keep working.
+    """
+    (tmp_path / 'a.py').write_text('def alpha():\n    pass\n')
+    index = CodeSearchIndex(str(tmp_path))
+    index.update()
+    index.close()
+    with open(index.index_file, 'r+b') as f:
+        f.seek(-1, os.SEEK_END)
+        f.write(b'\xff')
+    
+    try:
+        CodeGenerator(str(tmp_path)).search_code('pass', refresh=False)
+        assert False, 'corrupt index read without an error'
+    except IndexFormatError:
+        pass
+    
+    reloaded = CodeSearchIndex(str(tmp_path))
+    assert reloaded.update() == {'added': 1, 'updated': 0, 'removed': 0, 'unchanged': 0}
+    assert reloaded.find_symbol('alpha')[0]['path'] == 'a.py'
+    assert CodeGenerator(str(tmp_path)).search_code('pass', refresh=False)[0]['line'] == 2
+
+def test_chunk_source_splits_large_classes():
+    """
+    Test that modules are chunked per function and class, and large classes per method.
+    """
+    methods = ''.join(f"    def step_{i}(self):\n" + "        pass\n" * 20 for i in range(5))
+    source = f"import os\n\n@decorator\ndef top():\n    pass\n\nclass Small:\n    x = 1\n\nclass Large:\n    size = 2\n{methods}"
+    
+    chunks = chunk_source(source)
+    
+    assert chunks[0] == ('top', 'function', 3, 5)
+    assert chunks[1] == ('Small', 'class', 7, 8)
+    assert chunks[2] == ('Large', 'class', 10, 11)
+    assert [name for name, kind, _, _ in chunks[3:]] == [f"Large.step_{i}" for i in range(5)]
+    assert chunk_source('def (:\n') == []
+    assert tokenize('parseHTTPConfig(self)') == ['parsehttpconfig', 'parse', 'http', 'config']
+
+def test_code_retrieval_ranks_and_updates_incrementally(tmp_path):
+    """
+    Test that BM25 retrieval finds the relevant chunk and follows file changes.
+    """
+    (tmp_path / 'billing.py').write_text(
+        'def compute_invoice_total(items):\n    return sum(item.price for item in items)\n\n'
+        'def send_reminder(customer):\n    customer.notify("payment due")\n')
+    (tmp_path / 'auth.py').write_text('def check_password(user, password):\n    return user.password_hash == password\n')
+    index = CodeRetrievalIndex(str(tmp_path))
+    
+    assert index.update()['added'] == 2
+    results = index.retrieve('invoice total price', k=2)
+    assert results[0]['name'] == 'compute_invoice_total'
+    assert results[0]['code'].startswith('def compute_invoice_total')
+    assert (results[0]['start'], results[0]['end']) == (1, 2)
+    
+    (tmp_path / 'auth.py').write_text('def verify_token(token):\n    return token.expires_at > now()\n')
+    os.remove(tmp_path / 'billing.py')
+    assert index.update() == {'added': 0, 'updated': 1, 'removed': 1, 'unchanged': 0}
+    assert index.retrieve('invoice') == []
+    assert index.retrieve('token expiry')[0]['name'] == 'verify_token'
+    
+    diff = '--- a/auth.py\n+++ b/auth.py\n@@ -1 +1 @@\n-def check_password(user):\n+def verify_token(token):\n'
+    assert 'verify_token' in diff_query(diff)
+    assert 'auth.py' in diff_query(diff)
+    index.close()
+
+CLONE_SOURCE = """
+def summarize(orders):
+    total = 0
+    for order in orders:
+        if order.status == 'paid':
+            total += order.amount
+        else:
+            print('skipping', order.id)
+    return total
+"""
+
+def test_clone_detector_finds_exact_and_near_clones(tmp_path):
+    """
+    Test that renamed copies are exact clones and edited copies are near-clones.
+    """
+    renamed = CLONE_SOURCE.replace('summarize', 'add_up').replace('orders', 'rows').replace('order', 'row').replace("'paid'", "'done'")
+    edited = CLONE_SOURCE.replace('summarize', 'summarize_refunds').replace(
+        "    return total\n", "    log(total)\n    notify(total, orders)\n    return total\n")
+    (tmp_path / 'a.py').write_text(CLONE_SOURCE)
+    (tmp_path / 'b.py').write_text('import os\n' + renamed)
+    (tmp_path / 'c.py').write_text(edited)
+    (tmp_path / 'unrelated.py').write_text('def main():\n    return os.path.join("a", "b")\n')
+    
+    groups = CodeGenerator(str(tmp_path)).find_clones()['groups']
+    
+    exact = [group for group in groups if group['kind'] == 'exact']
+    assert len(exact) == 1
+    assert [(location['path'], location['start'], location['name']) for location in exact[0]['locations']] == \
+        [('a.py', 2, 'summarize'), ('b.py', 3, 'add_up')]
+    
+    near = [group for group in groups if group['kind'] == 'near']
+    assert len(near) == 1
+    assert {location['path'] for location in near[0]['locations']} >= {'c.py'}
+    assert NEAR_CLONE_SIMILARITY <= near[0]['similarity'] < 1
+    
+    suggestions = CodeGenerator(str(tmp_path)).suggest_improvements()
+    assert any(suggestion.startswith('Duplicated code (8 lines) in a.py:2-9, b.py:3-10') for suggestion in suggestions)
+
+def test_clone_fingerprints_are_cached_per_file(tmp_path):
+    """
+    Test that only changed files are fingerprinted again.
+    """
+    for name in ('a.py', 'b.py', 'c.py'):
+        (tmp_path / name).write_text(CLONE_SOURCE)
+    detector = CloneDetector(str(tmp_path))
+    
+    assert detector.find_clones()['stats'] == {'parsed': 3, 'reused': 0}
+    assert detector.find_clones()['stats'] == {'parsed': 0, 'reused': 3}
+    
+    (tmp_path / 'c.py').write_text('x = 1\n')
+    result = detector.find_clones()
+    assert result['stats'] == {'parsed': 1, 'reused': 2}
+    assert [location['path'] for location in result['groups'][0]['locations']] == ['a.py', 'b.py']
+    
+    # Winnowing is deterministic and position-independent
+    assert [value for value, _ in token_fingerprints(CLONE_SOURCE)] == \
+        [value for value, _ in token_fingerprints('\n\n' + CLONE_SOURCE)]
+
@@ -1,6 +1,8 @@
 import os
+import re
 import pytest
 from context_manager.core import ContextManager
+from context_manager.components.project_tracking import ownership
 
 @pytest.fixture
 def temp_project(tmpdir):
@@ -33,3 +35,116 @@ def test_update_context(temp_project):
         content = f.read()
         assert 'Recent Changes' in content
         assert 'Add test file' in content
+
+def test_update_context_replaces_sections_in_place(temp_project):
+    """Test that repeated updates keep a single section and archive history."""
+    os.system("touch first.txt")
+    os.system("git add first.txt")
+    os.system("git commit -m 'First change'")
+    
+    context_manager = ContextManager(temp_project)
+    context_manager.initialize_context()
+    context_manager.update_context()
+    
+    os.system("touch second.txt")
+    os.system("git add second.txt")
+    os.system("git commit -m 'Second change'")
+    context_manager.update_context()
+    
+    with open(os.path.join(temp_project, 'CONTEXT.md'), 'r') as f:
+        content = f.read()
+        assert content.count('## Recent Changes') == 1
+        assert 'Second change' in content
+    
+    # Further updates with nothing new must leave the document unchanged
+    for _ in range(3):
+        context_manager.update_context()
+        with open(os.path.join(temp_project, 'CONTEXT.md'), 'r') as f:
+            assert f.read() == content
+    
+    names = re.findall(r'<!-- BEGIN SECTION: ([\w-]+) -->', content)
+    assert 'recent-changes' in names
+    assert len(names) == len(set(names))
+    for name in names:
+        assert content.count(f'<!-- END SECTION: {name} -->') == 1
+    
+    archive_files = context_manager.archive.archive_files()
+    assert archive_files
+    with open(archive_files[0], 'r') as f:
+        assert '1 total commits' in f.read()
+
+def test_update_context_archives_legacy_blocks(temp_project):
+    """Test that appended legacy blocks are archived while managed sections stay."""
+    os.system("touch first.txt")
+    os.system("git add first.txt")
+    os.system("git commit -m 'First change'")
+    
+    context_manager = ContextManager(temp_project)
+    context_manager.initialize_context()
+    context_manager.update_context()
+    with open(context_manager.context_file, 'a') as f:
+        f.write("\n## Recent Changes\nLegacy appended block\n")
+    context_manager.update_context()
+    
+    with open(context_manager.context_file, 'r') as f:
+        content = f.read()
+        assert 'Legacy appended block' not in content
+        assert content.count('## Recent Changes') == 1
+        assert content.count('<!-- BEGIN SECTION: recent-changes -->') == 1
+    with open(context_manager.archive.archive_files()[0], 'r') as f:
+        assert 'Legacy appended block' in f.read()
+
+def test_ownership_index_reblames_only_changed_files(temp_project):
+    """Test that ownership is blamed incrementally and follows deletions."""
+    with open('alice.py', 'w') as f:
+        f.write("a = 1\nb = 2\nc = 3\n")
+    with open('shared.py', 'w') as f:
+        f.write("x = 1\n")
+    os.system("git add alice.py shared.py")
+    os.system("git -c user.name=Alice -c user.email=alice@example.com commit -m 'Alice files'")
+    
+    context_manager = ContextManager(temp_project)
+    assert context_manager.get_ownership() == {'Alice': 4}
+    
+    with open('shared.py', 'a') as f:
+        f.write("y = 2\nz = 3\n")
+    os.system("git rm -q alice.py")
+    os.system("git add shared.py")
+    os.system("git -c user.name=Bob -c user.email=bob@example.com commit -m 'Bob edits'")
+    
+    stats = context_manager.ownership.update()
+    assert stats['blamed'] == 1
+    assert stats['removed'] == 1
+    assert context_manager.ownership.ownership('shared.py') == {'Bob': 2, 'Alice': 1}
+    assert context_manager.ownership.ownership('alice.py') == {}
+    
+    context_manager.initialize_context()
+    for _ in range(3):
+        context_manager.update_context()
+    with open(os.path.join(temp_project, 'CONTEXT.md'), 'r') as f:
+        content = f.read()
+        assert content.count('## Code Ownership') == 1
+        assert content.count('<!-- BEGIN SECTION: ownership -->') == 1
+        assert 'Bob 67%' in content
+
+def test_ownership_index_skips_large_files_incrementally(temp_project, monkeypatch):
+    """Test that the size limit uses a file's full length, not the lines a commit added."""
+    monkeypatch.setattr(ownership, 'MAX_BLAME_LINES', 5)
+    with open('big.py', 'w') as f:
+        f.write("x = 1\n" * 4)
+    os.system("git add big.py")
+    os.system("git -c user.name=Alice -c user.email=alice@example.com commit -m 'Small file'")
+    
+    index = ownership.OwnershipIndex(temp_project)
+    index.update()
+    assert index.ownership('big.py') == {'Alice': 4}
+    
+    with open('big.py', 'a') as f:
+        f.write("y = 2\n" * 2)
+    os.system("git add big.py")
+    os.system("git -c user.name=Bob -c user.email=bob@example.com commit -m 'Grow file'")
+    
+    stats = index.update()
+    assert stats['blamed'] == 0
+    assert stats['removed'] == 1
+    assert index.ownership('big.py') == {}
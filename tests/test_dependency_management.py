@@ -1,5 +1,13 @@
+import json
+import random
+import zipfile
+import itertools
+import subprocess
 import pytest
+from context_manager.components.dependency_management import dependency_tracker
+from context_manager.components.dependency_management.advisory_db import AdvisoryDatabase
 from context_manager.components.dependency_management.dependency_tracker import DependencyTracker
+from context_manager.components.dependency_management.upgrade_planner import PackageMetadataCache, UpgradePlanner
 
 def test_dependency_tracker_initialization():
     """
@@ -15,3 +23,177 @@ def test_check_dependencies():
     tracker = DependencyTracker("/test/project/path")
     # TODO: Implement actual dependency checking test
     pass
+
+ADVISORIES = [
+    {'id': 'PYSEC-1', 'modified': '2024-01-01T00:00:00Z', 'summary': 'Range advisory', 'aliases': ['CVE-2024-1'],
+     'affected': [{'package': {'ecosystem': 'PyPI', 'name': 'Demo_Pkg'},
+                   'ranges': [{'type': 'ECOSYSTEM', 'events': [{'introduced': '0'}, {'fixed': '1.2'},
+                                                               {'introduced': '2.0'}, {'last_affected': '2.1'}]}]}]},
+    {'id': 'PYSEC-2', 'modified': '2024-01-01T00:00:00Z', 'summary': 'Listed versions',
+     'affected': [{'package': {'ecosystem': 'PyPI', 'name': 'other'}, 'versions': ['0.9', '2.0rc1', 'dev-build']}]},
+    {'id': 'GHSA-npm', 'modified': '2024-01-01T00:00:00Z',
+     'affected': [{'package': {'ecosystem': 'npm', 'name': 'demo-pkg'},
+                   'ranges': [{'type': 'SEMVER', 'events': [{'introduced': '0'}]}]}]},
+    {'id': 'PYSEC-3', 'modified': '2024-01-01T00:00:00Z', 'withdrawn': '2024-02-01T00:00:00Z',
+     'affected': [{'package': {'ecosystem': 'PyPI', 'name': 'other'}, 'versions': ['1.0']}]},
+]
+
+def test_advisory_import_and_range_lookup(tmp_path):
+    """
+    Test that OSV ranges and listed versions are matched after a streamed import.
+    """
+    snapshot = tmp_path / 'all.zip'
+    with zipfile.ZipFile(snapshot, 'w') as archive:
+        for advisory in ADVISORIES:
+            archive.writestr(f"{advisory['id']}.json", json.dumps(advisory))
+    database = AdvisoryDatabase(str(tmp_path / 'osv.db'))
+    
+    assert database.import_snapshot(str(snapshot)) == {'added': 2, 'updated': 0, 'unchanged': 0, 'skipped': 2}
+    assert [a['id'] for a in database.affected('demo-pkg', '1.1')] == ['PYSEC-1']
+    assert database.affected('demo-pkg', '1.2') == []
+    assert database.affected('demo.pkg', '2.1')[0]['fixed'] == ['1.2']
+    assert database.affected('demo-pkg', '2.2') == []
+    assert database.check([('other', '0.9'), ('other', '1.0')]) == {'other': [
+        {'id': 'PYSEC-2', 'summary': 'Listed versions', 'aliases': [], 'severity': [], 'fixed': []}]}
+    # Listed versions match any spelling that is equal under PEP 440
+    assert [a['id'] for a in database.affected('other', '0.9.0')] == ['PYSEC-2']
+    assert [a['id'] for a in database.affected('other', '2.0.0rc1')] == ['PYSEC-2']
+    assert [a['id'] for a in database.affected('other', 'dev-build')] == ['PYSEC-2']
+    assert database.affected('other', '0.9.1') == []
+
+def test_advisory_reimport_from_json_array(tmp_path):
+    """
+    Test that a JSON array snapshot is streamed and unchanged advisories are skipped on reimport.
+    """
+    snapshot = tmp_path / 'advisories.json'
+    snapshot.write_text(json.dumps(ADVISORIES[:2]))
+    database = AdvisoryDatabase(str(tmp_path / 'osv.db'))
+    database.import_snapshot(str(snapshot))
+    
+    updated = dict(ADVISORIES[0], modified='2024-03-01T00:00:00Z',
+                   affected=[dict(ADVISORIES[0]['affected'][0], ranges=[
+                       {'type': 'ECOSYSTEM', 'events': [{'introduced': '0'}, {'fixed': '1.0'}]}])])
+    lines = tmp_path / 'advisories.jsonl'
+    lines.write_text('\n'.join(json.dumps(advisory) for advisory in [updated, ADVISORIES[1]]) + '\n')
+    
+    assert database.import_snapshot(str(lines)) == {'added': 0, 'updated': 1, 'unchanged': 1, 'skipped': 0}
+    assert database.affected('demo-pkg', '1.1') == []
+    assert database.stats()['advisories'] == 2
+
+def test_check_dependencies_reports_vulnerabilities_offline(tmp_path, monkeypatch):
+    """
+    Test that an offline check flags installed versions from the local advisory database.
+    """
+    snapshot = tmp_path / 'advisories.jsonl'
+    snapshot.write_text(json.dumps(ADVISORIES[0]) + '\n')
+    tracker = DependencyTracker(str(tmp_path))
+    tracker.import_advisories(str(snapshot))
+    installed = [{'name': 'demo-pkg', 'version': '1.0'}, {'name': 'safe', 'version': '3.0'}]
+    monkeypatch.setattr(dependency_tracker.subprocess, 'run',
+                        lambda *args, **kwargs: subprocess.CompletedProcess(args, 0, json.dumps(installed), ''))
+    monkeypatch.setattr(dependency_tracker.requests, 'get', None)
+    
+    result = tracker.check_dependencies(offline=True)
+    
+    assert result['updates_available'] == {}
+    assert list(result['vulnerabilities']) == ['demo-pkg']
+    assert result['vulnerabilities']['demo-pkg'][0]['aliases'] == ['CVE-2024-1']
+
+def write_metadata(cache_dir, packages):
+    """Write cached PyPI metadata: name -> {version: (requires_python, [requires_dist])}."""
+    cache_dir.mkdir(exist_ok=True)
+    for name, releases in packages.items():
+        entry = {
+            'fetched_at': 0,
+            'releases': {v: {'requires_python': python, 'yanked': False} for v, (python, _) in releases.items()},
+            'requires': {v: requires for v, (_, requires) in releases.items()}
+        }
+        (cache_dir / f"{name}.json").write_text(json.dumps(entry))
+    return PackageMetadataCache(str(cache_dir), offline=True)
+
+def test_upgrade_planner_picks_compatible_versions(tmp_path):
+    """
+    Test that upgrades are chosen jointly and the blocking constraint is reported.
+    """
+    metadata = write_metadata(tmp_path / 'cache', {
+        'web': {'1.0': (None, ['core<2']), '2.0': (None, ['core>=2']), '3.0': (None, ['core>=3'])},
+        'core': {'1.0': (None, []), '2.0': (None, []), '3.0': ('>=3.99', [])},
+        'plugin': {'1.0': (None, ['core<2']), '1.1': (None, ['core<3', 'extra-tool; extra == "docs"'])},
+    })
+    planner = UpgradePlanner({'web': '1.0', 'core': '1.0', 'plugin': '1.0'}, metadata, python_version='3.11')
+    
+    plan = planner.plan()
+    
+    assert plan['upgrades'] == {'web': {'current': '1.0', 'target': '2.0'},
+                                'core': {'current': '1.0', 'target': '2.0'},
+                                'plugin': {'current': '1.0', 'target': '1.1'}}
+    assert plan['blocked']['core']['blocked_by'][0]['package'] == 'python'
+    assert plan['blocked']['web']['blocked_by'] == [{'package': 'web', 'version': '3.0', 'requirement': 'core>=3'}]
+
+def test_upgrade_planner_skips_unparseable_installed_versions(tmp_path):
+    """
+    Test that a package installed with a non-PEP 440 version is reported instead of failing the plan.
+    """
+    metadata = write_metadata(tmp_path / 'cache', {
+        'foo': {'1.0': (None, ['bar>=1']), '2.0': (None, ['bar>=1'])},
+        'bar': {'1.0': (None, [])},
+    })
+    plan = UpgradePlanner({'foo': '1.0', 'bar': 'not-a-version'}, metadata, python_version='3.11').plan()
+    
+    assert plan['upgrades'] == {'foo': {'current': '1.0', 'target': '2.0'}}
+    assert plan['skipped'] == {'bar': 'not-a-version'}
+    assert 'error' not in plan
+
+def test_upgrade_planner_explains_chained_blocks(tmp_path):
+    """
+    Test that dependencies are upgraded first and each blocked dependent names its constraint.
+    """
+    metadata = write_metadata(tmp_path / 'cache', {
+        'alpha': {'1.0': (None, []), '2.0': (None, ['beta>=2'])},
+        'beta': {'1.0': (None, []), '2.0': (None, ['gamma>=2'])},
+        'gamma': {'1.0': (None, []), '2.0': (None, ['delta<2'])},
+        'delta': {'1.0': (None, []), '2.0': (None, [])},
+        'offline-only': {'0.5': (None, [])},
+    })
+    installed = {'alpha': '1.0', 'beta': '1.0', 'gamma': '1.0', 'delta': '1.0', 'offline-only': '1.0'}
+    
+    plan = UpgradePlanner(installed, metadata, python_version='3.11').plan()
+    
+    assert plan['upgrades'] == {'delta': {'current': '1.0', 'target': '2.0'}}
+    assert {name: [b['requirement'] for b in entry['blocked_by']] for name, entry in plan['blocked'].items()} == {
+        'alpha': ['beta>=2'], 'beta': ['gamma>=2'], 'gamma': ['delta<2']}
+    assert plan['unchanged'] == ['alpha', 'beta', 'gamma', 'offline-only']
+
+def test_upgrade_planner_matches_exhaustive_search(tmp_path):
+    """
+    Test that backjumping and learned nogoods find the same plan as trying every combination.
+    """
+    rng = random.Random(7)
+    names = ['p0', 'p1', 'p2', 'p3', 'p4']
+    for case in range(40):
+        packages = {}
+        for i, name in enumerate(names):
+            packages[name] = {}
+            for release in ('1.0', '2.0', '3.0'):
+                requires = []
+                for other in names:
+                    if other != name and rng.random() < 0.3:
+                        requires.append(f"{other}{rng.choice(['>=2', '<2', '<3', '>=3', '==1.0'])}")
+                packages[name][release] = (None, requires)
+        metadata = write_metadata(tmp_path / f"cache{case}", packages)
+        planner = UpgradePlanner({name: '1.0' for name in names}, metadata, python_version='3.11')
+        plan = planner.plan()
+        
+        def consistent(choice):
+            for name, release in choice.items():
+                for dependency, specifier, _ in planner._requirements_of(name, release):
+                    if not planner._allows(specifier, dependency, choice[dependency], name, release):
+                        return False
+            return True
+        
+        candidates = [planner._candidates_of(name) for name in planner.order]
+        best = next(dict(zip(planner.order, choice)) for choice in itertools.product(*candidates)
+                    if consistent(dict(zip(planner.order, choice))))
+        expected = {name: {'current': '1.0', 'target': str(release)} for name, release in best.items()
+                    if str(release) != '1.0'}
+        assert plan['upgrades'] == expected, case
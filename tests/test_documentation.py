@@ -0,0 +1,78 @@
+import os
+import json
+import pytest
+from context_manager.utils.doc_renderer import DocumentationRenderer, split_sections
+
+CONTEXT = """# Project Context
+
+## Overview
+- Project Name: Demo
+
+## Current Status
+- Phase: Initial Setup
+"""
+
+@pytest.fixture
+def context_file(tmp_path):
+    """Write a small context document to render."""
+    path = tmp_path / 'CONTEXT.md'
+    path.write_text(CONTEXT)
+    return str(path)
+
+def test_split_sections():
+    """Test that documents are split at level-1 and level-2 headings."""
+    sections = split_sections(CONTEXT)
+    
+    assert [s['id'] for s in sections] == ['project-context', 'overview', 'current-status']
+    assert sections[1]['body'].startswith('## Overview')
+
+def test_split_sections_streams_lines(context_file):
+    """Test that an open file splits the same way as its contents."""
+    with open(context_file, 'r') as f:
+        assert split_sections(f) == split_sections(CONTEXT)
+
+def test_renderer_creates_cache_lazily(tmp_path, context_file):
+    """Test that the cache directory only appears once documentation is rendered."""
+    renderer = DocumentationRenderer(str(tmp_path))
+    assert not os.path.exists(renderer.cache_dir)
+    
+    renderer.render(context_file, str(tmp_path / 'DOCS.md'))
+    assert os.path.isdir(os.path.join(renderer.cache_dir, 'templates'))
+
+@pytest.mark.parametrize('output_format', ['markdown', 'html', 'json'])
+def test_render_formats(tmp_path, context_file, output_format):
+    """Test rendering the context document in every supported format."""
+    renderer = DocumentationRenderer(str(tmp_path))
+    output_path = renderer.render(context_file, str(tmp_path / f'DOCS.{output_format}'), output_format)
+    
+    with open(output_path, 'r') as f:
+        content = f.read()
+    
+    if output_format == 'json':
+        document = json.loads(content)
+        assert document['sections'][1]['items'] == ['Project Name: Demo']
+    elif output_format == 'html':
+        assert '<li>Phase: Initial Setup</li>' in content
+    else:
+        assert '## Current Status' in content
+
+def test_render_only_changed_sections(tmp_path, context_file):
+    """Test that unchanged sections are reused from the fragment cache."""
+    renderer = DocumentationRenderer(str(tmp_path))
+    output_path = str(tmp_path / 'DOCS.md')
+    renderer.render(context_file, output_path)
+    assert renderer.last_render_stats == {'rendered': 3, 'reused': 0}
+    
+    with open(context_file, 'a') as f:
+        f.write("- Progress: 50%\n")
+    renderer.render(context_file, output_path)
+    
+    assert renderer.last_render_stats == {'rendered': 1, 'reused': 2}
+    with open(output_path, 'r') as f:
+        assert 'Progress: 50%' in f.read()
+
+def test_render_rejects_unknown_format(tmp_path, context_file):
+    """Test that unsupported formats raise a clear error."""
+    renderer = DocumentationRenderer(str(tmp_path))
+    with pytest.raises(ValueError):
+        renderer.render(context_file, str(tmp_path / 'DOCS.pdf'), 'pdf')
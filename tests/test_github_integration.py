@@ -0,0 +1,229 @@
+import json
+import time
+import threading
+import git
+import pytest
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from context_manager.integrations.github_integration import GitHubIntegration
+from context_manager.integrations.org_scanner import OrganizationScanner
+from context_manager.integrations.data_sources import DataSourcePlanner
+
+COMMITS = [
+    {
+        'sha': f'{i:040x}',
+        'html_url': f'https://github.com/octo/demo/commit/{i:040x}',
+        'author': {'login': 'octocat'},
+        'commit': {'message': f'Commit {i}\n\nDetails', 'author': {'name': 'Octo Cat', 'date': '2024-01-01T00:00:00Z'}}
+    }
+    for i in range(25)
+]
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    """Minimal GitHub REST API serving one repository."""
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(self.path)
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+
+        if server.rate_limited_responses:
+            server.rate_limited_responses -= 1
+            return self._send(403, {'message': 'API rate limit exceeded'},
+                              {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(int(time.time()))})
+
+        if parsed.path == '/orgs/octo/repos':
+            return self._send(200, [
+                {'name': name, 'full_name': f'octo/{name}', 'owner': {'login': 'octo'}, 'archived': False}
+                for name in server.org_repos
+            ])
+
+        if parsed.path.count('/') == 3 and parsed.path.startswith('/repos/octo/'):
+            name = parsed.path.rsplit('/', 1)[-1]
+            return self._send(200, {
+                'name': name, 'full_name': f'octo/{name}', 'html_url': 'https://github.com/octo/demo',
+                'default_branch': 'main', 'license': {'spdx_id': 'MIT'}, 'archived': False,
+                'open_issues_count': 3, 'pushed_at': '2024-01-01T00:00:00Z'
+            }, etag='"repo-v1"')
+
+        if parsed.path.startswith('/repos/octo/') and parsed.path.endswith('/commits'):
+            per_page = int(query.get('per_page', ['30'])[0])
+            page = int(query.get('page', ['1'])[0])
+            items = COMMITS[(page - 1) * per_page:page * per_page]
+            headers = {}
+            if page * per_page < len(COMMITS):
+                next_url = f"http://{self.headers['Host']}{parsed.path}?per_page={per_page}&page={page + 1}"
+                headers['Link'] = f'<{next_url}>; rel="next"'
+            return self._send(200, items, headers, etag=f'"commits-{page}"')
+
+        if parsed.path == '/repos/octo/demo/issues':
+            return self._send(200, [
+                {'number': 1, 'title': 'Bug', 'state': 'open', 'user': {'login': 'octocat'}, 'labels': []},
+                {'number': 2, 'title': 'Fix bug', 'state': 'open', 'pull_request': {}}
+            ])
+
+        if parsed.path == '/repos/octo/demo/readme':
+            return self._send(404, {'message': 'Not Found'})
+
+        self._send(404, {'message': 'Not Found'})
+
+    def _send(self, status, body, headers=None, etag=None):
+        if etag and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        if etag:
+            self.send_header('ETag', etag)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+@pytest.fixture
+def fake_github():
+    """Run the fake GitHub API on a local port."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeGitHubHandler)
+    server.requests = []
+    server.rate_limited_responses = 0
+    server.org_repos = []
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def github(fake_github, tmp_path):
+    """GitHub integration pointed at the fake API."""
+    return GitHubIntegration(api_url=f'http://127.0.0.1:{fake_github.server_port}', project_path=str(tmp_path))
+
+def test_repository_info_uses_conditional_requests(github, fake_github):
+    """
+    Test that repeated lookups are revalidated with the cached ETag.
+    """
+    first = github.get_repository_info('octo', 'demo')
+    second = github.get_repository_info('octo', 'demo')
+    
+    assert first == second
+    assert first['full_name'] == 'octo/demo'
+    assert github.stats == {'requests': 2, 'not_modified': 1}
+
+def test_recent_commits_stop_at_limit(github, fake_github):
+    """
+    Test that pagination is lazy and never fetches pages beyond the limit.
+    """
+    commits = github.get_recent_commits('octo', 'demo', limit=5)
+    assert [c['message'] for c in commits] == [f'Commit {i}' for i in range(5)]
+    assert len(fake_github.requests) == 1
+    
+    fake_github.requests.clear()
+    iterator = github.iter_commits('octo', 'demo')
+    assert next(iterator)['sha'] == COMMITS[0]['sha']
+    assert len(fake_github.requests) == 1
+
+def test_pagination_follows_links(github, fake_github, monkeypatch):
+    """
+    Test that Link headers are followed when the limit spans several pages.
+    """
+    monkeypatch.setattr('context_manager.integrations.github_integration.MAX_PER_PAGE', 10)
+    
+    commits = list(github.iter_commits('octo', 'demo', limit=22))
+    
+    assert len(commits) == 22
+    assert len(fake_github.requests) == 3
+
+def test_rate_limited_requests_are_retried(github, fake_github):
+    """
+    Test that an exhausted rate limit is waited out and the request retried.
+    """
+    fake_github.rate_limited_responses = 1
+    
+    info = github.get_repository_info('octo', 'demo')
+    
+    assert info['name'] == 'demo'
+    assert github.stats['requests'] == 2
+
+def test_repository_health(github):
+    """
+    Test the health report for the fake repository.
+    """
+    health = github.check_repository_health('octo', 'demo')
+    
+    assert health['repository'] == 'octo/demo'
+    assert 'No README found' in health['issues']
+    assert health['metrics']['license'] == 'MIT'
+
+def test_organization_scan_resumes_from_checkpoint(github, fake_github, tmp_path):
+    """
+    Test that a bulk scan streams results and skips repositories already checked.
+    """
+    fake_github.org_repos = ['demo', 'other', 'third']
+    scanner = OrganizationScanner(github, max_workers=2, checkpoint_dir=str(tmp_path / 'scan'))
+    
+    # Interrupt the scan after the first result
+    first_run = scanner.scan('octo')
+    first = next(first_run)
+    first_run.close()
+    
+    remaining = list(scanner.scan('octo'))
+    checked = {first['repository']} | {result['repository'] for result in remaining}
+    
+    assert checked == {'octo/demo', 'octo/other', 'octo/third'}
+    assert first['repository'] not in {result['repository'] for result in remaining}
+    assert len(remaining) == 2
+
+@pytest.fixture
+def clone(tmp_path):
+    """Local clone of a repository with a fresh remote-tracking branch."""
+    upstream = git.Repo.init(tmp_path / 'upstream', initial_branch='main')
+    (tmp_path / 'upstream' / 'app.py').write_text('print(1)\n')
+    upstream.index.add(['app.py'])
+    upstream.index.commit('Initial commit')
+    
+    repo = git.Repo.clone_from(str(tmp_path / 'upstream'), str(tmp_path / 'clone'))
+    repo.remote('origin').set_url('https://github.com/octo/demo.git')
+    return repo
+
+def test_data_sources_prefer_fresh_local_refs(clone, github, fake_github):
+    """
+    Test that commit data comes from the clone without any API request.
+    """
+    planner = DataSourcePlanner(clone, github=github)
+    
+    commits = planner.recent_commits(limit=5)
+    activity = planner.recent_activity(days=30)
+    
+    assert (planner.owner, planner.name) == ('octo', 'demo')
+    assert commits['source'] == 'local'
+    assert [c['message'] for c in commits['data']] == ['Initial commit']
+    assert activity['source'] == 'local'
+    assert activity['data']['commits'] == 1
+    assert fake_github.requests == []
+
+def test_data_sources_fall_back_to_github(clone, github, fake_github, monkeypatch):
+    """
+    Test that stale refs and GitHub-only data are answered by the API.
+    """
+    planner = DataSourcePlanner(clone, github=github, max_staleness=timedelta(hours=1))
+    monkeypatch.setattr(planner, 'last_fetch_age', lambda: timedelta(days=2))
+    
+    commits = planner.recent_commits(limit=3)
+    issues = planner.open_issues()
+    
+    assert commits['source'] == 'github'
+    assert len(commits['data']) == 3
+    assert issues['source'] == 'github'
+    assert [issue['number'] for issue in issues['data']] == [1]
+    
+    offline = DataSourcePlanner(clone).open_pull_requests()
+    assert offline['source'] == 'unavailable'
@@ -0,0 +1,65 @@
+import os
+import subprocess
+import pytest
+import yaml
+from context_manager.components.project_tracking.history_dataset import HistoryDatasetBuilder
+
+def _commit(repo_path, name, content, date):
+    """Create a commit with a fixed date."""
+    with open(os.path.join(repo_path, name), 'w') as f:
+        f.write(content)
+    env = dict(os.environ, GIT_AUTHOR_DATE=date, GIT_COMMITTER_DATE=date)
+    subprocess.run(['git', 'add', name], cwd=repo_path, check=True)
+    subprocess.run(['git', 'commit', '-q', '-m', f'Add {name}'], cwd=repo_path, env=env, check=True)
+
+@pytest.fixture
+def repo_path(tmp_path):
+    """Create a repository with commits in two different weeks."""
+    path = str(tmp_path)
+    subprocess.run(['git', 'init', '-q'], cwd=path, check=True)
+    _commit(path, 'a.py', 'def a():\n    pass\n', '2024-01-02T10:00:00')
+    _commit(path, 'b.py', 'class B:\n    pass\n', '2024-01-03T10:00:00')
+    _commit(path, 'c.txt', 'one\ntwo\nthree\n', '2024-01-10T10:00:00')
+    return path
+
+def test_build_buckets_history(repo_path):
+    """
+    Test that commits are aggregated into weekly columnar buckets.
+    """
+    columns = HistoryDatasetBuilder(repo_path).build(include_code_metrics=False)
+    
+    assert list(columns['commits']) == [2, 1]
+    assert list(columns['insertions']) == [4, 3]
+    assert list(columns['active_authors']) == [1, 1]
+
+def test_build_is_incremental(repo_path):
+    """
+    Test that a rebuild only adds commits made since the last indexed HEAD.
+    """
+    builder = HistoryDatasetBuilder(repo_path)
+    builder.build(include_code_metrics=False)
+    _commit(repo_path, 'd.txt', 'x\n', '2024-01-11T10:00:00')
+    
+    columns = HistoryDatasetBuilder(repo_path).build(include_code_metrics=False)
+    
+    assert list(columns['commits']) == [2, 2]
+
+def test_to_records_merges_buckets_and_milestones(repo_path):
+    """
+    Test record output with milestones and a bounded number of records.
+    """
+    with open(os.path.join(repo_path, 'MILESTONES.yaml'), 'w') as f:
+        yaml.dump({'milestones': [{'name': 'MVP', 'created_at': '2024-01-04T09:00:00'}],
+                   'completed_milestones': []}, f)
+    
+    builder = HistoryDatasetBuilder(repo_path)
+    columns = builder.build()
+    records = builder.to_records(columns)
+    
+    assert records[0]['period'] == '2024-01-01'
+    assert records[0]['milestones_created'] == 1
+    assert records[-1]['python_files'] == 2
+    
+    merged = builder.to_records(columns, max_records=1)
+    assert len(merged) == 1
+    assert merged[0]['commits'] == 3
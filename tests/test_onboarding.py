@@ -0,0 +1,124 @@
+import json
+import yaml
+import pytest
+from context_manager.components.ai_insights.ai_client import AIClient, FakeAIBackend
+from context_manager.utils.onboarding import ProjectOnboarding, onboard_projects, parse_strategy, parse_structured_strategy
+
+STRATEGY = """Phase 1: Prototype
+- Milestone: first release
+- Challenge: data migration
+- Best practice: write tests first"""
+
+def test_strategy_requested_while_prompts_are_answered(tmp_path, monkeypatch):
+    """
+    Test that the strategy request is sent before the last questions are asked.
+    """
+    backend = FakeAIBackend(default_response=STRATEGY)
+    onboarding = ProjectOnboarding(str(tmp_path), ai_client=AIClient(backend=backend), quiet=True)
+    sent_before = {}
+    
+    def ask(question, default=None, choices=None):
+        if 'Description' in question:
+            onboarding._strategy_future.result()
+            sent_before['description'] = len(backend.prompts)
+        return default
+    
+    monkeypatch.setattr('context_manager.utils.onboarding.Prompt.ask', ask)
+    blueprint = onboarding.start_onboarding()
+    
+    assert sent_before['description'] == 1
+    assert len(backend.prompts) == 1
+    assert blueprint['development_strategy']['roadmap'] == ['Phase 1: Prototype']
+    assert (tmp_path / 'PROJECT_BLUEPRINT.yaml').exists()
+
+def test_interrupted_onboarding_cancels_strategy(tmp_path, monkeypatch):
+    """
+    Test that aborting the prompts cancels the pending strategy request.
+    """
+    backend = FakeAIBackend(default_response=STRATEGY, latency=5)
+    onboarding = ProjectOnboarding(str(tmp_path), ai_client=AIClient(backend=backend), quiet=True)
+    
+    def ask(question, default=None, choices=None):
+        if 'Description' in question:
+            raise KeyboardInterrupt
+        return default
+    
+    monkeypatch.setattr('context_manager.utils.onboarding.Prompt.ask', ask)
+    with pytest.raises(KeyboardInterrupt):
+        onboarding.start_onboarding()
+    
+    assert onboarding._strategy_future is None
+    assert not (tmp_path / 'PROJECT_BLUEPRINT.yaml').exists()
+
+def test_non_interactive_onboarding_from_answers_file(tmp_path):
+    """
+    Test onboarding from a JSON answers file without prompting.
+    """
+    answers_file = tmp_path / 'answers.json'
+    answers_file.write_text(json.dumps({'name': 'demo', 'type': 'CLI Tool'}))
+    backend = FakeAIBackend(default_response=STRATEGY)
+    onboarding = ProjectOnboarding(str(tmp_path), ai_client=AIClient(backend=backend), quiet=True)
+    
+    blueprint = onboarding.start_onboarding(ProjectOnboarding.load_answers(str(answers_file)))
+    
+    with open(tmp_path / 'PROJECT_BLUEPRINT.yaml') as f:
+        saved = yaml.safe_load(f)
+    assert saved == blueprint
+    assert saved['project']['name'] == 'demo'
+    assert saved['project']['primary_language'] == 'Python'
+    assert saved['development_strategy']['milestones'] == ['- Milestone: first release']
+
+def test_batch_onboarding_isolates_failures(tmp_path):
+    """
+    Test that projects are onboarded in parallel and a bad answer set only fails its project.
+    """
+    projects = {}
+    for name in ('alpha', 'beta', 'gamma'):
+        (tmp_path / name).mkdir()
+        projects[str(tmp_path / name)] = {'name': name}
+    projects[str(tmp_path / 'beta')]['type'] = 'Spaceship'
+    backend = FakeAIBackend(default_response=STRATEGY, latency=0.05)
+    
+    results = onboard_projects(projects, max_workers=3, ai_client=AIClient(backend=backend))
+    
+    errors = {result['project_path']: result['error'] for result in results}
+    assert errors[str(tmp_path / 'alpha')] is None
+    assert errors[str(tmp_path / 'gamma')] is None
+    assert 'Spaceship' in errors[str(tmp_path / 'beta')]
+    assert backend.max_in_flight == 2
+
+
+def test_parse_strategy_classifies_lines_in_one_pass():
+    """
+    Test that lines land in every matching section, capped per section.
+    """
+    text = "\n".join([
+        "Stage 1: setup",
+        "the next phase is lowercase",
+        "A major goal that SHOULD be met",
+        "Complexity of the challenge",
+        "Complexity of the challenge",
+    ] + [f"Recommendation {i}" for i in range(10)])
+    
+    sections = parse_strategy(text)
+    
+    assert sections['roadmap'] == ['Stage 1: setup']
+    assert sections['milestones'] == ['A major goal that SHOULD be met']
+    assert sections['challenges'] == ['Complexity of the challenge'] * 2
+    assert sections['best_practices'] == ['A major goal that SHOULD be met'] + [f"Recommendation {i}" for i in range(4)]
+
+def test_structured_strategy_parsing(tmp_path):
+    """
+    Test that structured output is requested and parsed, with a free-text fallback.
+    """
+    response = 'Here you go: {"roadmap": ["Phase 1"], "milestones": ["MVP"], "challenges": [], "best_practices": ["CI"]}'
+    backend = FakeAIBackend(default_response=response)
+    onboarding = ProjectOnboarding(str(tmp_path), ai_client=AIClient(backend=backend), quiet=True, structured=True)
+    
+    blueprint = onboarding.start_onboarding({'name': 'demo'})
+    
+    assert 'JSON object' in backend.prompts[0]
+    assert blueprint['development_strategy'] == {
+        'roadmap': ['Phase 1'], 'milestones': ['MVP'], 'challenges': [], 'best_practices': ['CI']
+    }
+    assert parse_structured_strategy(STRATEGY) == parse_strategy(STRATEGY)
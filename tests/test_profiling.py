@@ -0,0 +1,35 @@
+import json
+from context_manager.components.code_analysis.code_generator import CodeGenerator
+from context_manager.components.project_tracking.context_system import ProjectContextManager
+from context_manager.utils import profiling
+from context_manager.utils.profiling import profile, span
+
+def test_profile_records_phases_and_counters(tmp_path):
+    """
+    Test that instrumented code reports phases and counters inside a profile block.
+    """
+    (tmp_path / 'a.py').write_text('class A:\n    pass\n')
+    (tmp_path / 'b.py').write_text('def b():\n    return 1\n')
+    
+    with profile() as profiler:
+        CodeGenerator(str(tmp_path)).analyze_project_structure()
+        ProjectContextManager(str(tmp_path)).add_milestone('Ship it')
+    
+    report = json.loads(profiler.to_json())
+    assert report['counters'] == {'files_parsed': 2}
+    assert report['phases']['parse']['calls'] == 2
+    assert report['phases']['yaml']['calls'] == 3  # initial write, load, save
+    assert report['wall_time'] > 0
+
+def test_spans_are_noops_when_disabled():
+    """
+    Test that hooks do nothing outside a profile block, including after one exits.
+    """
+    with profile(cprofile=True) as profiler:
+        with span('git'):
+            pass
+    
+    assert profiling._active is None
+    assert span('git') is profiling._NULL_SPAN
+    assert profiler.report()['phases']['git']['calls'] == 1
+    assert profiler.report()['functions']
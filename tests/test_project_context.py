@@ -2,6 +2,7 @@ import os
 import pytest
 import yaml
 from context_manager.components.project_tracking.project_context_manager import ProjectContextManager
+from context_manager.components.project_tracking import context_system, SnapshotStore
 
 def test_project_context_initialization(tmp_path):
     """
@@ -34,3 +35,67 @@ def test_get_current_context(tmp_path):
     assert isinstance(context, dict)
     assert 'project' in context
     assert 'development' in context
+
+def test_snapshot_diff_reports_changed_sections(tmp_path):
+    """
+    Test that a diff against a snapshot lists only the sections that changed.
+    """
+    context_manager = context_system.ProjectContextManager(str(tmp_path))
+    first = context_manager.snapshot('before')
+    
+    context_manager.update_context('phase', {'phase': 'testing'})
+    changes = context_manager.changes_since(first['id'])
+    
+    paths = {change['path']: change for change in changes['changes']}
+    assert set(paths) == {'context/development/current_phase', 'context/project/last_updated'}
+    assert paths['context/development/current_phase']['old'] == 'initialization'
+    assert paths['context/development/current_phase']['new'] == 'testing'
+    
+    context_manager.add_milestone('Release')
+    second = context_manager.snapshot()
+    changes = context_manager.changes_since(first['id'], second['id'])
+    added = [change for change in changes['changes'] if change['change'] == 'added']
+    assert added[0]['path'] == 'context/development/milestones/0'
+    assert added[0]['new']['description'] == 'Release'
+    
+    assert context_manager.changes_since('latest')['changes'] == []
+    assert 'error' in context_manager.changes_since('unknown')
+
+def test_snapshots_share_unchanged_sections(tmp_path):
+    """
+    Test that repeated snapshots only store the sections that changed.
+    """
+    context_manager = context_system.ProjectContextManager(str(tmp_path))
+    for i in range(20):
+        context_manager.add_milestone(f"Milestone {i}")
+    first = context_manager.snapshot()
+    objects_dir = os.path.join(str(tmp_path), '.context', 'snapshots', 'objects')
+    stored = sum(len(files) for _, _, files in os.walk(objects_dir))
+    
+    # Nothing changed: every section is reused
+    again = context_manager.snapshot()
+    assert again['root'] == first['root']
+    assert again['objects_written'] == 0
+    
+    context_manager.add_milestone('One more')
+    third = context_manager.snapshot()
+    assert third['objects_written'] < 10
+    assert sum(len(files) for _, _, files in os.walk(objects_dir)) == stored + third['objects_written']
+    assert [entry['id'] for entry in SnapshotStore(str(tmp_path)).list()] == [first['id'], again['id'], third['id']]
+
+def test_snapshot_diff_skips_unchanged_subtrees(tmp_path):
+    """
+    Test that diffing only descends into subtrees whose hashes differ.
+    """
+    context_manager = context_system.ProjectContextManager(str(tmp_path))
+    for i in range(60):
+        context_manager.add_milestone(f"Milestone {i}")
+    snapshot = context_manager.snapshot()
+    
+    context_manager.update_context('phase', {'phase': 'release'})
+    changes = context_manager.changes_since(snapshot['id'])
+    
+    assert len(changes['changes']) == 2
+    # root, three sections, project and development with their children; not the 60 milestones
+    assert changes['nodes_compared'] < 20
+
@@ -0,0 +1,56 @@
+import os
+import git
+import yaml
+from context_manager.workspace import Workspace, process_repository
+
+def _make_repo(path):
+    repo = git.Repo.init(path)
+    (path / 'app.py').write_text('class App:\n    def run(self):\n        pass\n')
+    repo.index.add(['app.py'])
+    repo.index.commit('Initial commit')
+    return str(path)
+
+def test_workspace_discovers_repositories(tmp_path):
+    """
+    Test that git checkouts below the root are found and plain directories skipped.
+    """
+    _make_repo(tmp_path / 'alpha')
+    _make_repo(tmp_path / 'group' / 'beta')
+    (tmp_path / 'notes').mkdir()
+    
+    workspace = Workspace.from_root(str(tmp_path))
+    
+    assert workspace.repositories == [str(tmp_path / 'alpha'), str(tmp_path / 'group' / 'beta')]
+
+def test_workspace_run_isolates_failures(tmp_path):
+    """
+    Test a parallel run over a manifest where one entry is not a repository.
+    """
+    _make_repo(tmp_path / 'alpha')
+    _make_repo(tmp_path / 'beta')
+    (tmp_path / 'broken').mkdir()
+    manifest = tmp_path / 'workspace.yaml'
+    manifest.write_text(yaml.safe_dump({'repositories': ['alpha', 'beta', {'path': 'broken'}]}))
+    seen = []
+    
+    workspace = Workspace.from_manifest(str(manifest), max_workers=2)
+    report = workspace.run(['update_context', 'status', 'code_analysis'], progress=seen.append)
+    
+    summary = report['summary']
+    assert len(seen) == 3
+    assert (summary['succeeded'], summary['failed']) == (2, 1)
+    assert summary['totals'] == {'commits': 2, 'python_files': 2, 'classes': 2, 'functions': 2}
+    assert 'update_context' in summary['failures'][str(tmp_path / 'broken')]
+    assert os.path.exists(tmp_path / 'alpha' / 'CONTEXT.md')
+
+def test_process_repository_reports_each_operation(tmp_path):
+    """
+    Test that a failing operation does not prevent the others from running.
+    """
+    (tmp_path / 'plain').mkdir()
+    
+    result = process_repository(str(tmp_path / 'plain'), ['status', 'project_context'])
+    
+    assert not result['ok']
+    assert list(result['errors']) == ['status']
+    assert result['results']['project_context']['milestones'] == 0